@@ -46,9 +46,9 @@ else
     echo -e "${GREEN}✓ claudepm script already in place${NC}"
 fi
 
-# Copy utils.sh
+# Copy utils.sh and the modules it sources
 if [[ -f "lib/utils.sh" ]]; then
-    cp lib/utils.sh ~/.claudepm/lib/
+    cp lib/utils.sh lib/stats.sh lib/search.sh ~/.claudepm/lib/
     echo -e "${GREEN}✓ Utils library copied${NC}"
 else
     # Use the one we already created
@@ -0,0 +1,459 @@
+#!/bin/bash
+# search.sh - Full-text search index and claudepm search (sourced by utils.sh)
+
+# Full-text search over the log entries, tasks and NOTES.md of every project
+# The index in SEARCH_DIR is brought up to date before each search:
+# - projects.tsv: per project, a generation for each of its log, task and
+#   note segments, plus the indexed LOG.md offset and input stamps
+# - postings/<first two letters>.tsv: term, doc, project, kind, generation,
+#   term frequency, date, status
+# - docs/<doc % 64>.tsv: doc, project, kind, generation, date, status,
+#   title, snippet
+# LOG.md only grows, so only the bytes past the saved offset are indexed;
+# a checksum of the bytes before the offset catches rewrites (archiving,
+# hand edits), which rebuild that project's log segment under a new
+# generation. Tasks and notes are reindexed whole when their files change.
+# Postings of old generations are skipped at query time and dropped once
+# the postings files have doubled since the last compaction.
+SEARCH_DIR="$CLAUDEPM_STATE_DIR/search"
+SEARCH_DOC_SHARDS=64
+
+# Tokenizer shared by indexing and queries
+SEARCH_TOKENS_AWK='
+    BEGIN {
+        nstop = split("the and for with from that this was were are is it to of in on at by be as an or not but", stop_words, " ")
+        for (i = 1; i <= nstop; i++) STOP[stop_words[i]] = 1
+    }
+    # Count the terms of s into tf (cleared first); returns the distinct count
+    function tokenize(s, tf,   n, i, w, words, distinct) {
+        split("", tf)
+        s = tolower(s)
+        gsub(/[^a-z0-9_]+/, " ", s)
+        n = split(s, words, " ")
+        distinct = 0
+        for (i = 1; i <= n; i++) {
+            w = words[i]
+            if (length(w) < 2 || (w in STOP)) continue
+            # Fold plain plurals so "tokens" finds "token"
+            if (length(w) > 3 && w ~ /[^s]s$/) w = substr(w, 1, length(w) - 1)
+            if (!(w in tf)) distinct++
+            tf[w]++
+        }
+        return distinct
+    }
+'
+
+# Checksum of the (up to) 32 bytes of a file that end at an offset
+# Reads stop at the offset, so nothing upstream of head can hit SIGPIPE
+# (fatal under pipefail) when the file has grown past it
+search_tail_check() {
+    local file="$1" offset="$2"
+    head -c "$offset" "$file" 2>/dev/null | tail -c 32 | cksum | tr -d ' \t'
+}
+
+# Split log text on stdin into documents: pnum, kind, gen, date, status, title, text
+search_log_docs() {
+    awk -v OFS='\t' -v pnum="$1" -v gen="$2" '
+        function flush() {
+            if (title != "") print pnum, "log", gen, date, "", title, text
+            title = ""; text = ""
+        }
+        /^### / {
+            flush()
+            title = substr($0, 5)
+            date = ($2 ~ /^[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]$/) ? $2 : ""
+            next
+        }
+        title != "" && $0 != "---" && $0 != "" { gsub(/\t/, " "); text = text (text == "" ? "" : " ") $0 }
+        END { flush() }
+    '
+}
+
+# Split NOTES.md into one document per ## section
+search_note_docs() {
+    awk -v OFS='\t' -v pnum="$1" -v gen="$2" '
+        function flush() { if (text != "") print pnum, "note", gen, "", "", title, text; text = "" }
+        BEGIN { title = "NOTES.md" }
+        /^##+ / { flush(); title = $0; sub(/^#+ +/, "", title); next }
+        /^# / { next }
+        $0 != "" { gsub(/\t/, " "); text = text (text == "" ? "" : " ") $0 }
+        END { flush() }
+    ' "$3"
+}
+
+# Bring the index up to date for the project directories on stdin
+search_update() {
+    local dir="$SEARCH_DIR"
+    mkdir -p "$dir/postings" "$dir/docs"
+    [[ -f "$dir/projects.tsv" ]] || : > "$dir/projects.tsv"
+    [[ -f "$dir/meta" ]] || echo "0 0 0" > "$dir/meta"
+
+    # One writer at a time; a search that loses the race reads the index as is
+    if ! mkdir "$dir/lock" 2>/dev/null; then
+        [[ -n "$(find "$dir/lock" -maxdepth 0 -mmin +5 2>/dev/null)" ]] || return 0
+        rmdir "$dir/lock" 2>/dev/null || true
+        mkdir "$dir/lock" 2>/dev/null || return 0
+    fi
+
+    local work=$(mktemp -d "${TMPDIR:-/tmp}/claudepm-search.XXXXXX")
+    awk '$0 != "" && !seen[$0]++' > "$work/projects"
+
+    # Stamp every input of every project with one stat
+    local path
+    while IFS= read -r path; do
+        task_journal_path "$path"
+        printf '%s\0' "$path/LOG.md" "$path/ROADMAP.md" "$path/NOTES.md" "$TASK_JOURNAL_PATH"
+    done < "$work/projects" | batch_stamps > "$work/stamps"
+
+    # Plan: one line per project that is new or has changed inputs
+    task_journal_path
+    awk -F '\t' -v OFS='\t' -v work="$work" -v journal="$TASK_JOURNAL_PATH" '
+        FILENAME == work "/stamps" { stamp[$1] = $2; next }
+        FILENAME != work "/projects" { row[$1] = $0; if ($2 > maxp) maxp = $2; next }
+        {
+            p = $0
+            if (p in row) split(row[p], r, "\t")
+            else { split(p "\t" (++maxp) "\t0\t0\t-\t0\t0\t-\t0\t0\t-\t0", r, "\t") }
+            log_stamp = (p "/LOG.md" in stamp) ? stamp[p "/LOG.md"] : "0"
+            size = log_stamp; sub(/ .*/, "", size); size += 0
+            task_stamp = "-"
+            if ((p "/ROADMAP.md") in stamp) task_stamp = stamp[p "/ROADMAP.md"]
+            # The same journal task_journal_path gives for the project
+            jp = (journal ~ /^\//) ? journal : p "/" journal
+            if (jp in stamp) task_stamp = task_stamp ";" stamp[jp]
+            note_stamp = ((p "/NOTES.md") in stamp) ? stamp[p "/NOTES.md"] : "-"
+            log_action = (size == r[4]) ? "none" : (size > r[4] && r[4] > 0 ? "append" : "rebuild")
+            task_action = (task_stamp == r[8]) ? "none" : "reindex"
+            note_action = (note_stamp == r[11]) ? "none" : "reindex"
+            if (!(p in row) || log_action != "none" || task_action != "none" || note_action != "none")
+                print r[1], r[2], r[3], r[4], r[5], r[6], r[7], r[9], r[10], r[12], log_action, size, task_action, task_stamp, note_action, note_stamp
+        }
+    ' "$dir/projects.tsv" "$work/stamps" "$work/projects" > "$work/plan"
+
+    # Collect the new documents and the new state of each planned project
+    : > "$work/new"
+    : > "$work/state"
+    local pnum log_gen offset check log_docs task_gen task_docs note_gen note_docs
+    local log_action size task_action task_stamp note_action note_stamp before segment
+    while IFS=$'\t' read -r path pnum log_gen offset check log_docs task_gen task_docs note_gen note_docs \
+            log_action size task_action task_stamp note_action note_stamp; do
+        if [[ "$log_action" == "append" && "$(search_tail_check "$path/LOG.md" "$offset")" != "$check" ]]; then
+            log_action="rebuild"
+        fi
+        before=$(wc -l < "$work/new")
+        case "$log_action" in
+            append)
+                head -c "$size" "$path/LOG.md" | tail -c +$(( offset + 1 )) |
+                    search_log_docs "$pnum" "$log_gen" >> "$work/new"
+                ;;
+            rebuild)
+                log_gen=$(( log_gen + 1 ))
+                log_docs=0
+                {
+                    if [[ -f "$path/$LOG_ARCHIVE_DIR/manifest.tsv" ]]; then
+                        awk -F '\t' '!/^#/ { print $1 }' "$path/$LOG_ARCHIVE_DIR/manifest.tsv" | while IFS= read -r segment; do
+                            gzip -dc "$path/$LOG_ARCHIVE_DIR/$segment"
+                        done
+                    fi
+                    # Stop at the stamped size so a concurrent append is indexed next time
+                    if (( size > 0 )); then head -c "$size" "$path/LOG.md"; fi
+                } | search_log_docs "$pnum" "$log_gen" >> "$work/new"
+                ;;
+        esac
+        log_docs=$(( log_docs + $(wc -l < "$work/new") - before ))
+        offset="$size"
+        check="-"
+        if (( size > 0 )); then
+            check=$(search_tail_check "$path/LOG.md" "$size")
+        fi
+
+        if [[ "$task_action" == "reindex" ]]; then
+            task_gen=$(( task_gen + 1 ))
+            before=$(wc -l < "$work/new")
+            if [[ -f "$path/ROADMAP.md" ]]; then
+                ( cd "$path" && TASK_JOURNAL="" && parse_tasks ROADMAP.md ) |
+                    awk -F '\t' -v OFS='\t' -v pnum="$pnum" -v gen="$task_gen" '{ print pnum, "task", gen, $3, $2, $4, "" }' >> "$work/new"
+            fi
+            task_docs=$(( $(wc -l < "$work/new") - before ))
+        fi
+
+        if [[ "$note_action" == "reindex" ]]; then
+            note_gen=$(( note_gen + 1 ))
+            before=$(wc -l < "$work/new")
+            if [[ -f "$path/NOTES.md" ]]; then
+                search_note_docs "$pnum" "$note_gen" "$path/NOTES.md" >> "$work/new"
+            fi
+            note_docs=$(( $(wc -l < "$work/new") - before ))
+        fi
+
+        printf '%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' "$path" "$pnum" "$log_gen" "$offset" "$check" \
+            "$log_docs" "$task_gen" "$task_stamp" "$task_docs" "$note_gen" "$note_stamp" "$note_docs" >> "$work/state"
+    done < "$work/plan"
+
+    if [[ -s "$work/state" ]]; then
+        local next_seq written base posted
+        read -r next_seq written base < "$dir/meta"
+
+        # Number and tokenize the new documents, tagging each line with its shard
+        awk -F '\t' -v OFS='\t' -v seq="$next_seq" -v shards="$SEARCH_DOC_SHARDS" -v work="$work" "$SEARCH_TOKENS_AWK"'
+            {
+                id = ++seq
+                tokenize($6 " " $7, tf)
+                for (t in tf) {
+                    print substr(t, 1, 2), t, id, $1, $2, $3, tf[t], $4, $5 > (work "/postings")
+                    posted++
+                }
+                snippet = (length($7) > 240) ? substr($7, 1, 240) "..." : $7
+                print id % shards, id, $1, $2, $3, $4, $5, $6, snippet > (work "/docs")
+            }
+            END { print seq, posted + 0 > (work "/ingested") }
+        ' "$work/new"
+        read -r next_seq posted < "$work/ingested"
+
+        # Append to each shard file with a single open (sorted so shards are contiguous)
+        local kind
+        for kind in postings docs; do
+            [[ -f "$work/$kind" ]] || continue
+            sort -s -t $'\t' -k1,1 "$work/$kind" | awk -v target="$dir/$kind" '
+                {
+                    shard = $0; sub(/\t.*/, "", shard)
+                    if (shard != current) {
+                        if (current != "") close(file)
+                        current = shard; file = target "/" shard ".tsv"
+                    }
+                    print substr($0, length(shard) + 2) >> file
+                }
+            '
+        done
+
+        awk -F '\t' -v work="$work" '
+            FILENAME == work "/state" { fresh[$1] = $0; next }
+            !($1 in fresh) { print; next }
+            { print fresh[$1]; delete fresh[$1] }
+            END { for (p in fresh) print fresh[p] }
+        ' "$work/state" "$dir/projects.tsv" > "$work/projects.tsv"
+        mv "$work/projects.tsv" "$dir/projects.tsv"
+        written=$(( written + posted ))
+        echo "$next_seq $written $base" > "$dir/meta"
+
+        if (( written > 2 * base + ${CLAUDEPM_SEARCH_COMPACT_MIN:-20000} )); then
+            search_compact
+        fi
+    fi
+
+    rm -rf "$work"
+    rmdir "$dir/lock" 2>/dev/null || true
+}
+
+# Rewrite the index without postings and documents of old generations
+# Called with the index lock held
+search_compact() {
+    local dir="$SEARCH_DIR" kind field
+    for kind in postings docs; do
+        # Postings name their project in field 3, documents in field 2
+        field=3
+        [[ "$kind" == "docs" ]] && field=2
+        rm -rf "${dir:?}/$kind.new"
+        mkdir -p "$dir/$kind.new"
+        find "$dir/$kind" -name '*.tsv' -print0 | xargs -0 awk -F '\t' -v field="$field" \
+            -v target="$dir/$kind.new" -v projects="$dir/projects.tsv" '
+            BEGIN {
+                while ((getline line < projects) > 0) {
+                    split(line, r, "\t")
+                    gen[r[2] ":log"] = r[3]; gen[r[2] ":task"] = r[7]; gen[r[2] ":note"] = r[10]
+                }
+            }
+            FILENAME != current {
+                if (file != "") close(file)
+                current = FILENAME; file = FILENAME; sub(/.*\//, "", file); file = target "/" file
+            }
+            (($field ":" $(field + 1)) in gen) && gen[$field ":" $(field + 1)] == $(field + 2) { print > file; live++ }
+            END { print live + 0 > (target "/.live") }
+        '
+    done
+    local next_seq written base live=0
+    read -r next_seq written base < "$dir/meta"
+    [[ -f "$dir/postings.new/.live" ]] && read -r live < "$dir/postings.new/.live"
+    rm -f "$dir/postings.new/.live" "$dir/docs.new/.live"
+    rm -rf "${dir:?}/postings" "${dir:?}/docs"
+    mv "$dir/postings.new" "$dir/postings"
+    mv "$dir/docs.new" "$dir/docs"
+    echo "$next_seq $live $live" > "$dir/meta"
+}
+
+# Search log entries, tasks and notes across registered projects
+# Ranks with BM25-style term weights; documents matching every term first,
+# newer entries first on ties.
+search_command() {
+    local project="" since="" until="" status="" kind="" limit=10 json=0 reindex=0 line
+    local terms=() paths=()
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            -p|--project)
+                project="${2:-}"
+                shift 2
+                ;;
+            --since)
+                since="${2:-}"
+                shift 2
+                ;;
+            --until)
+                until="${2:-}"
+                shift 2
+                ;;
+            --status)
+                status=$(echo "${2:-}" | tr 'a-z-' 'A-Z_')
+                shift 2
+                ;;
+            --kind)
+                kind="${2:-}"
+                shift 2
+                ;;
+            -n)
+                limit="${2:-10}"
+                shift 2
+                ;;
+            --json)
+                json=1
+                shift
+                ;;
+            --reindex)
+                reindex=1
+                shift
+                ;;
+            *)
+                terms+=("$1")
+                shift
+                ;;
+        esac
+    done
+    if [[ ${#terms[@]} -eq 0 && $reindex -eq 0 ]]; then
+        echo "Error: Search terms required"
+        echo "Usage: claudepm search [-p PROJECT] [--since DATE] [--until DATE] [--status STATUS] [--kind log|task|note] [-n N] [--json] <terms...>"
+        exit 1
+    fi
+    # A status filter only makes sense for tasks
+    if [[ -n "$status" && -z "$kind" ]]; then
+        kind="task"
+    fi
+
+    # Registered projects, or just this one before anything is registered
+    if [[ -f "$CLAUDEPM_HOME/projects.list" ]]; then
+        while IFS= read -r line; do
+            if [[ -n "$line" && -d "$line" ]]; then
+                paths+=("$line")
+            fi
+        done < "$CLAUDEPM_HOME/projects.list"
+    fi
+    if [[ ${#paths[@]} -eq 0 && -f ".claudepm" ]]; then
+        paths=("$PWD")
+    fi
+
+    local started=$(now_ms)
+    if [[ $reindex -eq 1 ]]; then
+        rm -rf "${SEARCH_DIR:?}"
+    fi
+    printf '%s\n' ${paths[@]+"${paths[@]}"} | search_update
+    if [[ ${#terms[@]} -eq 0 ]]; then
+        echo "Rebuilt search index for ${#paths[@]} projects in $(( $(now_ms) - started ))ms"
+        return 0
+    fi
+
+    # Score, filter and rank in one pass over only the shards the terms live in
+    awk -v query="${terms[*]}" -v dir="$SEARCH_DIR" -v shards="$SEARCH_DOC_SHARDS" -v limit="$limit" \
+        -v project="$project" -v since="$since" -v until="$until" -v want_status="$status" -v want_kind="$kind" \
+        -v json_out="$json" -v schema="$JSON_SCHEMA_VERSION" "$JSON_AWK$SEARCH_TOKENS_AWK"'
+        BEGIN {
+            while ((getline line < (dir "/projects.tsv")) > 0) {
+                split(line, r, "\t")
+                name = r[1]; sub(/.*\//, "", name)
+                path[r[2]] = r[1]; pname[r[2]] = name
+                gen[r[2] ":log"] = r[3]; gen[r[2] ":task"] = r[7]; gen[r[2] ":note"] = r[10]
+                ndocs += r[6] + r[9] + r[12]
+                if (project == "" || project == name || project == r[1]) allowed[r[2]] = 1
+            }
+            close(dir "/projects.tsv")
+            nterms = tokenize(query, qtf)
+
+            for (t in qtf) {
+                file = dir "/postings/" substr(t, 1, 2) ".tsv"
+                split("", tf)
+                df = 0
+                while ((getline line < file) > 0) {
+                    if (substr(line, 1, length(t) + 1) != t "\t") continue
+                    split(line, f, "\t")
+                    if (!((f[3] ":" f[4]) in gen) || gen[f[3] ":" f[4]] != f[5]) continue
+                    df++
+                    if (!(f[3] in allowed)) continue
+                    if (want_kind != "" && f[4] != want_kind) continue
+                    if (want_status != "" && f[8] != want_status) continue
+                    if (since != "" && (f[7] == "" || f[7] < since)) continue
+                    if (until != "" && (f[7] == "" || substr(f[7], 1, length(until)) > until)) continue
+                    tf[f[2]] = f[6]
+                    date[f[2]] = f[7]
+                }
+                close(file)
+                idf = log(1 + (ndocs - df + 0.5) / (df + 0.5))
+                for (d in tf) {
+                    score[d] += idf * tf[d] * 2.2 / (tf[d] + 1.2)
+                    matched[d]++
+                }
+            }
+
+            # Keep the best `limit` results with an insertion sort
+            n = 0; total = 0
+            for (d in score) {
+                total++
+                if (n < limit) n++
+                else if (!better(d, ids[n])) continue
+                ids[n] = d
+                for (i = n; i > 1 && better(ids[i], ids[i - 1]); i--) { tmp = ids[i]; ids[i] = ids[i - 1]; ids[i - 1] = tmp }
+            }
+
+            for (i = 1; i <= n; i++) want[ids[i]] = 1
+            for (i = 1; i <= n; i++) {
+                file = dir "/docs/" (ids[i] % shards) ".tsv"
+                if (file in loaded) continue
+                loaded[file] = 1
+                while ((getline line < file) > 0) {
+                    split(line, f, "\t")
+                    if (f[1] in want) doc[f[1]] = line
+                }
+                close(file)
+            }
+            report()
+        }
+        # Matching more terms wins, then score, then the newer document
+        function better(a, b) {
+            if (matched[a] != matched[b]) return matched[a] > matched[b]
+            if (score[a] != score[b]) return score[a] > score[b]
+            return date[a] > date[b]
+        }
+        function report(   i, f, out) {
+            if (json_out) {
+                out = ""
+                for (i = 1; i <= n; i++) {
+                    split(doc[ids[i]], f, "\t")
+                    out = out (i > 1 ? "," : "") "{\"project\":" json(pname[f[2]]) ",\"path\":" json(path[f[2]]) \
+                        ",\"kind\":" json(f[3]) ",\"date\":" (f[5] == "" ? "null" : json(f[5])) \
+                        ",\"status\":" (f[6] == "" ? "null" : json(f[6])) ",\"title\":" json(f[7]) \
+                        ",\"snippet\":" (f[8] == "" ? "null" : json(f[8])) ",\"score\":" sprintf("%.3f", score[ids[i]]) "}"
+                }
+                printf "{\"schema\":%d,\"kind\":\"search\",\"query\":%s,\"total\":%d,\"results\":[%s]}\n", schema, json(query), total, out
+                return
+            }
+            if (total == 0) {
+                print "No matches for: " query
+                return
+            }
+            for (i = 1; i <= n; i++) {
+                split(doc[ids[i]], f, "\t")
+                if (f[3] == "task") printf "[%s] task [%s] %s (%s)\n", pname[f[2]], f[6], f[7], f[5]
+                else printf "[%s] %s %s\n", pname[f[2]], f[3], f[7]
+                if (f[8] != "") print "    " f[8]
+            }
+            print ""
+            printf "%d of %d matches\n", n, total
+        }
+    '
+}
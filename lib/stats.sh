@@ -0,0 +1,395 @@
+#!/bin/bash
+# stats.sh - Activity rollups and claudepm stats (sourced by utils.sh)
+
+# Per-day and per-week activity rollups for standups and reviews
+# Kept in $PROJECT_CACHE_DIR/rollups and fed only the bytes LOG.md and the
+# task journal gained since the last update, so reports read a few small
+# tables instead of the whole history:
+# - days.tsv: date, log entries, tasks opened, closed, blocked
+# - weeks.tsv: Monday of the week, the same counts, days with log entries
+# - items/<Monday>.tsv: date, kind (entry, next, blocked, opened, closed,
+#   task_blocked), text
+# - state: LOG.md offset and checksum, journal offset, date and text of the
+#   newest Next: line
+# A LOG.md that shrank or changed before the offset (archiving, hand edits)
+# rebuilds the rollups from the full history, archives included.
+
+# awk helpers: YYYY-MM-DD <-> day number (days since 1970-01-01) and the
+# Monday of a date's week
+ROLLUP_DATE_AWK='
+    function day_number(date,   y, m, d, era, yoe, doy) {
+        y = substr(date, 1, 4) + 0; m = substr(date, 6, 2) + 0; d = substr(date, 9, 2) + 0
+        if (m <= 2) y--
+        era = int(y / 400)
+        yoe = y - era * 400
+        doy = int((153 * (m > 2 ? m - 3 : m + 9) + 2) / 5) + d - 1
+        return era * 146097 + yoe * 365 + int(yoe / 4) - int(yoe / 100) + doy - 719468
+    }
+    function day_date(z,   era, doe, yoe, y, doy, mp, d, m) {
+        z += 719468
+        era = int(z / 146097)
+        doe = z - era * 146097
+        yoe = int((doe - int(doe / 1460) + int(doe / 36524) - int(doe / 146096)) / 365)
+        doy = doe - (365 * yoe + int(yoe / 4) - int(yoe / 100))
+        mp = int((5 * doy + 2) / 153)
+        d = doy - int((153 * mp + 2) / 5) + 1
+        m = mp < 10 ? mp + 3 : mp - 9
+        y = yoe + era * 400 + (m <= 2)
+        return sprintf("%04d-%02d-%02d", y, m, d)
+    }
+    # 1970-01-01 was a Thursday
+    function week_of(date,   z) { z = day_number(date); return day_date(z - (z + 3) % 7) }
+'
+
+# Load the rollup state into ROLLUP_LOG_OFFSET, ROLLUP_LOG_CHECK,
+# ROLLUP_JOURNAL_OFFSET, ROLLUP_LAST_DATE and ROLLUP_LAST_NEXT
+rollup_read_state() {
+    ROLLUP_LOG_OFFSET=0
+    ROLLUP_LOG_CHECK="-"
+    ROLLUP_JOURNAL_OFFSET=0
+    ROLLUP_LAST_DATE=""
+    ROLLUP_LAST_NEXT=""
+    if [[ -f "$1/state" ]]; then
+        IFS=$'\t' read -r ROLLUP_LOG_OFFSET ROLLUP_LOG_CHECK ROLLUP_JOURNAL_OFFSET ROLLUP_LAST_DATE ROLLUP_LAST_NEXT < "$1/state" || true
+    fi
+}
+
+# Current sizes of LOG.md and the task journal (one stat) into
+# ROLLUP_LOG_SIZE and ROLLUP_JOURNAL_SIZE
+rollup_sizes() {
+    local path stamp
+    ROLLUP_LOG_SIZE=0
+    ROLLUP_JOURNAL_SIZE=0
+    while IFS=$'\t' read -r path stamp; do
+        if [[ "$path" == "LOG.md" ]]; then
+            ROLLUP_LOG_SIZE="${stamp%% *}"
+        else
+            ROLLUP_JOURNAL_SIZE="${stamp%% *}"
+        fi
+    done < <(stamp_files LOG.md "$1")
+}
+
+# Fold new LOG.md entries and task events of the current project into its rollups
+rollup_update() {
+    resolve_task_journal
+    local journal="$TASK_JOURNAL"
+    local rollups="$PROJECT_CACHE_DIR/rollups"
+    rollup_read_state "$rollups"
+    rollup_sizes "$journal"
+    if [[ -f "$rollups/state" ]] && (( ROLLUP_LOG_SIZE == ROLLUP_LOG_OFFSET && ROLLUP_JOURNAL_SIZE == ROLLUP_JOURNAL_OFFSET )); then
+        return 0
+    fi
+
+    ensure_project_cache_dir
+    mkdir -p "$rollups/items"
+    # A writer that loses the race leaves its bytes for the next update
+    if ! mkdir "$rollups/lock" 2>/dev/null; then
+        [[ -n "$(find "$rollups/lock" -maxdepth 0 -mmin +5 2>/dev/null)" ]] || return 0
+        rmdir "$rollups/lock" 2>/dev/null || true
+        mkdir "$rollups/lock" 2>/dev/null || return 0
+    fi
+    # Look again under the lock: the previous holder may have folded these
+    # bytes already. Sizes are taken under the LOG.md lock so they never
+    # fall inside a large entry that is still being written.
+    rollup_read_state "$rollups"
+    # A scanned project without a cache dir has never had a `claudepm log`
+    # that could be holding the lock, and taking it would create the dir
+    if scanning_project && [[ ! -d "$CLAUDEPM_CACHE_DIR" ]]; then
+        rollup_sizes "$journal"
+    else
+        log_lock
+        rollup_sizes "$journal"
+        log_unlock
+    fi
+    local log_offset="$ROLLUP_LOG_OFFSET" log_check="$ROLLUP_LOG_CHECK" journal_offset="$ROLLUP_JOURNAL_OFFSET"
+    local last_date="$ROLLUP_LAST_DATE" last_next="$ROLLUP_LAST_NEXT"
+    local log_size="$ROLLUP_LOG_SIZE" journal_size="$ROLLUP_JOURNAL_SIZE"
+    if [[ -f "$rollups/state" ]] && (( log_size == log_offset && journal_size == journal_offset )); then
+        rmdir "$rollups/lock"
+        return 0
+    fi
+
+    local rebuild=0
+    if [[ ! -f "$rollups/state" ]] || (( log_size < log_offset || journal_size < journal_offset )); then
+        rebuild=1
+    elif (( log_offset > 0 && log_size > log_offset )) && [[ "$(search_tail_check LOG.md "$log_offset")" != "$log_check" ]]; then
+        rebuild=1
+    fi
+    if (( rebuild )); then
+        rm -f "$rollups"/items/*.tsv "$rollups/days.tsv" "$rollups/weeks.tsv"
+        log_offset=0
+        journal_offset=0
+        last_date=""
+        last_next=""
+    fi
+
+    local work=$(mktemp -d "${TMPDIR:-/tmp}/claudepm-rollup.XXXXXX")
+    {
+        if (( rebuild )) && [[ -f "$LOG_ARCHIVE_DIR/manifest.tsv" ]]; then
+            awk -F '\t' '!/^#/ { print $1 }' "$LOG_ARCHIVE_DIR/manifest.tsv" | while IFS= read -r segment; do
+                gzip -dc "$LOG_ARCHIVE_DIR/$segment"
+            done
+        fi
+        if (( log_size > log_offset )); then
+            head -c "$log_size" LOG.md | tail -c +$(( log_offset + 1 ))
+        fi
+    } > "$work/log"
+    if (( journal_size > journal_offset )); then
+        head -c "$journal_size" "$journal" | tail -c +$(( journal_offset + 1 ))
+    fi > "$work/journal"
+    # Descriptions of tasks that changed state but were added before this batch
+    : > "$work/lookup"
+    if (( ! rebuild )); then
+        awk -F '\t' '$2 == "done" || $2 == "block" { print $3 }' "$work/journal" > "$work/uuids"
+        if [[ -s "$work/uuids" ]]; then
+            grep -hF -f "$work/uuids" ROADMAP.md "$journal" > "$work/lookup" 2>/dev/null || true
+        fi
+    elif [[ -f ROADMAP.md ]]; then
+        # A rebuild also counts tasks that only exist in ROADMAP.md, on their date
+        cp ROADMAP.md "$work/roadmap"
+    fi
+    touch "$work/roadmap"
+
+    # Count and collect per day; journal times are converted to local dates
+    awk -F '\t' -v OFS='\t' -v work="$work" -v tz="$(date +%z)" "$ROLLUP_DATE_AWK"'
+        BEGIN { tzsec = (substr(tz, 1, 1) == "-" ? -1 : 1) * (substr(tz, 2, 2) * 3600 + substr(tz, 4, 2) * 60) }
+        function count(date, field) { total[date, field]++; dates[date] = 1 }
+        function item(date, kind, text) { gsub(/\t/, " ", text); print week_of(date), date, kind, text > (work "/items") }
+        FILENAME == work "/lookup" || FILENAME == work "/roadmap" {
+            start = index($0, "CPM::TASK::")
+            if (start == 0) {
+                if ($2 == "add") desc[$3] = $5
+                next
+            }
+            # uuid::status::date::description
+            n = split(substr($0, start + 11), f, "::")
+            text = f[4]
+            for (i = 5; i <= n; i++) text = text "::" f[i]
+            # Blocked reasons are listed with the event, not the description
+            sub(/ \(Blocked: .*\)$/, "", text)
+            desc[f[1]] = text
+            if (FILENAME == work "/roadmap") { listed[++nlisted] = f[1]; listed_date[f[1]] = f[3] }
+            next
+        }
+        FILENAME == work "/journal" {
+            date = day_date(int(($1 + tzsec) / 86400))
+            if ($2 == "add") { desc[$3] = $5; added[$3] = 1; count(date, 2); item(date, "opened", $5) }
+            else if ($2 == "done") { count(date, 3); item(date, "closed", ($3 in desc) ? desc[$3] : $3) }
+            else if ($2 == "block") { count(date, 4); item(date, "task_blocked", (($3 in desc) ? desc[$3] : $3) " (" $4 ")") }
+            next
+        }
+        /^### / {
+            split($0, heading, " ")
+            date = (heading[2] ~ /^[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]$/) ? heading[2] : ""
+            if (date == "") next
+            title = $0
+            sub(/^### [^ ]+ ([0-9:]+ )?- /, "", title)
+            count(date, 1)
+            item(date, "entry", title)
+            next
+        }
+        date != "" && /^Next:/ { text = $0; sub(/^Next: */, "", text); item(date, "next", text); last_date = date; last_next = text }
+        date != "" && /^Blocked:/ { text = $0; sub(/^Blocked: */, "", text); item(date, "blocked", text) }
+        END {
+            for (i = 1; i <= nlisted; i++) {
+                u = listed[i]
+                if ((u in added) || listed_date[u] !~ /^[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]$/) continue
+                count(listed_date[u], 2)
+                item(listed_date[u], "opened", desc[u])
+            }
+            for (d in dates) print d, total[d, 1] + 0, total[d, 2] + 0, total[d, 3] + 0, total[d, 4] + 0 > (work "/days")
+            if (last_date != "") { gsub(/\t/, " ", last_next); print last_date, last_next > (work "/last") }
+        }
+    ' "$work/lookup" "$work/roadmap" "$work/journal" "$work/log"
+
+    if [[ -f "$work/days" ]]; then
+        # Add the new counts to the day table, then re-total the weeks from it
+        touch "$rollups/days.tsv"
+        awk -F '\t' -v OFS='\t' '
+            { for (i = 2; i <= 5; i++) sum[$1, i] += $i; dates[$1] = 1 }
+            END { for (d in dates) print d, sum[d, 2], sum[d, 3], sum[d, 4], sum[d, 5] }
+        ' "$rollups/days.tsv" "$work/days" | sort > "$work/days.tsv"
+        awk -F '\t' -v OFS='\t' "$ROLLUP_DATE_AWK"'
+            {
+                w = week_of($1)
+                if (w != week) { if (week != "") print week, e, o, c, b, active; week = w; e = o = c = b = active = 0 }
+                e += $2; o += $3; c += $4; b += $5; active += ($2 > 0)
+            }
+            END { if (week != "") print week, e, o, c, b, active }
+        ' "$work/days.tsv" > "$rollups/weeks.tsv"
+        mv "$work/days.tsv" "$rollups/days.tsv"
+    fi
+    if [[ -f "$work/items" ]]; then
+        sort -s -t $'\t' -k1,1 "$work/items" | awk -v target="$rollups/items" '
+            {
+                week = substr($0, 1, 10)
+                if (week != current) {
+                    if (current != "") close(file)
+                    current = week; file = target "/" week ".tsv"
+                }
+                print substr($0, 12) >> file
+            }
+        '
+    fi
+    if [[ -f "$work/last" ]]; then
+        IFS=$'\t' read -r last_date last_next < "$work/last"
+    fi
+
+    log_check="-"
+    if (( log_size > 0 )); then
+        log_check=$(search_tail_check LOG.md "$log_size")
+    fi
+    printf '%s\t%s\t%s\t%s\t%s\n' "$log_size" "$log_check" "$journal_size" "$last_date" "$last_next" > "$rollups/state"
+    rm -rf "$work"
+    rmdir "$rollups/lock" 2>/dev/null || true
+}
+
+# claudepm stats: activity summaries from the rollups
+# Periods: --days N (the last N days, default 1 = today) or --week [DATE]
+# (Monday to Sunday). --all covers every project in projects.list.
+stats_command() {
+    local all=0 json=0 days=1 week=""
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            --all)
+                all=1
+                shift
+                ;;
+            --json)
+                json=1
+                shift
+                ;;
+            --days)
+                days="${2:-1}"
+                shift 2
+                ;;
+            --week)
+                week="today"
+                shift
+                if [[ "${1:-}" =~ ^[0-9]{4}-[0-9]{2}-[0-9]{2}$ ]]; then
+                    week="$1"
+                    shift
+                fi
+                ;;
+            *)
+                echo "Error: Unknown stats option '$1'"
+                echo "Usage: claudepm stats [--days N | --week [YYYY-MM-DD]] [--all] [--json]"
+                exit 1
+                ;;
+        esac
+    done
+    if ! [[ "$days" =~ ^[1-9][0-9]*$ ]]; then
+        echo "Error: --days needs a positive number"
+        exit 1
+    fi
+
+    local projects=() line
+    if [[ $all -eq 1 ]]; then
+        if [[ -f "$CLAUDEPM_HOME/projects.list" ]]; then
+            while IFS= read -r line; do
+                if [[ -n "$line" && -f "$line/.claudepm" ]]; then
+                    projects+=("$line")
+                fi
+            done < "$CLAUDEPM_HOME/projects.list"
+        fi
+    elif [[ -f ".claudepm" ]]; then
+        projects=("$PWD")
+    else
+        echo "Error: Not a claudepm project (use --all for every registered project)"
+        exit 1
+    fi
+
+    # Refresh each project's rollups; unchanged ones cost a single stat
+    # Other projects' rollups are kept under the state dir (see scan_cache_dir)
+    local project rollups=() here="$PWD"
+    for project in ${projects[@]+"${projects[@]}"}; do
+        cd "$project" || continue
+        # Each project resolves its own journal
+        TASK_JOURNAL=""
+        if [[ $all -eq 1 ]]; then
+            scan_cache_dir "$project"
+            rollups+=("$project"$'\t'"$PROJECT_CACHE_DIR/rollups")
+        else
+            rollups+=("$project"$'\t'"$project/$CLAUDEPM_CACHE_DIR/rollups")
+        fi
+        rollup_update
+    done
+    cd "$here"
+
+    local today=$(date +%Y-%m-%d)
+    [[ "$week" == "today" ]] && week="$today"
+    printf '%s\n' ${rollups[@]+"${rollups[@]}"} | awk -F '\t' -v today="$today" \
+        -v days="$days" -v week="$week" -v json_out="$json" -v schema="$JSON_SCHEMA_VERSION" "$JSON_AWK$ROLLUP_DATE_AWK"'
+        BEGIN {
+            if (week != "") { from = week_of(week); to = day_date(day_number(from) + 6) }
+            else { to = today; from = day_date(day_number(today) - days + 1) }
+            ORDER = "entry next blocked opened closed task_blocked"
+            LABEL["entry"] = "Work"; LABEL["next"] = "Next"; LABEL["blocked"] = "Blocked"
+            LABEL["opened"] = "Opened"; LABEL["closed"] = "Closed"; LABEL["task_blocked"] = "Tasks blocked"
+            nkinds = split(ORDER, kinds, " ")
+            if (!json_out) print "Activity " from " .. " to
+        }
+        # Read one line per row of a small table into row[]; returns the count
+        function read_rows(file, rows,   n, line) {
+            n = 0
+            while ((getline line < file) > 0) rows[++n] = line
+            close(file)
+            return n
+        }
+        {
+            dir = $2
+            name = $1; sub(/.*\//, "", name)
+            e = o = c = b = active = 0
+            # A whole week is one record of weeks.tsv; other ranges add up days
+            if (week != "") {
+                n = read_rows(dir "/weeks.tsv", rows)
+                for (i = 1; i <= n; i++) {
+                    split(rows[i], f, "\t")
+                    if (f[1] == from) { e = f[2]; o = f[3]; c = f[4]; b = f[5]; active = f[6] }
+                }
+            } else {
+                n = read_rows(dir "/days.tsv", rows)
+                for (i = 1; i <= n; i++) {
+                    split(rows[i], f, "\t")
+                    if (f[1] < from || f[1] > to) continue
+                    e += f[2]; o += f[3]; c += f[4]; b += f[5]; active += (f[2] > 0)
+                }
+            }
+            # Items of the range come from the week files it overlaps
+            for (k = 1; k <= nkinds; k++) list[kinds[k]] = ""
+            nitems = 0
+            for (w = day_number(week_of(from)); w <= day_number(to); w += 7) {
+                n = read_rows(dir "/items/" day_date(w) ".tsv", rows)
+                for (i = 1; i <= n; i++) {
+                    split(rows[i], f, "\t")
+                    if (f[1] < from || f[1] > to) continue
+                    nitems++
+                    if (json_out) items = items (items == "" ? "" : ",") "{\"date\":" json(f[1]) ",\"kind\":" json(f[2]) ",\"text\":" json(f[3]) "}"
+                    else list[f[2]] = list[f[2]] "    " f[1] "  " f[3] "\n"
+                }
+            }
+            last_date = last_next = ""
+            if ((getline line < (dir "/state")) > 0) { split(line, f, "\t"); last_date = f[4]; last_next = f[5] }
+            close(dir "/state")
+
+            if (json_out) {
+                record = record (record == "" ? "" : ",") "{\"project\":" json(name) ",\"path\":" json($1) \
+                    ",\"entries\":" e ",\"active_days\":" active ",\"opened\":" o ",\"closed\":" c ",\"blocked\":" b \
+                    ",\"items\":[" items "],\"last_next\":" (last_date == "" ? "null" : "{\"date\":" json(last_date) ",\"text\":" json(last_next) "}") "}"
+                items = ""
+                next
+            }
+            print ""
+            if (nitems == 0) {
+                printf "%s: no activity%s\n", name, (last_date == "" ? "" : " (last Next: " last_date "  " last_next ")")
+                next
+            }
+            printf "%s: %d entries on %d days, %d tasks opened, %d closed, %d blocked\n", name, e, active, o, c, b
+            for (k = 1; k <= nkinds; k++) if (list[kinds[k]] != "") printf "  %s:\n%s", LABEL[kinds[k]], list[kinds[k]]
+            if (list["next"] == "" && last_date != "") print "  Last Next: " last_date "  " last_next
+        }
+        END {
+            if (json_out) printf "{\"schema\":%d,\"kind\":\"stats\",\"from\":%s,\"to\":%s,\"projects\":[%s]}\n", schema, json(from), json(to), record
+        }
+    '
+}
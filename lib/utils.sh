@@ -12,6 +12,166 @@ generate_uuid() {
     fi
 }
 
+# Directory of this library; its modules are sourced from here
+CLAUDEPM_LIB_DIR="${BASH_SOURCE[0]%/*}"
+[[ "$CLAUDEPM_LIB_DIR" != "${BASH_SOURCE[0]}" ]] || CLAUDEPM_LIB_DIR=.
+
+# Per-project directory for derived data (indexes, caches)
+CLAUDEPM_CACHE_DIR="${CLAUDEPM_CACHE_DIR:-.claudepm-cache}"
+
+# Machine-wide directory for caches that span projects (doctor, search)
+CLAUDEPM_STATE_DIR="${CLAUDEPM_STATE_DIR:-${CLAUDEPM_HOME:-$HOME/.claudepm}/cache}"
+CLAUDEPM_DAEMON_DIR="${CLAUDEPM_DAEMON_DIR:-$CLAUDEPM_STATE_DIR/daemon}"
+
+# Create the cache directory; it ignores itself so it never shows in git status
+ensure_cache_dir() {
+    if [[ ! -d "$CLAUDEPM_CACHE_DIR" ]]; then
+        mkdir -p "$CLAUDEPM_CACHE_DIR"
+        echo "*" > "$CLAUDEPM_CACHE_DIR/.gitignore"
+    fi
+}
+
+# Directory for caches derived from a project (git probe, context
+# sections, rollups). Commands that scan other projects (doctor,
+# context --all, stats --all) call scan_cache_dir first, which keeps them
+# under the state dir instead, so reading a project never writes into it.
+PROJECT_CACHE_DIR="$CLAUDEPM_CACHE_DIR"
+
+# Keep derived caches for the project at the given absolute path under the state dir
+scan_cache_dir() {
+    PROJECT_CACHE_DIR="$CLAUDEPM_STATE_DIR/projects/${1//\//%}"
+}
+
+# True while scanning another project (see scan_cache_dir)
+scanning_project() {
+    [[ "$PROJECT_CACHE_DIR" != "$CLAUDEPM_CACHE_DIR" ]]
+}
+
+# Create the derived cache directory
+ensure_project_cache_dir() {
+    if scanning_project; then
+        mkdir -p "$PROJECT_CACHE_DIR"
+    else
+        ensure_cache_dir
+    fi
+}
+
+# Print a cheap change stamp for a file (size + mtime), "missing" if absent
+file_stamp() {
+    local file="$1"
+    if [[ ! -e "$file" ]]; then
+        echo "missing"
+        return 0
+    fi
+    # GNU stat first, then BSD/macOS
+    stat -c '%s %y' "$file" 2>/dev/null || stat -f '%z %Fm' "$file"
+}
+
+# Milliseconds since the epoch (falls back to whole seconds on old date/bash)
+now_ms() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        local t="${EPOCHREALTIME/[.,]/}"
+        echo $(( ${t:0:${#t}-3} ))
+    else
+        local t=$(date +%s%N)
+        [[ "$t" == *N ]] && t=$(( ${t%N} * 1000000000 ))
+        echo $(( t / 1000000 ))
+    fi
+}
+
+# Profiling (--profile, or CLAUDEPM_PROFILE=table|json; 1 means table)
+# profile_phase NAME closes the running phase and opens NAME; the summary
+# goes to stderr on exit. Phases must be marked in the main shell, not in
+# $(...), and a repeated name accumulates. Processes are counted as system
+# PIDs allocated: the change in the kernel's last-allocated PID in
+# /proc/loadavg. That is Linux-only and includes every process started on
+# the machine meanwhile, not just claudepm's own children.
+PROFILE_NAMES=()
+PROFILE_MS=()
+PROFILE_PIDS=()
+
+# Set PROFILE_NOW (ms) and PROFILE_PID without forking when possible
+profile_sample() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        local t="${EPOCHREALTIME/[.,]/}"
+        PROFILE_NOW=$(( ${t:0:${#t}-3} ))
+    else
+        PROFILE_NOW=$(now_ms)
+    fi
+    PROFILE_PID=""
+    if [[ -r /proc/loadavg ]]; then
+        local load1 load5 load15 running
+        read -r load1 load5 load15 running PROFILE_PID < /proc/loadavg
+    fi
+}
+
+profile_start() {
+    [[ -n "${CLAUDEPM_PROFILE:-}" ]] || return 0
+    profile_sample
+    PROFILE_COMMAND="$*"
+    PROFILE_T0="$PROFILE_NOW"
+    PROFILE_PID0="${CLAUDEPM_START_PID:-$PROFILE_PID}"
+    # bin/claudepm samples the clock before it loads this library
+    if [[ -n "${CLAUDEPM_START_REALTIME:-}" ]]; then
+        local t="${CLAUDEPM_START_REALTIME/[.,]/}"
+        PROFILE_T0=$(( ${t:0:${#t}-3} ))
+    fi
+    PROFILE_PHASE="startup"
+    PROFILE_PHASE_T="$PROFILE_T0"
+    PROFILE_PHASE_PID="$PROFILE_PID0"
+    trap profile_report EXIT
+    profile_phase "dispatch"
+}
+
+profile_phase() {
+    [[ -n "${PROFILE_PHASE_T:-}" ]] || return 0
+    profile_sample
+    local ms=$(( PROFILE_NOW - PROFILE_PHASE_T )) pids=0 i
+    [[ -n "$PROFILE_PID" && -n "$PROFILE_PHASE_PID" ]] && pids=$(( PROFILE_PID - PROFILE_PHASE_PID ))
+    (( pids < 0 )) && pids=0
+    for (( i = 0; i < ${#PROFILE_NAMES[@]}; i++ )); do
+        [[ "${PROFILE_NAMES[i]}" == "$PROFILE_PHASE" ]] && break
+    done
+    PROFILE_NAMES[i]="$PROFILE_PHASE"
+    PROFILE_MS[i]=$(( ${PROFILE_MS[i]:-0} + ms ))
+    PROFILE_PIDS[i]=$(( ${PROFILE_PIDS[i]:-0} + pids ))
+    PROFILE_PHASE="${1:-other}"
+    PROFILE_PHASE_T="$PROFILE_NOW"
+    PROFILE_PHASE_PID="$PROFILE_PID"
+}
+
+profile_report() {
+    local status=$?
+    profile_phase
+    local total=$(( PROFILE_NOW - PROFILE_T0 )) pids="-" i
+    [[ -n "$PROFILE_PID" ]] && pids=$(( PROFILE_PID - PROFILE_PID0 ))
+    if [[ "$CLAUDEPM_PROFILE" == "json" ]]; then
+        {
+            printf '{"schema":1,"command":%s,"exit":%d,"total_ms":%d,"system_pids":%s,"phases":[' \
+                "$(printf '%s' "$PROFILE_COMMAND" | json_string)" "$status" "$total" "$([[ "$pids" == "-" ]] && echo null || echo "$pids")"
+            for (( i = 0; i < ${#PROFILE_NAMES[@]}; i++ )); do
+                (( i > 0 )) && printf ','
+                printf '{"name":%s,"ms":%d,"system_pids":%s}' "$(printf '%s' "${PROFILE_NAMES[i]}" | json_string)" "${PROFILE_MS[i]}" \
+                    "$([[ "$pids" == "-" ]] && echo null || echo "${PROFILE_PIDS[i]}")"
+            done
+            printf ']}\n'
+        } >&2
+    else
+        {
+            echo ""
+            echo "PROFILE: claudepm $PROFILE_COMMAND (exit $status)"
+            printf '  %-24s %8s %8s\n' "phase" "ms" "pids"
+            for (( i = 0; i < ${#PROFILE_NAMES[@]}; i++ )); do
+                printf '  %-24s %8d %8s\n' "${PROFILE_NAMES[i]}" "${PROFILE_MS[i]}" \
+                    "$([[ "$pids" == "-" ]] && echo "-" || echo "${PROFILE_PIDS[i]}")"
+            done
+            printf '  %-24s %8d %8s\n' "total" "$total" "$pids"
+            echo "  pids: system PIDs allocated (every process on the host, not only claudepm's)"
+        } >&2
+    fi
+    return "$status"
+}
+
 # Safe template copy (never overwrites)
 safe_copy_template() {
     local template="$1"
@@ -123,7 +283,14 @@ EOF
 
 # Adopt existing project
 adopt_project() {
-    local dry_run="${1:-}"
+    local dry_run="" import_args=()
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            --dry-run) dry_run="--dry-run"; shift ;;
+            --limit) import_args+=(--limit "${2:-}"); shift 2 ;;
+            *) echo "Error: Unknown adopt option: $1"; exit 1 ;;
+        esac
+    done
     
     if [[ -f ".claudepm" ]]; then
         echo "Project already adopted. Run 'claudepm upgrade' to update."
@@ -133,6 +300,7 @@ adopt_project() {
     echo "Analyzing existing project..."
     
     # Detect project type
+    profile_phase "adopt:detect"
     local project_type="unknown"
     local project_name="$(basename "$PWD")"
     local test_command=""
@@ -156,19 +324,12 @@ adopt_project() {
         run_command="python main.py"
     fi
     
-    # Find TODOs
-    local todo_count=0
-    if command -v rg >/dev/null 2>&1; then
-        todo_count=$(rg -c "TODO|FIXME" 2>/dev/null | wc -l | tr -d ' ' || echo 0)
-    else
-        todo_count=$(grep -r "TODO\|FIXME" . 2>/dev/null | wc -l | tr -d ' ' || echo 0)
-    fi
-    
+    profile_phase "adopt:files"
     if [[ "$dry_run" == "--dry-run" ]]; then
         echo -e "\n${YELLOW}DRY RUN - Would create:${NC}"
         echo "- CLAUDE.md (with discovered commands)"
         echo "- LOG.md (with adoption entry)"
-        echo "- ROADMAP.md (importing $todo_count TODOs)"
+        echo "- ROADMAP.md ($(import_todos --dry-run ${import_args[@]+"${import_args[@]}"}))"
         echo "- NOTES.md (project wisdom template)"
         echo "- .claudepm (version marker)"
         echo -e "\nProject type: $project_type"
@@ -212,7 +373,16 @@ EOF
         echo "Created: CLAUDE.md"
     fi
     
+    # Create other files
+    safe_copy_template "project/ROADMAP.md" "ROADMAP.md"
+    safe_copy_template "project/NOTES.md" "NOTES.md"
+    
+    # Import TODOs before the log entry so it can record the count
+    profile_phase "adopt:import"
+    import_todos ${import_args[@]+"${import_args[@]}"} > /dev/null
+    
     # Create LOG.md with adoption entry
+    profile_phase "adopt:files"
     if [[ ! -f "LOG.md" ]]; then
         cat > LOG.md << EOF
 # Work Log
@@ -220,7 +390,7 @@ EOF
 ### $(date '+%Y-%m-%d %H:%M') - Adopted project into claudepm
 Did:
 - ANALYZED: Project structure and discovered $project_type project
-- FOUND: $todo_count existing TODOs to import
+- IMPORTED: $IMPORTED_TODOS existing TODOs into ROADMAP.md
 - DISCOVERED: Test command: $test_command
 - CREATED: Initial claudepm files based on analysis
 Next: Review imported items and update ROADMAP.md
@@ -231,28 +401,148 @@ EOF
         echo "Created: LOG.md"
     fi
     
-    # Create other files
-    safe_copy_template "project/ROADMAP.md" "ROADMAP.md"
-    safe_copy_template "project/NOTES.md" "NOTES.md"
-    
-    # Import TODOs if found
-    if [[ $todo_count -gt 0 ]]; then
-        echo -e "\n## Imported TODOs\n" >> ROADMAP.md
-        if command -v rg >/dev/null 2>&1; then
-            rg "TODO|FIXME" --no-heading | while read -r line; do
-                echo "CPM::TASK::$(generate_uuid)::TODO::$(date +%Y-%m-%d)::$line" >> ROADMAP.md
-            done
-        fi
-    fi
-    
     # Complete adoption
+    profile_phase "adopt:init"
     init_project "project"
     
     echo -e "\n${GREEN}✓ Project adopted!${NC}"
-    echo "Found and imported $todo_count TODOs"
+    echo "$IMPORT_SUMMARY"
     echo "Run 'claudepm health' to check status"
 }
 
+# Files claudepm owns; never scanned for TODOs
+IMPORT_SKIP_FILES="ROADMAP.md LOG.md CLAUDE.md NOTES.md"
+
+# Print every TODO/FIXME as path:line:text, honoring ignore rules
+# rg and git grep respect .gitignore; plain grep skips the discovery prune
+# list and hidden dirs. Sets TODO_SCANNER to the tool used.
+scan_todos() {
+    local pattern='TODO|FIXME'
+    if command -v rg >/dev/null 2>&1; then
+        TODO_SCANNER="rg"
+        rg --no-heading --line-number --no-messages --color never -e "$pattern" || true
+    elif git rev-parse --is-inside-work-tree >/dev/null 2>&1; then
+        TODO_SCANNER="git grep"
+        git grep -n -I -E --untracked --exclude-standard -e "$pattern" || true
+    else
+        TODO_SCANNER="grep"
+        local excludes=() name
+        # Hidden dirs (.git, .venv, caches) are skipped like rg does
+        for name in $DISCOVER_PRUNE "$LOG_ARCHIVE_DIR" '.?*'; do
+            excludes+=("--exclude-dir=$name")
+        done
+        grep -rnIE "${excludes[@]}" -e "$pattern" . 2>/dev/null | sed 's|^\./||' || true
+    fi
+}
+
+# Turn scanner matches into CPM::TASK lines in a single awk pass
+# Descriptions are "path: text" (no line number, so re-imports after edits
+# dedup cleanly). Skips descriptions already in the task list and stops
+# after limit new tasks (0 = no limit). Writes "found dup over" to stats.
+# UUIDs come from the kernel (one read per task, no fork) where it offers
+# them; otherwise from rand() seeded with the time, PID and $RANDOM. Either
+# way an ID already in the task list or this batch is drawn again.
+build_todo_tasks() {
+    local matches="$1"
+    local existing="$2"
+    local limit="$3"
+    local stats="$4"
+    local kernel_uuid="/proc/sys/kernel/random/uuid"
+    [[ -r "$kernel_uuid" ]] || kernel_uuid=""
+    
+    awk -v matches="$matches" -v limit="$limit" -v stats="$stats" \
+        -v today="$(date +%Y-%m-%d)" -v seed="$(( ($(date +%s) * 32768 + $$ * 1024 + RANDOM) % 2147483647 ))" \
+        -v kernel_uuid="$kernel_uuid" -v skip="$IMPORT_SKIP_FILES" '
+        function hex(n,   s) {
+            s = ""
+            while (n-- > 0) s = s substr("0123456789abcdef", int(rand() * 16) + 1, 1)
+            return s
+        }
+        # Random (version 4) UUID without forking uuidgen per task
+        function uuid(   id) {
+            do {
+                id = ""
+                if (kernel_uuid != "") {
+                    getline id < kernel_uuid
+                    close(kernel_uuid)
+                }
+                if (id == "")
+                    id = hex(8) "-" hex(4) "-4" hex(3) "-" substr("89ab", int(rand() * 4) + 1, 1) hex(3) "-" hex(12)
+            } while (id in ids)
+            ids[id] = 1
+            return id
+        }
+        BEGIN {
+            srand(seed)
+            n = split(skip, s, " ")
+            for (i = 1; i <= n; i++) skipped[s[i]] = 1
+        }
+        FILENAME != matches { split($0, f, "\t"); seen[f[4]] = 1; ids[f[1]] = 1; next }
+        {
+            i = index($0, ":"); path = substr($0, 1, i - 1); rest = substr($0, i + 1)
+            i = index(rest, ":"); text = substr(rest, i + 1)
+            if (path in skipped) next
+            found++
+            gsub(/\t/, " ", text)
+            sub(/^[ ]+/, "", text); sub(/[ ]+$/, "", text)
+            desc = path ": " text
+            if (desc in seen) { dup++; next }
+            if (limit > 0 && added >= limit) { over++; next }
+            seen[desc] = 1
+            added++
+            print "CPM::TASK::" uuid() "::TODO::" today "::" desc
+        }
+        END { print found + 0, dup + 0, over + 0 > stats }
+    ' "$existing" "$matches"
+}
+
+# Import TODO/FIXME comments into ROADMAP.md as tasks
+# Usage: import_todos [--dry-run] [--limit N]
+# One ignore-aware scan, one awk pass and one append, however many TODOs.
+# Sets IMPORTED_TODOS and IMPORT_SUMMARY, and prints the summary.
+import_todos() {
+    local dry_run="" limit="${CLAUDEPM_IMPORT_LIMIT:-0}"
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            --dry-run) dry_run=1; shift ;;
+            --limit) limit="${2:-0}"; shift 2 ;;
+            *) echo "Error: Unknown import option: $1"; exit 1 ;;
+        esac
+    done
+    if [[ ! "$limit" =~ ^[0-9]+$ ]]; then
+        echo "Error: --limit must be a number"
+        exit 1
+    fi
+    
+    local start=$(now_ms)
+    local work=$(mktemp -d)
+    scan_todos > "$work/matches"
+    if [[ -f "ROADMAP.md" ]]; then
+        parse_tasks > "$work/existing"
+    else
+        : > "$work/existing"
+    fi
+    build_todo_tasks "$work/matches" "$work/existing" "$limit" "$work/stats" > "$work/tasks"
+    
+    local found dup over
+    read -r found dup over < "$work/stats"
+    IMPORTED_TODOS=$(( found - dup - over ))
+    
+    if [[ -z "$dry_run" && $IMPORTED_TODOS -gt 0 ]]; then
+        # One buffered append; the heading is written once per ROADMAP.md
+        {
+            grep -q '^## Imported TODOs' ROADMAP.md 2>/dev/null || printf '\n## Imported TODOs\n\n'
+            cat "$work/tasks"
+        } >> ROADMAP.md
+    fi
+    rm -rf "$work"
+    
+    local verb="Imported"
+    [[ -n "$dry_run" ]] && verb="Would import"
+    IMPORT_SUMMARY="$verb $IMPORTED_TODOS TODOs ($found found, $dup duplicates, $over over limit) in $(( $(now_ms) - start ))ms using $TODO_SCANNER"
+    echo "$IMPORT_SUMMARY"
+}
+
 # Check project health
 health_check() {
     if [[ ! -f ".claudepm" ]]; then
@@ -261,6 +551,7 @@ health_check() {
         exit 1
     fi
     
+    profile_phase "health:version"
     local project_name=$(basename "$PWD")
     local version=$(grep "template_version" .claudepm | cut -d'=' -f2)
     
@@ -274,8 +565,9 @@ health_check() {
     fi
     
     # Check last activity
+    profile_phase "health:log"
     if [[ -f "LOG.md" ]]; then
-        local last_log=$(grep "^### " LOG.md | tail -1 | cut -d' ' -f2)
+        local last_log=$(log_last_date LOG.md)
         local days_ago=$(( ($(date +%s) - $(date -d "$last_log" +%s 2>/dev/null || echo $(date +%s))) / 86400 ))
         if [[ $days_ago -lt 7 ]]; then
             echo -e "${GREEN}✓ Last activity: $days_ago days ago${NC}"
@@ -285,20 +577,22 @@ health_check() {
     fi
     
     # Check git status
-    if git status --porcelain 2>/dev/null | grep -q .; then
-        echo -e "${YELLOW}⚠ Git status: Uncommitted changes${NC}"
+    profile_phase "health:git"
+    git_probe
+    if [[ "$GIT_PROBE_STATE" == "timeout" ]]; then
+        echo -e "${YELLOW}⚠ Git status: Timed out after ${CLAUDEPM_GIT_TIMEOUT:-5}s${NC}"
+    elif [[ "$GIT_CHANGES" -gt 0 ]]; then
+        echo -e "${YELLOW}⚠ Git status: Uncommitted changes ($GIT_CHANGES files)${NC}"
     else
         echo -e "${GREEN}✓ Git status: Clean${NC}"
     fi
     
     # Check blocked tasks
+    profile_phase "health:tasks"
     if [[ -f "ROADMAP.md" ]]; then
-        local blocked_count=$(grep -c "::BLOCKED::" ROADMAP.md 2>/dev/null | tr -d ' \n' || echo 0)
-        local active_count=$(grep -E "::TODO::|::IN_PROGRESS::" ROADMAP.md 2>/dev/null | wc -l | tr -d ' \n' || echo 0)
-        
-        # Ensure we have valid numbers
-        blocked_count=${blocked_count:-0}
-        active_count=${active_count:-0}
+        local todo_count progress_count blocked_count done_count
+        read -r todo_count progress_count blocked_count done_count < <(task_counts ROADMAP.md)
+        local active_count=$((todo_count + progress_count))
         
         if [[ "$blocked_count" -gt 0 ]]; then
             echo -e "${YELLOW}⚠ Blocked tasks: $blocked_count${NC}"
@@ -309,27 +603,379 @@ health_check() {
     fi
 }
 
+# Files whose stamps decide whether a cached doctor status is still valid
+DOCTOR_STAMP_FILES=(".claudepm" "LOG.md" "ROADMAP.md" ".claudepm-cache/tasks.journal" ".git/index" ".git/HEAD")
+
+# GNU or BSD stat, probed once per process
+stat_flavor() {
+    if [[ -z "${STAT_FLAVOR:-}" ]]; then
+        if stat -c '%s' / >/dev/null 2>&1; then
+            STAT_FLAVOR="gnu"
+        else
+            STAT_FLAVOR="bsd"
+        fi
+    fi
+}
+
+# Print "path<TAB>stamp" for each existing file named on stdin (NUL-separated)
+# One stat call for the whole batch; stamps use the same format as file_stamp
+batch_stamps() {
+    stat_flavor
+    if [[ "$STAT_FLAVOR" == "gnu" ]]; then
+        xargs -0 stat -c $'%n\t%s %y' 2>/dev/null || true
+    else
+        xargs -0 stat -f $'%N\t%z %Fm' 2>/dev/null || true
+    fi
+}
+
+# Same as batch_stamps for a few files given as arguments (one fork, no xargs)
+stamp_files() {
+    stat_flavor
+    if [[ "$STAT_FLAVOR" == "gnu" ]]; then
+        stat -c $'%n\t%s %y' "$@" 2>/dev/null || true
+    else
+        stat -f $'%N\t%z %Fm' "$@" 2>/dev/null || true
+    fi
+}
+
+# Seconds since the epoch (no fork on bash 5)
+now_s() {
+    if [[ -n "${EPOCHSECONDS:-}" ]]; then
+        echo "$EPOCHSECONDS"
+    else
+        date +%s
+    fi
+}
+
+# Run a command with a timeout in seconds; returns 124 when it expires
+run_with_timeout() {
+    local seconds="$1"
+    shift
+    if command -v timeout >/dev/null 2>&1; then
+        timeout "$seconds" "$@"
+    elif command -v gtimeout >/dev/null 2>&1; then
+        gtimeout "$seconds" "$@"
+    else
+        # Plain bash fallback (macOS without coreutils)
+        "$@" &
+        local pid=$!
+        ( sleep "$seconds"; kill "$pid" 2>/dev/null ) >/dev/null 2>&1 &
+        local watcher=$!
+        local rc=0
+        wait "$pid" || rc=$?
+        kill "$watcher" 2>/dev/null || true
+        [[ $rc -eq 143 ]] && rc=124
+        return $rc
+    fi
+}
+
+# Git directory of the current directory, found without forking git
+# Empty when the current directory is not the top of a work tree
+find_git_dir() {
+    GIT_DIR_PATH=""
+    if [[ -d ".git" ]]; then
+        GIT_DIR_PATH=".git"
+    elif [[ -f ".git" ]]; then
+        local line
+        read -r line < .git
+        GIT_DIR_PATH="${line#gitdir: }"
+    fi
+}
+
+# Load probe fields ("field<TAB>value" lines) from stdin into GIT_* variables
+load_git_probe() {
+    local field value
+    while IFS=$'\t' read -r field value; do
+        case "$field" in
+            state) GIT_PROBE_STATE="$value" ;;
+            branch) GIT_BRANCH="$value" ;;
+            changes) GIT_CHANGES="$value" ;;
+            commit) GIT_COMMIT_TIME="$value" ;;
+            path) GIT_TOP_PATHS="$GIT_TOP_PATHS$value"$'\n' ;;
+        esac
+    done
+}
+
+# Shared git probe for context, health and doctor
+# Sets GIT_PROBE_STATE (ok, timeout or none), GIT_BRANCH, GIT_CHANGES,
+# GIT_COMMIT_TIME (epoch) and GIT_TOP_PATHS (up to CLAUDEPM_GIT_TOP
+# "XY path" lines, like `git status --porcelain`).
+# One `git status` call per miss, bounded by CLAUDEPM_GIT_TIMEOUT seconds.
+# Results are cached in $PROJECT_CACHE_DIR/git.probe, keyed on the stamps
+# of .git/index and .git/HEAD and trusted for CLAUDEPM_GIT_CACHE_TTL seconds.
+# While scanning, git is asked not to refresh the index (GIT_OPTIONAL_LOCKS).
+# CLAUDEPM_GIT_UNTRACKED=no skips untracked files (-uno) on huge trees.
+git_probe() {
+    GIT_PROBE_STATE="none"
+    GIT_BRANCH=""
+    GIT_CHANGES=0
+    GIT_COMMIT_TIME=""
+    GIT_TOP_PATHS=""
+    
+    local cache="$PROJECT_CACHE_DIR/git.probe"
+    local now=$(now_s)
+    local key=""
+    local untracked=()
+    [[ "${CLAUDEPM_GIT_UNTRACKED:-}" == "no" ]] && untracked=(-uno)
+    find_git_dir
+    if [[ -n "$GIT_DIR_PATH" ]]; then
+        key=$(stamp_files "$GIT_DIR_PATH/index" "$GIT_DIR_PATH/HEAD")
+        key="${untracked[*]+${untracked[*]};}${key//$'\n'/;}"
+        if [[ -f "$cache" ]]; then
+            local saved_at saved_key
+            { read -r saved_at; read -r saved_key; } < "$cache"
+            if [[ "$saved_key" == "$key" && $(( now - ${saved_at:-0} )) -lt ${CLAUDEPM_GIT_CACHE_TTL:-30} ]]; then
+                load_git_probe < "$cache"
+                return 0
+            fi
+        fi
+    fi
+    
+    local output rc=0 optional_locks=1
+    scanning_project && optional_locks=0
+    output=$(GIT_OPTIONAL_LOCKS=$optional_locks run_with_timeout "${CLAUDEPM_GIT_TIMEOUT:-5}" \
+        git status --porcelain=v2 --branch ${untracked[@]+"${untracked[@]}"} 2>/dev/null) || rc=$?
+    if [[ $rc -eq 124 ]]; then
+        GIT_PROBE_STATE="timeout"
+        return 0
+    fi
+    [[ $rc -eq 0 ]] || return 0
+    
+    local commit_time=$(git log -1 --format=%ct 2>/dev/null || true)
+    local probe=$(printf '%s\n' "$output" | awk -v top="${CLAUDEPM_GIT_TOP:-5}" '
+        BEGIN { OFS = "\t"; print "state", "ok" }
+        /^# branch.head / { print "branch", substr($0, 15); next }
+        /^#/ || NF == 0 { next }
+        {
+            changes++
+            if (changes > top) next
+            xy = $2
+            path = $0
+            # Path follows a fixed number of fields per record type
+            skip = ($1 == "1") ? 8 : ($1 == "2") ? 9 : ($1 == "u") ? 10 : 1
+            for (i = 0; i < skip; i++) sub(/^[^ ]+ /, "", path)
+            if ($1 == "2") sub(/\t.*/, "", path)
+            if ($1 == "?" || $1 == "!") xy = $1 $1
+            gsub(/\./, " ", xy)
+            print "path", xy " " path
+        }
+        END { print "changes", changes + 0 }
+    ')
+    probe="$probe"$'\n'"commit"$'\t'"$commit_time"
+    load_git_probe <<< "$probe"
+    
+    # Only cache inside claudepm projects; status may have refreshed the index, so re-stamp
+    if [[ -n "$GIT_DIR_PATH" && -f ".claudepm" ]]; then
+        key=$(stamp_files "$GIT_DIR_PATH/index" "$GIT_DIR_PATH/HEAD")
+        key="${untracked[*]+${untracked[*]};}${key//$'\n'/;}"
+        ensure_project_cache_dir
+        printf '%s\n%s\n%s\n' "$now" "$key" "$probe" > "$cache.$$"
+        mv "$cache.$$" "$cache"
+    fi
+}
+
+# Scan one project for doctor
+# Prints: dir, template version, last log epoch (- if none), blocked task count,
+# uncommitted file count (- if not a git repository)
+doctor_scan_project() {
+    local dir="$1"
+    cd "$dir" 2>/dev/null || return 0
+    scan_cache_dir "$dir"
+    
+    local version="unknown" key value
+    while IFS='=' read -r key value; do
+        [[ "$key" == "template_version" ]] && version="$value"
+    done < .claudepm
+    
+    local last_epoch="-"
+    if [[ -f "LOG.md" ]]; then
+        local last_log=$(log_last_date LOG.md)
+        if [[ -n "$last_log" ]]; then
+            last_epoch=$(date -d "$last_log" +%s 2>/dev/null || echo "-")
+        fi
+    fi
+    
+    local todo_count progress_count blocked_count done_count
+    read -r todo_count progress_count blocked_count done_count < <(task_counts ROADMAP.md)
+    
+    git_probe
+    local git_changes="-"
+    [[ "$GIT_PROBE_STATE" == "ok" ]] && git_changes="$GIT_CHANGES"
+    printf '%s\t%s\t%s\t%s\t%s\n' "$dir" "$version" "$last_epoch" "$blocked_count" "$git_changes"
+}
+
+# Directory names never descended into while discovering projects
+DISCOVER_PRUNE="node_modules worktrees vendor dist build target __pycache__"
+
+# Load gitignore-style exclude patterns from the given files into DISCOVER_IGNORE
+# Supported: blank lines, # comments, trailing / and leading / (anchored)
+load_discover_ignore() {
+    DISCOVER_IGNORE=()
+    local file line
+    for file in "$@"; do
+        [[ -f "$file" ]] || continue
+        while IFS= read -r line || [[ -n "$line" ]]; do
+            [[ -z "$line" || "$line" == \#* || "$line" == \!* ]] && continue
+            DISCOVER_IGNORE+=("${line%/}")
+        done < "$file"
+    done
+}
+
+# Check a directory against DISCOVER_IGNORE (rel path from the root, basename)
+discover_ignored() {
+    local rel="$1" name="$2" pattern
+    for pattern in "${DISCOVER_IGNORE[@]+"${DISCOVER_IGNORE[@]}"}"; do
+        if [[ "$pattern" == */* ]]; then
+            [[ "$rel" == ${pattern#/} ]] && return 0
+        else
+            [[ "$name" == $pattern ]] && return 0
+        fi
+    done
+    return 1
+}
+
+# Check whether a .claudepm marker belongs to a task-agent worktree
+is_task_agent_marker() {
+    local line
+    while IFS= read -r line; do
+        [[ "$line" == *'"role"'*'"task-agent"'* ]] && return 0
+    done < "$1"
+    return 1
+}
+
+# Print the absolute directory of every project under the given roots
+# Breadth-first walk that skips hidden, pruned and ignored directories,
+# stops descending at the first project root and at depth_limit levels.
+# Sets DISCOVER_DIRS_WALKED to the number of directories visited.
+discover_projects() {
+    local depth_limit="$1"
+    shift
+    local root dir sub name level
+    local queue next
+    DISCOVER_DIRS_WALKED=0
+    for root in "$@"; do
+        [[ -d "$root" ]] || continue
+        root=$(cd "$root" && pwd)
+        load_discover_ignore "$CLAUDEPM_CONFIG/ignore" "$root/.claudepmignore"
+        queue=("$root")
+        level=0
+        while [[ ${#queue[@]} -gt 0 ]]; do
+            next=()
+            for dir in "${queue[@]}"; do
+                DISCOVER_DIRS_WALKED=$((DISCOVER_DIRS_WALKED + 1))
+                if [[ -f "$dir/.claudepm" ]]; then
+                    is_task_agent_marker "$dir/.claudepm" || echo "$dir"
+                    continue
+                fi
+                [[ $level -lt $depth_limit ]] || continue
+                # Globs skip hidden directories (.git, .venv, ...) by default
+                for sub in "$dir"/*/; do
+                    sub="${sub%/}"
+                    [[ -d "$sub" && ! -L "$sub" ]] || continue
+                    name="${sub##*/}"
+                    case " $DISCOVER_PRUNE " in
+                        *" $name "*) continue ;;
+                    esac
+                    discover_ignored "${sub#$root/}" "$name" && continue
+                    next+=("$sub")
+                done
+            done
+            queue=("${next[@]+"${next[@]}"}")
+            level=$((level + 1))
+        done
+    done
+}
+
 # Doctor - system-wide health check
+# Cached status rows (dir, version, epoch, blocked, git) in discovery order
+doctor_report_rows() {
+    awk -F '\t' -v OFS='\t' '
+        NR == FNR { row[$1] = $3 OFS $4 OFS $5 OFS $6; next }
+        ($0 in row) { print $0, row[$0] }
+    ' "$1" "$2"
+}
+
+# doctor --json/--ndjson: status rows on stdin as doctor_project records
+# cached is 1 or 0 for every row, or looked up per project in a hits file.
+# Each record is flushed as soon as its row arrives.
+doctor_json_records() {
+    awk -F '\t' -v cached="$1" -v hits="${2:-}" -v now="$(now_s)" -v current="$CLAUDEPM_VERSION" \
+        -v schema="$JSON_SCHEMA_VERSION" "$JSON_AWK"'
+        BEGIN {
+            if (hits != "") while ((getline line < hits) > 0) { split(line, f, "\t"); hit[f[1]] = 1 }
+        }
+        {
+            status = "active"
+            if ($3 != "-" && int((now - $3) / 86400) > 7) status = "stale"
+            if ($2 != current) status = "outdated"
+            if ($4 > 0) status = "blocked"
+            name = $1; sub(/.*\//, "", name)
+            printf "{\"schema\":%d,\"kind\":\"doctor_project\",\"project\":%s,\"path\":%s,\"version\":%s,", schema, json(name), json($1), json($2)
+            printf "\"status\":%s,\"last_activity\":%s,\"blocked\":%d,\"uncommitted\":%s,\"cached\":%s}\n",
+                json(status), ($3 == "-" ? "null" : $3 + 0), $4, ($5 == "-" ? "null" : $5 + 0),
+                ((hits != "" ? ($1 in hit) : cached) ? "true" : "false")
+            fflush()
+        }
+    '
+}
+
 doctor_check() {
-    echo "Checking claudepm installation..."
-    echo -e "${GREEN}✓ Version: $CLAUDEPM_VERSION${NC}"
-    echo -e "${GREEN}✓ Templates: Current${NC}"
-    
-    if command -v claudepm >/dev/null 2>&1; then
-        echo -e "${GREEN}✓ Path: Configured${NC}"
-    else
-        echo -e "${YELLOW}⚠ Path: Not in PATH${NC}"
-        echo "  Add to PATH: export PATH=\"\$HOME/.claudepm/bin:\$PATH\""
+    local jobs="${CLAUDEPM_JOBS:-8}"
+    local depth="${CLAUDEPM_DISCOVER_DEPTH:-4}"
+    local use_cache=1
+    local format="text"
+    local paths=()
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            --json|--ndjson)
+                format="${1#--}"
+                shift
+                ;;
+            -j|--jobs)
+                jobs="${2:-}"
+                shift 2
+                ;;
+            --depth)
+                depth="${2:-}"
+                shift 2
+                ;;
+            --no-cache)
+                use_cache=0
+                shift
+                ;;
+            *)
+                paths+=("$1")
+                shift
+                ;;
+        esac
+    done
+    if [[ ! "$jobs" =~ ^[1-9][0-9]*$ ]]; then
+        echo "Error: --jobs needs a positive number"
+        echo "Usage: claudepm doctor [--json|--ndjson] [-j jobs] [--depth N] [--no-cache] [paths]"
+        exit 1
     fi
     
-    echo -e "\nScanning for projects..."
+    profile_phase "doctor:install"
+    # JSON modes print nothing but records on stdout
+    if [[ "$format" == "text" ]]; then
+        echo "Checking claudepm installation..."
+        echo -e "${GREEN}✓ Version: $CLAUDEPM_VERSION${NC}"
+        echo -e "${GREEN}✓ Templates: Current${NC}"
+    
+        if command -v claudepm >/dev/null 2>&1; then
+            echo -e "${GREEN}✓ Path: Configured${NC}"
+        else
+            echo -e "${YELLOW}⚠ Path: Not in PATH${NC}"
+            echo "  Add to PATH: export PATH=\"\$HOME/.claudepm/bin:\$PATH\""
+        fi
+    
+        echo -e "\nScanning for projects..."
+    fi
     
-    local paths=("$@")
     if [[ ${#paths[@]} -eq 0 ]]; then
         # Use projects.list if no paths provided
         if [[ -f "$CLAUDEPM_HOME/projects.list" ]]; then
             # Read file into array (bash 3 compatible)
-            paths=()
             while IFS= read -r line; do
                 [[ -n "$line" ]] && paths+=("$line")
             done < "$CLAUDEPM_HOME/projects.list"
@@ -338,41 +984,490 @@ doctor_check() {
         fi
     fi
     
-    for path in "${paths[@]}"; do
-        if [[ -d "$path" ]]; then
-            find "$path" -name ".claudepm" -type f 2>/dev/null | while read -r marker; do
-                local dir=$(dirname "$marker")
-                local name=$(basename "$dir")
-                local version=$(grep "template_version" "$marker" 2>/dev/null | cut -d'=' -f2 || echo "unknown")
-                
-                # Quick status check
-                cd "$dir" 2>/dev/null || continue
-                local status="🟢 Active"
-                
-                if [[ -f "LOG.md" ]]; then
-                    local last_log=$(grep "^### " LOG.md 2>/dev/null | tail -1 | cut -d' ' -f2)
-                    if [[ -n "$last_log" ]]; then
-                        local days_ago=$(( ($(date +%s) - $(date -d "$last_log" +%s 2>/dev/null || echo $(date +%s))) / 86400 ))
-                        [[ $days_ago -gt 7 ]] && status="⚫ Stale"
-                    fi
-                fi
-                
-                [[ "$version" != "$CLAUDEPM_VERSION" ]] && status="🟠 Outdated"
-                grep -q "::BLOCKED::" ROADMAP.md 2>/dev/null && status="🟠 Blocked"
-                
-                printf "%-20s v%-6s %s\n" "$name:" "$version" "$status"
-                cd - >/dev/null
-            done
+    local work=$(mktemp -d "${TMPDIR:-/tmp}/claudepm-doctor.XXXXXX")
+    local cache="$CLAUDEPM_STATE_DIR/doctor.tsv"
+    mkdir -p "$CLAUDEPM_STATE_DIR"
+    [[ -f "$cache" ]] || touch "$cache"
+    
+    # 1. Discover project directories (absolute, in scan order)
+    profile_phase "doctor:discover"
+    local started=$(now_ms)
+    discover_projects "$depth" "${paths[@]}" > "$work/found"
+    awk '!seen[$0]++' "$work/found" > "$work/dirs"
+    local project_count=$(wc -l < "$work/dirs" | tr -d ' ')
+    if [[ "$format" == "text" ]]; then
+        echo "Discovered $project_count projects in $(( $(now_ms) - started ))ms ($DISCOVER_DIRS_WALKED directories walked)"
+    fi
+    
+    # 2. Stamp every input file of every project with a single stat batch
+    profile_phase "doctor:stamp"
+    local dir file
+    while IFS= read -r dir; do
+        for file in "${DOCTOR_STAMP_FILES[@]}"; do
+            printf '%s/%s\0' "$dir" "$file"
+        done
+    done < "$work/dirs" | batch_stamps > "$work/stamps"
+    
+    # 3. Build cache keys and split projects into cache hits and misses
+    local stamp_files="${DOCTOR_STAMP_FILES[*]}"
+    awk -F '\t' -v OFS='\t' -v files="$stamp_files" -v use_cache="$use_cache" -v work="$work" '
+        BEGIN { nfiles = split(files, names, " ") }
+        FILENAME == work "/stamps" { stamp[$1] = $2; next }
+        FILENAME == work "/dirs" {
+            key = ""
+            for (i = 1; i <= nfiles; i++) {
+                p = $0 "/" names[i]
+                key = key ((p in stamp) ? stamp[p] : "-") ";"
+            }
+            if (use_cache && cached_key[$0] == key) {
+                print $0, key, cached[$0] > (work "/hits")
+            } else {
+                print $0 > (work "/misses")
+                print $0, key > (work "/miss_keys")
+            }
+            next
+        }
+        { cached_key[$1] = $2; cached[$1] = $3 OFS $4 OFS $5 OFS $6 }
+    ' "$cache" "$work/stamps" "$work/dirs"
+    touch "$work/hits" "$work/misses" "$work/miss_keys"
+    
+    # Streaming: cached projects are known now, scanned ones as workers finish
+    if [[ "$format" == "ndjson" ]]; then
+        cut -f 1,3- "$work/hits" | doctor_json_records 1
+    fi
+    
+    # 4. Scan cache misses on a bounded worker pool
+    profile_phase "doctor:scan"
+    : > "$work/scanned"
+    if [[ -s "$work/misses" ]]; then
+        tr '\n' '\0' < "$work/misses" | xargs -0 -n 1 -P "$jobs" \
+            bash -c 'source "$1/lib/utils.sh"; doctor_scan_project "$2"' _ "$CLAUDEPM_HOME" |
+            if [[ "$format" == "ndjson" ]]; then
+                tee "$work/scanned" | doctor_json_records 0
+            else
+                cat > "$work/scanned"
+            fi
+    fi
+    
+    # 5. Refresh the cache: keep other roots' entries, replace this run's
+    profile_phase "doctor:cache"
+    awk -F '\t' -v OFS='\t' -v work="$work" '
+        FILENAME == work "/miss_keys" { key[$1] = $2; next }
+        FILENAME == work "/scanned" { print $1, key[$1], $2, $3, $4, $5 > (work "/fresh"); fresh[$1] = 1; next }
+        FILENAME == work "/hits" { print; fresh[$1] = 1; next }
+        !($1 in fresh) { print }
+    ' "$work/miss_keys" "$work/scanned" "$work/hits" "$cache" > "$work/cache.new"
+    [[ -f "$work/fresh" ]] && cat "$work/fresh" >> "$work/cache.new"
+    # Staged next to the cache so the rename is atomic; concurrent runs each
+    # replace it whole, and this run reports from its own copy
+    cp "$work/cache.new" "$cache.$$"
+    mv -f "$cache.$$" "$cache"
+    
+    # 6. Report in discovery order
+    profile_phase "doctor:report"
+    local hits=$(wc -l < "$work/hits" | tr -d ' ')
+    local misses=$(wc -l < "$work/misses" | tr -d ' ')
+    if [[ "$format" != "text" ]]; then
+        local summary
+        printf -v summary '{"schema":%d,"kind":"doctor_summary","projects":%d,"cache_hits":%d,"cache_misses":%d,"elapsed_ms":%d}' \
+            "$JSON_SCHEMA_VERSION" "$project_count" "$hits" "$misses" "$(( $(now_ms) - started ))"
+        if [[ "$format" == "ndjson" ]]; then
+            echo "$summary"
+        else
+            printf '{"schema":%d,"kind":"doctor","projects":[' "$JSON_SCHEMA_VERSION"
+            doctor_report_rows "$work/cache.new" "$work/dirs" | doctor_json_records 0 "$work/hits" | paste -sd ',' -
+            printf '],"summary":%s}\n' "$summary"
         fi
-    done
+        rm -rf "$work"
+        return 0
+    fi
+    
+    local now=$(date +%s)
+    local version last_epoch blocked git_changes status days_ago
+    while IFS=$'\t' read -r dir version last_epoch blocked git_changes; do
+        status="🟢 Active"
+        if [[ "$last_epoch" != "-" ]]; then
+            days_ago=$(( (now - last_epoch) / 86400 ))
+            [[ $days_ago -gt 7 ]] && status="⚫ Stale"
+        fi
+        [[ "$version" != "$CLAUDEPM_VERSION" ]] && status="🟠 Outdated"
+        [[ "$blocked" -gt 0 ]] && status="🟠 Blocked"
+        [[ "$git_changes" != "-" && "$git_changes" -gt 0 ]] && status="$status ($git_changes uncommitted)"
+        printf "%-20s v%-6s %s\n" "${dir##*/}:" "$version" "$status"
+    done < <(doctor_report_rows "$work/cache.new" "$work/dirs")
+    
+    echo -e "\nCache: $hits hits, $misses misses"
+    rm -rf "$work"
     
     echo -e "\nRun 'claudepm upgrade' in outdated projects"
 }
 
+# Parse CPM::TASK lines from a roadmap file in a single pass
+# Prints one tab-separated record per task: uuid, status, date, description
+parse_roadmap_tasks() {
+    local file="${1:-ROADMAP.md}"
+    
+    [[ -f "$file" ]] || return 0
+    awk '
+        {
+            start = index($0, "CPM::TASK::")
+            if (start == 0) next
+            rest = substr($0, start + 11)
+            # uuid, status and date, then everything else is the description
+            for (n = 1; n <= 3; n++) {
+                i = index(rest, "::")
+                if (i == 0) { f[n] = rest; rest = ""; for (m = n + 1; m <= 3; m++) f[m] = ""; break }
+                f[n] = substr(rest, 1, i - 1)
+                rest = substr(rest, i + 2)
+            }
+            gsub(/\t/, " ", rest)
+            printf "%s\t%s\t%s\t%s\n", f[1], f[2], f[3], rest
+        }
+    ' "$file"
+}
+
+# Filter task records on stdin by status, stopping after a limit (0 = all)
+filter_tasks() {
+    local status_filter="${1:-}"
+    local limit="${2:-0}"
+    awk -F '\t' -v want="$status_filter" -v limit="$limit" '
+        want != "" && $2 != want { next }
+        { print; if (limit > 0 && ++shown >= limit) exit }
+    '
+}
+
+# Blocked reasons are appended to a task's description once; replaying a
+# block event whose reason is already there changes only the status, so
+# folding the same events twice leaves ROADMAP.md as it was
+TASK_REASON_AWK='
+    function with_reason(text, reason,   suffix) {
+        suffix = " (Blocked: " reason ")"
+        return index(text, suffix) ? text : text suffix
+    }
+'
+
+# Apply task journal events (second input) to task records (stdin)
+# Events: epoch, event, uuid, then add: date, description / block: reason
+apply_task_events() {
+    awk -F '\t' -v OFS='\t' -v events="$1" "$TASK_REASON_AWK"'
+        FILENAME != events { n++; id[n] = $1; st[n] = $2; dt[n] = $3; ds[n] = $4; pos[$1] = n; next }
+        $2 == "add" {
+            if (!($3 in pos)) { n++; id[n] = $3; pos[$3] = n; st[n] = "TODO"; dt[n] = $4; ds[n] = $5 }
+            next
+        }
+        !($3 in pos) { next }
+        $2 == "start" { st[pos[$3]] = "IN_PROGRESS" }
+        $2 == "done"  { st[pos[$3]] = "DONE" }
+        $2 == "block" { p = pos[$3]; st[p] = "BLOCKED"; ds[p] = with_reason(ds[p], $4) }
+        END { for (i = 1; i <= n; i++) print id[i], st[i], dt[i], ds[i] }
+    ' - "$1"
+}
+
+# Locate this project's task journal once per process
+# The journal is a write-ahead log for ROADMAP.md: task changes are
+# appended to it and folded into ROADMAP.md by `task compact`, or once
+# CLAUDEPM_TASK_FOLD_BYTES of changes (default 64 KB) are pending.
+# It lives in the project's own cache dir, so every project (and every
+# worktree of one) has its own, even when several share a git repo.
+# Sets TASK_JOURNAL; nothing is created until the first write.
+resolve_task_journal() {
+    [[ -n "${TASK_JOURNAL:-}" ]] && return 0
+    task_journal_path
+    TASK_JOURNAL="$TASK_JOURNAL_PATH"
+}
+
+# Task journal of the project in the given directory (default: the
+# current one, as a relative path) into TASK_JOURNAL_PATH
+task_journal_path() {
+    TASK_JOURNAL_PATH="${CLAUDEPM_TASK_JOURNAL:-$CLAUDEPM_CACHE_DIR/tasks.journal}"
+    if [[ -n "${1:-}" && "$TASK_JOURNAL_PATH" != /* ]]; then
+        TASK_JOURNAL_PATH="$1/$TASK_JOURNAL_PATH"
+    fi
+}
+
+# Byte offset of the journal already folded into ROADMAP.md
+journal_folded_offset() {
+    local offset=0
+    [[ -f "$TASK_JOURNAL.folded" ]] && read -r offset < "$TASK_JOURNAL.folded"
+    echo "${offset:-0}"
+}
+
+# Size of a file in bytes (0 if missing)
+file_size() {
+    local stamp=$(file_stamp "$1")
+    [[ "$stamp" == "missing" ]] && stamp=0
+    echo "${stamp%% *}"
+}
+
+# Record a task event with a single O_APPEND write
+# Lines stay well under PIPE_BUF, so concurrent writers never interleave
+append_task_event() {
+    local event="$1"
+    local uuid="$2"
+    local arg1="${3:-}"
+    local arg2="${4:-}"
+    
+    resolve_task_journal
+    [[ "$TASK_JOURNAL" == "$CLAUDEPM_CACHE_DIR/"* ]] && ensure_cache_dir
+    # Tabs and newlines would break the record format
+    arg1="${arg1//[$'\t\n']/ }"
+    arg2="${arg2//[$'\t\n']/ }"
+    printf '%s\t%s\t%s\t%s\t%s\n' "$(date +%s)" "$event" "$uuid" "$arg1" "$arg2" >> "$TASK_JOURNAL"
+}
+
+# Record a task change: append it to the journal, and fold the journal
+# into ROADMAP.md once enough changes are pending. A fold already running
+# elsewhere is left alone; the next change tries again.
+record_task_event() {
+    append_task_event "$@"
+    local pending=$(( $(file_size "$TASK_JOURNAL") - $(journal_folded_offset) ))
+    if (( pending > ${CLAUDEPM_TASK_FOLD_BYTES:-65536} )); then
+        fold_tasks 0 >/dev/null || true
+    fi
+}
+
+# Current task state: ROADMAP.md (the snapshot) plus the journal events
+# not folded into it yet. Reads only; safe to run against any project.
+# Prints the same records as parse_roadmap_tasks.
+# Optional args: status filter (TODO, IN_PROGRESS, BLOCKED, DONE) and max records
+parse_tasks() {
+    local file="${1:-ROADMAP.md}"
+    local status_filter="${2:-}"
+    local limit="${3:-0}"
+    
+    resolve_task_journal
+    local journal_size=$(file_size "$TASK_JOURNAL")
+    local from=$(journal_folded_offset)
+    (( from > journal_size )) && from=0
+    
+    if (( journal_size == from )); then
+        parse_roadmap_tasks "$file" | filter_tasks "$status_filter" "$limit"
+    else
+        parse_roadmap_tasks "$file" |
+            apply_task_events <(head -c "$journal_size" "$TASK_JOURNAL" | tail -c +$((from + 1))) |
+            filter_tasks "$status_filter" "$limit"
+    fi
+}
+
+# Count tasks by status in a single pass
+# Prints: todo in_progress blocked done
+task_counts() {
+    local file="${1:-ROADMAP.md}"
+    
+    parse_tasks "$file" | awk -F '\t' '
+        { count[$2]++ }
+        END { printf "%d %d %d %d\n", count["TODO"], count["IN_PROGRESS"], count["BLOCKED"], count["DONE"] }
+    '
+}
+
+# Fold pending journal events into ROADMAP.md with one atomic rewrite
+# Arg: how many 0.1s waits to allow for the lock (default 50). Whoever
+# holds the lock folds every pending event, its own and any other
+# writer's. ROADMAP.md is replaced before the folded offset is recorded;
+# a crash in between only replays events, which changes nothing.
+fold_tasks() {
+    local roadmap="ROADMAP.md"
+    local wait="${1:-50}"
+    
+    resolve_task_journal
+    if [[ ! -f "$TASK_JOURNAL" ]]; then
+        echo "Folded 0 bytes of task journal into ROADMAP.md"
+        return 0
+    fi
+    local lock="$TASK_JOURNAL.lock"
+    while ! mkdir "$lock" 2>/dev/null; do
+        # A lock older than a minute was left by a writer that died
+        if [[ -n "$(find "$lock" -maxdepth 0 -mmin +1 2>/dev/null)" ]]; then
+            rmdir "$lock" 2>/dev/null || true
+            continue
+        fi
+        (( wait-- > 0 )) || { echo "Task journal is being folded by another process"; return 1; }
+        sleep 0.1
+    done
+    
+    local journal_size=$(file_size "$TASK_JOURNAL")
+    local from=$(journal_folded_offset)
+    (( from > journal_size )) && from=0
+    local pending=$((journal_size - from))
+    
+    if (( pending > 0 )); then
+        [[ -f "$roadmap" ]] || touch "$roadmap"
+        # First input: journal events; second: ROADMAP.md lines to rewrite
+        head -c "$journal_size" "$TASK_JOURNAL" | tail -c +$((from + 1)) | awk -F '\t' -v roadmap="$roadmap" "$TASK_REASON_AWK"'
+            FILENAME != roadmap {
+                if ($2 == "add") { if (!($3 in added)) { added[$3] = $4 "::" $5; order[++n] = $3 } }
+                else if ($2 == "start") status[$3] = "IN_PROGRESS"
+                else if ($2 == "done") status[$3] = "DONE"
+                else if ($2 == "block") { status[$3] = "BLOCKED"; reason[$3, ++reasons[$3]] = $4 }
+                next
+            }
+            {
+                start = index($0, "CPM::TASK::")
+                if (start > 0) {
+                    rest = substr($0, start + 11)
+                    i = index(rest, "::")
+                    uuid = (i > 0) ? substr(rest, 1, i - 1) : ""
+                    seen[uuid] = 1
+                    if (i > 0 && (uuid in status)) {
+                        rest = substr(rest, i + 2)
+                        j = index(rest, "::")
+                        tail = (j > 0) ? substr(rest, j) : ""
+                        for (k = 1; k <= reasons[uuid]; k++) tail = with_reason(tail, reason[uuid, k])
+                        $0 = substr($0, 1, start - 1) "CPM::TASK::" uuid "::" status[uuid] tail
+                    }
+                }
+                print
+            }
+            END {
+                for (m = 1; m <= n; m++) {
+                    uuid = order[m]
+                    if (uuid in seen) continue
+                    line = added[uuid]
+                    for (k = 1; k <= reasons[uuid]; k++) line = with_reason(line, reason[uuid, k])
+                    print "CPM::TASK::" uuid "::" ((uuid in status) ? status[uuid] : "TODO") "::" line
+                }
+            }
+        ' - "$roadmap" > "$roadmap.fold.$$"
+        mv "$roadmap.fold.$$" "$roadmap"
+        echo "$journal_size" > "$TASK_JOURNAL.folded.$$"
+        mv "$TASK_JOURNAL.folded.$$" "$TASK_JOURNAL.folded"
+    fi
+    
+    rmdir "$lock"
+    echo "Folded $pending bytes of task journal into ROADMAP.md"
+}
+
+# Sidecar index: a directory of buckets keyed by the first two characters
+# of the uuid, each holding one line per task with uuid, line offset, line
+# length, status offset and status (byte offsets into ROADMAP.md)
+# It indexes the snapshot only: task changes go to the journal, so the
+# index stays valid until ROADMAP.md itself is folded or edited, and
+# show_task overlays the task's journal events on the indexed line.
+task_index_file() {
+    echo "$CLAUDEPM_CACHE_DIR/tasks.idx"
+}
+
+# Bucket name for a uuid ("_" when it does not start with two alphanumerics)
+task_index_bucket() {
+    local prefix="${1:0:2}"
+    [[ "$prefix" =~ ^[0-9A-Za-z]{2}$ ]] || prefix="_"
+    echo "$prefix"
+}
+
+# Rebuild the task index from ROADMAP.md in one pass
+build_task_index() {
+    local roadmap="${1:-ROADMAP.md}"
+    local index=$(task_index_file)
+    local work="$index.new.$$"
+    
+    ensure_cache_dir
+    rm -rf "${work:?}"
+    mkdir -p "$work"
+    LC_ALL=C awk '
+        {
+            start = index($0, "CPM::TASK::")
+            if (start > 0) {
+                rest = substr($0, start + 11)
+                i = index(rest, "::")
+                if (i > 0) {
+                    uuid = substr(rest, 1, i - 1)
+                    rest = substr(rest, i + 2)
+                    j = index(rest, "::")
+                    status = (j > 0) ? substr(rest, 1, j - 1) : rest
+                    status_offset = offset + start - 1 + 11 + i - 1 + 2
+                    bucket = substr(uuid, 1, 2)
+                    if (bucket !~ /^[0-9A-Za-z][0-9A-Za-z]$/) bucket = "_"
+                    printf "%s\t%s\t%d\t%d\t%d\t%s\n", bucket, uuid, offset, length($0), status_offset, status
+                }
+            }
+            offset += length($0) + 1
+        }
+    ' "$roadmap" | sort -s -t $'\t' -k1,1 | awk -v target="$work" '
+        {
+            bucket = $0; sub(/\t.*/, "", bucket)
+            if (bucket != current) {
+                if (current != "") close(file)
+                current = bucket; file = target "/" bucket ".tsv"
+            }
+            print substr($0, length(bucket) + 2) > file
+        }
+    '
+    rm -rf "${index:?}"
+    mv "$work" "$index"
+    file_stamp "$roadmap" > "$index.stamp"
+}
+
+# Rebuild the index if ROADMAP.md changed since it was written
+ensure_task_index() {
+    local roadmap="${1:-ROADMAP.md}"
+    local index=$(task_index_file)
+    local stamp=""
+    
+    [[ -f "$index.stamp" ]] && read -r stamp < "$index.stamp"
+    if [[ ! -d "$index" ]] || [[ "$stamp" != "$(file_stamp "$roadmap")" ]]; then
+        build_task_index "$roadmap"
+    fi
+}
+
+# Print the index record for a uuid: offset length status_offset status
+# Reads only the bucket the uuid hashes to, never the whole index
+task_lookup() {
+    local uuid="$1"
+    local bucket="$(task_index_file)/$(task_index_bucket "$uuid").tsv"
+    local id offset length status_offset status
+    
+    [[ -f "$bucket" ]] || return 1
+    while IFS=$'\t' read -r id offset length status_offset status; do
+        if [[ "$id" == "$uuid" ]]; then
+            echo "$offset $length $status_offset $status"
+            return 0
+        fi
+    done < "$bucket"
+    return 1
+}
+
+# Read the roadmap line starting at a byte offset (tail seeks, no full scan)
+read_line_at() {
+    local roadmap="$1"
+    local offset="$2"
+    tail -c +$((offset + 1)) "$roadmap" | head -n 1
+}
+
+# Print one task record by uuid: indexed ROADMAP.md line plus its journal events
+show_task() {
+    local uuid="$1"
+    local roadmap="ROADMAP.md"
+    local base=""
+    
+    if [[ -f "$roadmap" ]]; then
+        ensure_task_index "$roadmap"
+        local record
+        if record=$(task_lookup "$uuid"); then
+            local offset length status_offset status
+            read -r offset length status_offset status <<< "$record"
+            local line=$(read_line_at "$roadmap" "$offset")
+            local fields="${line#*CPM::TASK::"$uuid"::"$status"::}"
+            base="$uuid"$'\t'"$status"$'\t'"${fields%%::*}"$'\t'"${fields#*::}"
+        fi
+    fi
+    
+    resolve_task_journal
+    local journal_size=$(file_size "$TASK_JOURNAL")
+    local from=$(journal_folded_offset)
+    (( from > journal_size )) && from=0
+    
+    if (( journal_size > from )); then
+        printf '%s' "${base:+$base$'\n'}" | apply_task_events <(head -c "$journal_size" "$TASK_JOURNAL" | tail -c +$((from + 1)) | awk -F '\t' -v uuid="$uuid" '$3 == uuid')
+    elif [[ -n "$base" ]]; then
+        echo "$base"
+    fi
+}
+
 # Task management
 task_command() {
     local subcommand="${1:-list}"
     shift
+    profile_phase "task:$subcommand"
     
     case "$subcommand" in
         add)
@@ -383,7 +1478,9 @@ task_command() {
                 exit 1
             fi
             local uuid=$(generate_uuid)
-            echo "CPM::TASK::$uuid::TODO::$(date +%Y-%m-%d)::$description" >> ROADMAP.md
+            [[ -f "ROADMAP.md" ]] || touch ROADMAP.md
+            record_task_event add "$uuid" "$(date +%Y-%m-%d)" "$description"
+            rollup_update
             echo "Added task: $uuid"
             ;;
             
@@ -393,41 +1490,43 @@ task_command() {
                 exit 1
             fi
             
-            local filter="${1:-}"
-            echo "Tasks:"
-            if [[ "$filter" == "--blocked" ]]; then
-                grep "CPM::TASK::.*::BLOCKED::" ROADMAP.md | while IFS= read -r line; do
-                    # Split by :: using sed
-                    local parts=$(echo "$line" | sed 's/::/|/g')
-                    local uuid=$(echo "$parts" | cut -d'|' -f3)
-                    local status=$(echo "$parts" | cut -d'|' -f4)
-                    local date=$(echo "$parts" | cut -d'|' -f5)
-                    local desc=$(echo "$parts" | cut -d'|' -f6-)
-                    printf "[%s] %s - %s\n" "$status" "$date" "$desc"
-                done
-            else
-                grep "CPM::TASK::" ROADMAP.md | while IFS= read -r line; do
-                    # Split by :: using sed
-                    local parts=$(echo "$line" | sed 's/::/|/g')
-                    local uuid=$(echo "$parts" | cut -d'|' -f3)
-                    local status=$(echo "$parts" | cut -d'|' -f4)
-                    local date=$(echo "$parts" | cut -d'|' -f5)
-                    local desc=$(echo "$parts" | cut -d'|' -f6-)
-                    printf "[%s] %s - %s\n" "$status" "$date" "$desc"
-                done
+            local status="" json=0 arg
+            for arg in "$@"; do
+                case "$arg" in
+                    --todo) status="TODO" ;;
+                    --in-progress) status="IN_PROGRESS" ;;
+                    --blocked) status="BLOCKED" ;;
+                    --done) status="DONE" ;;
+                    --json) json=1 ;;
+                esac
+            done
+            
+            if [[ $json -eq 1 ]]; then
+                printf '{"schema":%d,"kind":"tasks","tasks":' "$JSON_SCHEMA_VERSION"
+                parse_tasks ROADMAP.md "$status" | json_task_array
+                printf '}\n'
+                return 0
             fi
+            echo "Tasks:"
+            parse_tasks ROADMAP.md "$status" | awk -F '\t' '{ printf "[%s] %s - %s\n", $2, $3, $4 }'
             ;;
             
-        done)
+        start|done)
             local uuid="${1:-}"
             if [[ -z "$uuid" ]]; then
                 echo "Error: UUID required"
-                echo "Usage: claudepm task done <uuid>"
+                echo "Usage: claudepm task $subcommand <uuid>"
                 exit 1
             fi
-            # Update task status to DONE
-            sed -i.bak "s/CPM::TASK::$uuid::[^:]*::/CPM::TASK::$uuid::DONE::/" ROADMAP.md
-            echo "Marked task $uuid as DONE"
+            if [[ -z "$(show_task "$uuid")" ]]; then
+                echo "Error: Task not found: $uuid"
+                exit 1
+            fi
+            local new_status="DONE"
+            [[ "$subcommand" == "start" ]] && new_status="IN_PROGRESS"
+            record_task_event "$subcommand" "$uuid"
+            rollup_update
+            echo "Marked task $uuid as $new_status"
             ;;
             
         block)
@@ -438,14 +1537,54 @@ task_command() {
                 echo "Usage: claudepm task block <uuid> <reason>"
                 exit 1
             fi
-            # Update task status to BLOCKED and append reason
-            sed -i.bak "s/CPM::TASK::$uuid::[^:]*::\(.*\)/CPM::TASK::$uuid::BLOCKED::\1 (Blocked: $reason)/" ROADMAP.md
+            if [[ -z "$(show_task "$uuid")" ]]; then
+                echo "Error: Task not found: $uuid"
+                exit 1
+            fi
+            # Status becomes BLOCKED and the reason is appended to the description
+            record_task_event block "$uuid" "$reason"
+            rollup_update
             echo "Marked task $uuid as BLOCKED"
             ;;
             
+        show)
+            local uuid="${1:-}"
+            if [[ -z "$uuid" ]]; then
+                echo "Error: UUID required"
+                echo "Usage: claudepm task show <uuid>"
+                exit 1
+            fi
+            local record=$(show_task "$uuid")
+            if [[ -z "$record" ]]; then
+                echo "Error: Task not found: $uuid"
+                exit 1
+            fi
+            if [[ "${2:-}" == "--json" ]]; then
+                printf '%s\n' "$record" | awk -F '\t' -v schema="$JSON_SCHEMA_VERSION" "$JSON_TASK_AWK"'
+                    { printf "{\"schema\":%d,\"kind\":\"task\",\"task\":%s}\n", schema, task_json($1, $2, $3, $4) }
+                '
+                return 0
+            fi
+            local status date desc
+            IFS=$'\t' read -r uuid status date desc <<< "$record"
+            echo "UUID: $uuid"
+            echo "Status: $status"
+            echo "Date: $date"
+            echo "Description: $desc"
+            ;;
+            
+        compact)
+            fold_tasks || exit 1
+            ;;
+            
+        import)
+            [[ -f "ROADMAP.md" ]] || touch ROADMAP.md
+            import_todos "$@"
+            ;;
+            
         *)
             echo "Unknown task subcommand: $subcommand"
-            echo "Available: add, list, done, block"
+            echo "Available: add, list, show, start, done, block, compact"
             exit 1
             ;;
     esac
@@ -480,12 +1619,69 @@ upgrade_project() {
     echo "Version updated to v$CLAUDEPM_VERSION"
 }
 
+# Read the newest entries of a log by seeking back from the end of the file
+# The window doubles until it holds `count` complete entries (and, with
+# need_next=1, a Next: line), so cost follows recent history, not log size.
+# Prints tab-separated records:
+#   H <header>  D <line after header>  N <Next: line of that entry>  E (end of entry)
+#   L <text of the newest Next: line in the log>   (need_next=1 only)
+log_recent() {
+    local file="$1"
+    local count="$2"
+    local need_next="${3:-0}"
+    local size=$(file_size "$file")
+    local window="${CLAUDEPM_LOG_WINDOW:-8192}"
+    local output
+    
+    while :; do
+        [[ $window -gt $size ]] && window=$size
+        if output=$(tail -c "$window" "$file" | awk -F '\n' -v OFS='\t' \
+            -v count="$count" -v need_next="$need_next" -v whole=$(( window >= size )) '
+            # Outside a whole-file read the first line may be cut mid-way
+            NR == 1 && !whole { next }
+            { line[++n] = $0 }
+            /^### / { header[++nh] = n }
+            /^Next:/ { last_next = $0 }
+            END {
+                if (!whole && (nh < count || (need_next && last_next == ""))) exit 3
+                for (i = (nh > count ? nh - count + 1 : 1); i <= nh; i++) {
+                    h = header[i]
+                    print "H", line[h]
+                    if (h + 1 <= n) print "D", line[h + 1]
+                    for (j = h + 2; j <= h + 6 && j <= n; j++) {
+                        if (line[j] ~ /^Next:/) { print "N", line[j]; break }
+                    }
+                    print "E"
+                }
+                if (need_next) {
+                    sub(/^Next: */, "", last_next)
+                    print "L", last_next
+                }
+            }'); then
+            [[ -n "$output" ]] && echo "$output"
+            return 0
+        fi
+        window=$(( window * 2 ))
+    done
+}
+
+# Print the date of the newest log entry (empty if there is none)
+log_last_date() {
+    local kind text
+    while IFS=$'\t' read -r kind text; do
+        if [[ "$kind" == "H" ]]; then
+            text="${text#\#\#\# }"
+            echo "${text%% *}"
+        fi
+    done < <(log_recent "$1" 1)
+}
+
 # Find blocked items
 find_blocked() {
     echo "=== Blocked Tasks ==="
-    grep "CPM::TASK::.*::BLOCKED" ROADMAP.md 2>/dev/null | \
-        cut -d'::' -f6- | \
-        sed 's/^/  - /'
+    parse_tasks ROADMAP.md BLOCKED | while IFS=$'\t' read -r uuid status date desc; do
+        echo "  - $desc"
+    done
     
     echo -e "\n=== Blocked in Logs ==="
     grep -A2 "^Blocked:" LOG.md 2>/dev/null | tail -20
@@ -493,51 +1689,147 @@ find_blocked() {
 
 # Get session context - new command for v0.2.5.1
 get_context() {
+    case "${1:-}" in
+        --budget)
+            profile_phase "context:budget"
+            get_context_budget "${2:-}"
+            return
+            ;;
+        --all)
+            shift
+            profile_phase "context:all"
+            context_all "$@"
+            return
+            ;;
+        --json)
+            profile_phase "context:json"
+            context_json
+            return
+            ;;
+    esac
+    
     echo "PROJECT: $(basename "$PWD")"
     echo ""
     
-    # Git status summary
+    profile_phase "context:git"
+    context_git_section
+    profile_phase "context:sections"
+    cached_context_sections
+}
+
+# context --json: git state, recent work and tasks as one record
+# Everything is tagged onto one stream so a single awk builds the object:
+# P/A project and path, G git probe, M "XY path" change, H/D/N/E/L log_recent
+# records, T task records.
+context_json() {
+    git_probe
+    {
+        printf 'P\t%s\nA\t%s\n' "${PWD##*/}" "$PWD"
+        printf 'G\t%s\t%s\t%s\t%s\n' "$GIT_PROBE_STATE" "$GIT_BRANCH" "$GIT_CHANGES" "$GIT_COMMIT_TIME"
+        local path
+        while IFS= read -r path; do
+            [[ -n "$path" ]] && printf 'M\t%s\n' "$path"
+        done <<< "$GIT_TOP_PATHS"
+        if [[ -f "LOG.md" ]]; then log_recent LOG.md 3 1; fi
+        if [[ -f "ROADMAP.md" ]]; then parse_tasks ROADMAP.md | sed 's/^/T\t/'; fi
+    } | awk -F '\t' -v schema="$JSON_SCHEMA_VERSION" "$JSON_TASK_AWK"'
+        function num(v) { return v == "" ? "null" : v + 0 }
+        function add(list, item) { return list (list == "" ? "" : ",") item }
+        function flush_entry() {
+            if (header == "") return
+            work = add(work, "{\"header\":" json(header) ",\"detail\":" (detail == "" ? "null" : json(detail)) \
+                ",\"next\":" (next_line == "" ? "null" : json(next_line)) "}")
+            header = detail = next_line = ""
+        }
+        $1 == "P" { project = $2 }
+        $1 == "A" { path = $2 }
+        $1 == "G" { state = $2; branch = $3; changes = $4; commit = $5 }
+        $1 == "M" { modified = add(modified, "{\"status\":" json(substr($2, 1, 2)) ",\"path\":" json(substr($2, 4)) "}") }
+        $1 == "H" { flush_entry(); header = $2; sub(/^### */, "", header) }
+        $1 == "D" { detail = $2 }
+        $1 == "N" { next_line = $2; sub(/^Next: */, "", next_line) }
+        $1 == "E" { flush_entry() }
+        $1 == "L" { last_next = $2 }
+        $1 == "T" {
+            count[$3]++
+            if ($3 == "IN_PROGRESS") progress = add(progress, task_json($2, $3, $4, $5))
+        }
+        END {
+            flush_entry()
+            git = "{\"state\":" json(state == "" ? "none" : state)
+            if (state == "ok") {
+                git = git ",\"branch\":" (branch == "" ? "null" : json(branch)) ",\"changes\":" num(changes) \
+                    ",\"last_commit\":" num(commit) ",\"modified\":[" modified "]"
+            }
+            git = git "}"
+            printf "{\"schema\":%d,\"kind\":\"context\",\"project\":%s,\"path\":%s,\"git\":%s,", schema, json(project), json(path), git
+            printf "\"recent_work\":[%s],\"next_from_log\":%s,", work, (last_next == "" ? "null" : json(last_next))
+            printf "\"tasks\":{\"todo\":%d,\"in_progress\":%d,\"blocked\":%d,\"done\":%d},\"in_progress\":[%s]}\n",
+                count["TODO"], count["IN_PROGRESS"], count["BLOCKED"], count["DONE"], progress
+        }
+    '
+}
+
+# GIT_STATUS section of the session context (from the shared git probe)
+context_git_section() {
     echo "GIT_STATUS:"
-    if git rev-parse --git-dir > /dev/null 2>&1; then
-        local changes=$(git status --porcelain 2>/dev/null | wc -l | tr -d ' ')
-        if [[ "$changes" -gt 0 ]]; then
-            echo "  Uncommitted changes: $changes files"
-            echo "  Modified files:"
-            git status --porcelain | head -5 | sed 's/^/    /'
-            [[ "$changes" -gt 5 ]] && echo "    ... and $((changes - 5)) more"
-        else
-            echo "  Clean (no uncommitted changes)"
-        fi
-    else
-        echo "  Not a git repository"
-    fi
+    git_probe
+    case "$GIT_PROBE_STATE" in
+        ok)
+            if [[ -n "$GIT_BRANCH" ]]; then
+                local since=""
+                if [[ -n "$GIT_COMMIT_TIME" ]]; then
+                    local age=$(( $(now_s) - GIT_COMMIT_TIME ))
+                    if [[ $age -lt 3600 ]]; then
+                        since=" (last commit $((age / 60)) minutes ago)"
+                    elif [[ $age -lt 86400 ]]; then
+                        since=" (last commit $((age / 3600)) hours ago)"
+                    else
+                        since=" (last commit $((age / 86400)) days ago)"
+                    fi
+                fi
+                echo "  Branch: $GIT_BRANCH$since"
+            fi
+            if [[ "$GIT_CHANGES" -gt 0 ]]; then
+                echo "  Uncommitted changes: $GIT_CHANGES files"
+                echo "  Modified files:"
+                local line shown=0
+                while IFS= read -r line; do
+                    [[ -n "$line" && $shown -lt 5 ]] || continue
+                    echo "    $line"
+                    shown=$((shown + 1))
+                done <<< "$GIT_TOP_PATHS"
+                [[ "$GIT_CHANGES" -gt $shown ]] && echo "    ... and $((GIT_CHANGES - shown)) more"
+            else
+                echo "  Clean (no uncommitted changes)"
+            fi
+            ;;
+        timeout)
+            echo "  git status timed out after ${CLAUDEPM_GIT_TIMEOUT:-5}s"
+            ;;
+        *)
+            echo "  Not a git repository"
+            ;;
+    esac
     echo ""
-    
+}
+
+# Context sections built only from project files (log, roadmap, task journal)
+context_project_sections() {
     # Recent log entries
     echo "RECENT_WORK:"
     if [[ -f "LOG.md" ]]; then
-        # Get last 3 log entries
-        local entries=$(grep -n "^### " LOG.md | tail -3)
-        if [[ -n "$entries" ]]; then
-            while IFS= read -r line; do
-                local line_num=$(echo "$line" | cut -d':' -f1)
-                local header=$(echo "$line" | cut -d':' -f2-)
-                echo "  $header"
-                # Get the "Did:" line
-                local did_line=$((line_num + 1))
-                sed -n "${did_line}p" LOG.md | sed 's/^/    /'
-                # Get the "Next:" line if it exists
-                local next_line=$((line_num + 2))
-                while IFS= read -r content; do
-                    if [[ "$content" =~ ^Next: ]]; then
-                        echo "    $content"
-                        break
-                    fi
-                    next_line=$((next_line + 1))
-                done < <(tail -n +$next_line LOG.md | head -5)
-                echo ""
-            done <<< "$entries"
-        else
+        # Get last 3 log entries (and the newest Next: line) from the tail
+        local kind text has_entries=0 last_next=""
+        while IFS=$'\t' read -r kind text; do
+            case "$kind" in
+                H) echo "  $text"; has_entries=1 ;;
+                D|N) echo "    $text" ;;
+                E) echo "" ;;
+                L) last_next="$text" ;;
+            esac
+        done < <(log_recent LOG.md 3 1)
+        if [[ $has_entries -eq 0 ]]; then
             echo "  No log entries found"
         fi
     else
@@ -546,10 +1838,9 @@ get_context() {
     
     # Active tasks
     echo "ACTIVE_TASKS:"
+    local todo_count=0 progress_count=0 blocked_count=0 done_count=0
     if [[ -f "ROADMAP.md" ]]; then
-        local todo_count=$(grep -c "CPM::TASK::.*::TODO::" ROADMAP.md 2>/dev/null | tr -d ' \n' || echo 0)
-        local progress_count=$(grep -c "CPM::TASK::.*::IN_PROGRESS::" ROADMAP.md 2>/dev/null | tr -d ' \n' || echo 0)
-        local blocked_count=$(grep -c "CPM::TASK::.*::BLOCKED::" ROADMAP.md 2>/dev/null | tr -d ' \n' || echo 0)
+        read -r todo_count progress_count blocked_count done_count < <(task_counts ROADMAP.md)
         
         echo "  TODO: $todo_count tasks"
         echo "  IN_PROGRESS: $progress_count tasks"
@@ -559,9 +1850,7 @@ get_context() {
         if [[ "$progress_count" -gt 0 ]]; then
             echo ""
             echo "  Currently in progress:"
-            grep "CPM::TASK::.*::IN_PROGRESS::" ROADMAP.md | while IFS= read -r line; do
-                local parts=$(echo "$line" | sed 's/::/|/g')
-                local desc=$(echo "$parts" | cut -d'|' -f6-)
+            parse_tasks ROADMAP.md IN_PROGRESS | while IFS=$'\t' read -r uuid status date desc; do
                 echo "    - $desc"
             done
         fi
@@ -573,11 +1862,8 @@ get_context() {
     # What to work on next
     echo "NEXT_SUGGESTED:"
     # First check for explicit "Next:" in last log
-    if [[ -f "LOG.md" ]]; then
-        local last_next=$(grep "^Next:" LOG.md | tail -1 | sed 's/^Next: *//')
-        if [[ -n "$last_next" ]]; then
-            echo "  From last log: $last_next"
-        fi
+    if [[ -n "${last_next:-}" ]]; then
+        echo "  From last log: $last_next"
     fi
     # Then check for in-progress tasks
     if [[ "$progress_count" -gt 0 ]]; then
@@ -589,14 +1875,360 @@ get_context() {
     fi
 }
 
+# context_project_sections, served from $PROJECT_CACHE_DIR while its inputs are unchanged
+# Sets CONTEXT_CACHED=1 on a cache hit
+cached_context_sections() {
+    CONTEXT_CACHED=0
+    resolve_task_journal
+    stat_flavor
+    local key=$(stamp_files LOG.md ROADMAP.md "$TASK_JOURNAL" "$TASK_JOURNAL.folded")
+    local blob="$PROJECT_CACHE_DIR/context-sections"
+    
+    if [[ -f "$blob" && -f "$blob.key" && "$key" == "$(< "$blob.key")" ]]; then
+        CONTEXT_CACHED=1
+        cat "$blob"
+        return 0
+    fi
+    
+    ensure_project_cache_dir
+    context_project_sections > "$blob.tmp"
+    mv "$blob.tmp" "$blob"
+    printf '%s\n' "$key" > "$blob.key"
+    cat "$blob"
+}
+
+# Candidate pieces for a budgeted context, most important first
+# Prints "section<TAB>text"; multi-line text uses \036 as line separator
+context_candidates() {
+    local uuid status date desc
+    
+    if [[ -f "LOG.md" ]]; then
+        local kind text
+        while IFS=$'\t' read -r kind text; do
+            [[ "$kind" == "L" && -n "$text" ]] && printf 'NEXT_FROM_LOG\t  %s\n' "$text"
+        done < <(log_recent LOG.md 0 1)
+    fi
+    
+    if [[ -f "ROADMAP.md" ]]; then
+        parse_tasks ROADMAP.md IN_PROGRESS | while IFS=$'\t' read -r uuid status date desc; do
+            printf 'IN_PROGRESS\t  - [%s] %s\n' "$uuid" "$desc"
+        done
+        parse_tasks ROADMAP.md BLOCKED | while IFS=$'\t' read -r uuid status date desc; do
+            printf 'BLOCKED\t  - [%s] %s\n' "$uuid" "$desc"
+        done
+    fi
+    
+    # Newest log entries first, each as one piece
+    if [[ -f "LOG.md" ]]; then
+        log_recent LOG.md 5 | awk -F '\t' '
+            $1 == "H" { entry = "  " $2 }
+            $1 == "D" || $1 == "N" { entry = entry "\036    " $2 }
+            $1 == "E" { entries[++n] = entry }
+            END { for (i = n; i >= 1; i--) print "RECENT_WORK\t" entries[i] }
+        '
+    fi
+    
+    git_probe
+    local line
+    while IFS= read -r line; do
+        [[ -n "$line" ]] && printf 'UNCOMMITTED\t    %s\n' "$line"
+    done <<< "$GIT_TOP_PATHS"
+    
+    if [[ -f "ROADMAP.md" ]]; then
+        parse_tasks ROADMAP.md TODO 20 | while IFS=$'\t' read -r uuid status date desc; do
+            printf 'TODO\t  - [%s] %s\n' "$uuid" "$desc"
+        done
+    fi
+}
+
+# awk function that quotes a value as a JSON string
+JSON_AWK='
+    function json(s) {
+        gsub(/\\/, "&&", s); gsub(/"/, "\\\"", s); gsub(/\t/, "\\t", s)
+        gsub(/\r/, "\\r", s); gsub(/\n/, "\\n", s)
+        return "\"" s "\""
+    }
+'
+
+# Encode stdin as a single JSON string (no trailing newline)
+json_string() {
+    awk "$JSON_AWK"'
+        { out = out (NR > 1 ? "\n" : "") $0 }
+        END { printf "%s", json(out) }
+    '
+}
+
+# Version of the --json/--ndjson record layouts documented in JSON_OUTPUT.md
+# Adding fields keeps the version; renaming or removing one bumps it.
+JSON_SCHEMA_VERSION=1
+
+# awk helper: a task record (uuid, status, date, description) as an object
+JSON_TASK_AWK="$JSON_AWK"'
+    function task_json(uuid, status, date, desc) {
+        return "{\"uuid\":" json(uuid) ",\"status\":" json(status) ",\"date\":" json(date) ",\"description\":" json(desc) "}"
+    }
+'
+
+# Task records (parse_tasks format) on stdin as one JSON array
+json_task_array() {
+    awk -F '\t' "$JSON_TASK_AWK"'
+        { out = out (NR > 1 ? "," : "") task_json($1, $2, $3, $4) }
+        END { printf "[%s]", out }
+    '
+}
+
+# Gather context for context_all, one result file per project
+# Prints "<result file><TAB><1 if served from cache>" as each file completes,
+# so the parent can stream results without interleaving.
+context_worker() {
+    local work="$1" format="$2"
+    shift 2
+    local dir result count=0
+    for dir in "$@"; do
+        cd "$dir" || continue
+        # Per-project state must not leak between projects in one worker
+        TASK_JOURNAL=""
+        scan_cache_dir "$dir"
+        count=$((count + 1))
+        result="$work/result.$$.$count"
+        # Not in a command substitution, so CONTEXT_CACHED survives
+        if [[ "$format" == "ndjson" ]]; then
+            {
+                echo "PROJECT: ${dir##*/}"
+                echo ""
+                context_git_section
+                cached_context_sections
+            } > "$result.text"
+            CPM_NAME="${dir##*/}" CPM_PATH="$dir" awk -v cached="$CONTEXT_CACHED" -v schema="$JSON_SCHEMA_VERSION" "$JSON_AWK"'
+                { text = text $0 "\n" }
+                END {
+                    printf "{\"schema\":%d,\"kind\":\"context_text\",\"project\":%s,\"path\":%s,\"cached\":%s,\"context\":%s}\n",
+                        schema, json(ENVIRON["CPM_NAME"]), json(ENVIRON["CPM_PATH"]),
+                        (cached ? "true" : "false"), json(text)
+                }
+            ' "$result.text" > "$result"
+        else
+            {
+                echo "===== ${dir##*/} ($dir) ====="
+                echo "PROJECT: ${dir##*/}"
+                echo ""
+                context_git_section
+                cached_context_sections
+                echo ""
+            } > "$result"
+        fi
+        printf '%s\t%s\n' "$result" "$CONTEXT_CACHED"
+    done
+}
+
+# Session context for every registered project, gathered in parallel
+# Projects come from projects.list (or the given paths); each line may be a
+# project or a directory holding projects. Results stream as they finish.
+context_all() {
+    local jobs="${CLAUDEPM_JOBS:-8}"
+    local format="text"
+    local paths=()
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            -j|--jobs)
+                jobs="${2:-}"
+                shift 2
+                ;;
+            --ndjson)
+                format="ndjson"
+                shift
+                ;;
+            *)
+                paths+=("$1")
+                shift
+                ;;
+        esac
+    done
+    if [[ ! "$jobs" =~ ^[1-9][0-9]*$ ]]; then
+        echo "Error: --jobs needs a positive number"
+        echo "Usage: claudepm context --all [--ndjson] [-j jobs] [paths]"
+        exit 1
+    fi
+    
+    if [[ ${#paths[@]} -eq 0 ]]; then
+        if [[ ! -f "$CLAUDEPM_HOME/projects.list" ]]; then
+            echo "Error: No projects registered ($CLAUDEPM_HOME/projects.list not found)"
+            echo "Register a project with: echo \"\$PWD\" >> $CLAUDEPM_HOME/projects.list"
+            exit 1
+        fi
+        while IFS= read -r line; do
+            [[ -n "$line" ]] && paths+=("$line")
+        done < "$CLAUDEPM_HOME/projects.list"
+    fi
+    
+    local started=$(now_ms)
+    local work=$(mktemp -d "${TMPDIR:-/tmp}/claudepm-context.XXXXXX")
+    discover_projects "${CLAUDEPM_DISCOVER_DEPTH:-4}" "${paths[@]}" | awk '!seen[$0]++' > "$work/dirs"
+    
+    # Hand each worker a batch of projects: one shell startup per worker, not per project
+    local total=$(wc -l < "$work/dirs" | tr -d ' ')
+    local batch=$(( (total + jobs - 1) / jobs ))
+    [[ $batch -gt 0 ]] || batch=1
+    
+    local result cached projects=0 hits=0
+    if [[ -s "$work/dirs" ]]; then
+        while IFS=$'\t' read -r result cached; do
+            cat "$result"
+            projects=$((projects + 1))
+            hits=$((hits + cached))
+        done < <(tr '\n' '\0' < "$work/dirs" | xargs -0 -n "$batch" -P "$jobs" \
+            bash -c 'source "$1/lib/utils.sh"; shift; context_worker "$@"' _ "$CLAUDEPM_HOME" "$work" "$format")
+    fi
+    rm -rf "$work"
+    
+    # Keep NDJSON output machine-readable: the summary goes to stderr
+    local summary="Gathered $projects projects in $(( $(now_ms) - started ))ms ($hits from cache)"
+    if [[ "$format" == "ndjson" ]]; then
+        echo "$summary" >&2
+    else
+        echo "$summary"
+    fi
+}
+
+# Session context that fits a token budget
+# Pieces are ranked (latest Next:, in-progress tasks, blockers, recent log
+# entries, uncommitted files, TODO tasks) and added greedily while they fit.
+# Tokens are estimated as characters / 4, like get-context.sh --stats.
+get_context_budget() {
+    local budget="$1"
+    if [[ ! "$budget" =~ ^[0-9]+$ ]]; then
+        echo "Error: --budget needs a token count"
+        echo "Usage: claudepm context --budget N"
+        exit 1
+    fi
+    
+    # Only the first TODO tasks are candidates; report the rest as omitted too
+    local todo_total=0 progress_count blocked_count done_count
+    if [[ -f "ROADMAP.md" ]]; then
+        read -r todo_total progress_count blocked_count done_count < <(task_counts ROADMAP.md)
+    fi
+    
+    context_candidates | awk -F '\t' -v budget="$budget" -v project="$(basename "$PWD")" -v todo_total="$todo_total" '
+        function cost(text) { return int((length(text) + 1 + 3) / 4) }
+        BEGIN {
+            header = "PROJECT: " project
+            used = cost(header)
+            print header
+        }
+        {
+            section = $1
+            text = substr($0, length(section) + 2)
+            need = cost(text)
+            if (!(section in shown)) need += cost("") + cost(section ":")
+            if (used + need > budget) {
+                if (!(section in omitted)) order[++n] = section
+                omitted[section]++
+                next
+            }
+            if (!(section in shown)) {
+                printf "\n%s:\n", section
+                shown[section] = 1
+            }
+            gsub(/\036/, "\n", text)
+            print text
+            used += need
+            included[section]++
+        }
+        END {
+            printf "\nBUDGET: ~%d of %d tokens used\n", used, budget
+            if (!("TODO" in omitted) && todo_total > included["TODO"]) order[++n] = "TODO"
+            if (todo_total > included["TODO"]) omitted["TODO"] = todo_total - included["TODO"]
+            if (n == 0) exit
+            line = "OMITTED:"
+            for (i = 1; i <= n; i++) line = line " " order[i] "=" omitted[order[i]]
+            print line
+        }
+    '
+}
+
+# LOG.md writers
+# An append of up to LOG_ATOMIC_BYTES fits in one stdio buffer, so it reaches
+# the kernel as a single O_APPEND write(2) and lands whole at the end of the
+# file, even with other agents appending at the same moment. Larger appends,
+# queue flushes and archiving take LOG_LOCK; small writers wait while it is
+# held so they do not land inside a multi-write append or a rewrite.
+LOG_ATOMIC_BYTES="${CLAUDEPM_LOG_ATOMIC_BYTES:-4096}"
+LOG_LOCK="$CLAUDEPM_CACHE_DIR/log.lock"
+# Entries queued by `claudepm log --queue` (or CLAUDEPM_LOG_BATCH=1)
+LOG_QUEUE="${CLAUDEPM_LOG_QUEUE:-$CLAUDEPM_CACHE_DIR/log.queue}"
+
+# Take the LOG.md lock: a symlink whose target is the holder's PID, so the
+# lock and its owner appear in one atomic step. A lock is broken only once
+# its holder has died; a slow live holder is always waited for.
+log_lock() {
+    local pid
+    ensure_cache_dir
+    while ! ln -s "${BASHPID:-$$}" "$LOG_LOCK" 2>/dev/null; do
+        pid=$(readlink "$LOG_LOCK" 2>/dev/null) || continue
+        if ! kill -0 "$pid" 2>/dev/null && [[ "$(readlink "$LOG_LOCK" 2>/dev/null)" == "$pid" ]]; then
+            rm -f "$LOG_LOCK"
+            continue
+        fi
+        sleep 0.05
+    done
+}
+
+log_unlock() {
+    rm -f "$LOG_LOCK"
+}
+
+# Append text to a file in one write, or under the lock when it is too big
+append_atomic() {
+    local file="$1" text="$2" tries=0
+    # Byte length, not characters
+    local LC_ALL=C
+    if (( ${#text} <= LOG_ATOMIC_BYTES )); then
+        while [[ -L "$LOG_LOCK" ]] && (( ++tries <= 100 )); do
+            sleep 0.05
+        done
+        printf '%s' "$text" >> "$file"
+        return 0
+    fi
+    log_lock
+    printf '%s' "$text" >> "$file"
+    log_unlock
+}
+
+# Current local time as YYYY-MM-DD HH:MM in the named variable
+# bash 4.2+ formats it without forking date
+log_timestamp() {
+    if (( BASH_VERSINFO[0] > 4 || (BASH_VERSINFO[0] == 4 && BASH_VERSINFO[1] >= 2) )); then
+        printf -v "$1" '%(%Y-%m-%d %H:%M)T' -1
+    else
+        printf -v "$1" '%s' "$(date '+%Y-%m-%d %H:%M')"
+    fi
+}
+
 # Log work with consistent format - simplified for v0.2.5.2
+# The entry is built in memory and appended with a single write. With
+# --queue (or CLAUDEPM_LOG_BATCH=1) it goes to LOG_QUEUE instead, keeping
+# its timestamp, until `claudepm log --flush` appends the whole queue.
 log_work() {
+    local queue="${CLAUDEPM_LOG_BATCH:-0}"
+    case "${1:-}" in
+        --flush)
+            log_flush
+            return 0
+            ;;
+        --queue)
+            queue=1
+            shift
+            ;;
+    esac
     local title="${1:-}"
-    shift
+    if [[ $# -gt 0 ]]; then
+        shift
+    fi
     
     if [[ -z "$title" ]]; then
         echo "Error: Log title required"
-        echo "Usage: claudepm log \"title\" [content]"
+        echo "Usage: claudepm log [--queue] \"title\" [content]"
+        echo "       claudepm log --flush"
         echo ""
         echo "Examples:"
         echo '  claudepm log "Fixed auth bug"'
@@ -611,67 +2243,416 @@ log_work() {
     
     # Collect any additional content as free-form text
     local content="$*"
+    [[ -n "$content" ]] || content="Did: $title"
+    local now
+    log_timestamp now
+    local entry=$'\n\n'"### $now - $title"$'\n'"$content"$'\n\n---\n'
     
-    # Append to LOG.md with minimal structure
-    {
-        echo ""
-        echo ""
-        echo "### $(date '+%Y-%m-%d %H:%M') - $title"
-        if [[ -n "$content" ]]; then
-            echo "$content"
-        else
-            echo "Did: $title"
-        fi
-        echo ""
-        echo "---"
-    } >> LOG.md
+    if [[ "$queue" == "1" ]]; then
+        ensure_cache_dir
+        append_atomic "$LOG_QUEUE" "$entry"
+        echo "Queued: $title"
+        return 0
+    fi
     
+    append_atomic LOG.md "$entry"
     echo "Logged: $title"
+    # A single stat until LOG.md passes the segment size; rollups catch up
+    # on the new bytes when stats next reads them
+    archive_log
+}
+
+# Append every queued entry to LOG.md at once (group commit)
+# Archiving then runs once for the whole batch.
+log_flush() {
+    if [[ ! -s "$LOG_QUEUE" ]]; then
+        echo "Log queue is empty"
+        return 0
+    fi
+    local batch="$LOG_QUEUE.flush.$$"
+    log_lock
+    mv "$LOG_QUEUE" "$batch"
+    cat "$batch" >> LOG.md
+    log_unlock
+    
+    local entries=$(grep -c '^### ' "$batch" || true)
+    rm -f "$batch"
+    echo "Flushed $entries queued log entries"
+    archive_log
+}
+
+# Archived LOG.md segments: one gzip file per month plus a manifest
+LOG_ARCHIVE_DIR="${LOG_ARCHIVE_DIR:-log-archive}"
+
+# Move all but the newest entries of LOG.md into monthly compressed segments
+# Runs only once LOG.md passes CLAUDEPM_LOG_SEGMENT_BYTES unless forced.
+# The manifest (segment, first date, last date, entries) is what history
+# uses to find segments without decompressing them.
+archive_log() {
+    local force="${1:-}"
+    local limit="${CLAUDEPM_LOG_SEGMENT_BYTES:-262144}"
+    local keep="${CLAUDEPM_LOG_KEEP_ENTRIES:-30}"
+    [[ -f "LOG.md" ]] || return 0
+    if [[ "$force" != "force" ]]; then
+        [[ "$limit" -gt 0 ]] || return 0
+        [[ $(file_size LOG.md) -gt $limit ]] || return 0
+    fi
+    
+    # Appends made while LOG.md is split and swapped would be lost
+    log_lock
+    archive_log_locked "$force" "$keep"
+    log_unlock
+}
+
+# The split and swap of archive_log, run with the LOG.md lock held
+archive_log_locked() {
+    local force="$1" keep="$2"
+    local stage=$(mktemp -d "${TMPDIR:-/tmp}/claudepm-archive.XXXXXX")
+    mkdir -p "$stage/segments"
+    
+    # Split once: header + newest entries stay, older entries go by month
+    awk -v keep="$keep" -v stage="$stage" -v OFS='\t' '
+        NR == FNR { if (/^### /) total++; next }
+        /^### / {
+            n++
+            if (n <= total - keep) {
+                month = ($2 ~ /^[0-9][0-9][0-9][0-9]-[0-9][0-9]/) ? substr($2, 1, 7) : "undated"
+                count[month]++
+                if (!(month in first)) { first[month] = last[month] = $2; order[++months] = month }
+                if ($2 < first[month]) first[month] = $2
+                if ($2 > last[month]) last[month] = $2
+            } else {
+                month = ""
+            }
+        }
+        n == 0 || month == "" { print > (stage "/LOG.md"); next }
+        {
+            # One segment open at a time keeps old awks under their file limit
+            if (month != open_month) {
+                if (open_month != "") close(stage "/segments/" open_month)
+                open_month = month
+            }
+            print >> (stage "/segments/" month)
+        }
+        END {
+            for (i = 1; i <= months; i++) {
+                m = order[i]
+                print "LOG-" m ".md.gz", first[m], last[m], count[m] > (stage "/rows")
+            }
+        }
+    ' LOG.md LOG.md
+    
+    if [[ ! -f "$stage/rows" ]]; then
+        rm -rf "$stage"
+        [[ "$force" == "force" ]] && echo "Nothing to archive (LOG.md has $keep or fewer entries)"
+        return 0
+    fi
+    
+    # Stage the new segment files; a month archived before gets another gzip member
+    mkdir -p "$LOG_ARCHIVE_DIR"
+    local manifest="$LOG_ARCHIVE_DIR/manifest.tsv"
+    local segment first last entries month
+    while IFS=$'\t' read -r segment first last entries; do
+        month="${segment#LOG-}"
+        month="${month%.md.gz}"
+        if [[ -f "$LOG_ARCHIVE_DIR/$segment" ]]; then
+            cp "$LOG_ARCHIVE_DIR/$segment" "$stage/$segment"
+        fi
+        gzip -c "$stage/segments/$month" >> "$stage/$segment"
+    done < "$stage/rows"
+    
+    # Merge the manifest: widen date ranges, add entry counts
+    local previous="/dev/null"
+    [[ -f "$manifest" ]] && previous="$manifest"
+    {
+        printf '# segment\tfirst\tlast\tentries\n'
+        awk -F '\t' -v OFS='\t' '
+            /^#/ { next }
+            !($1 in entries) { order[++n] = $1; first[$1] = $2; last[$1] = $3 }
+            {
+                if ($2 < first[$1]) first[$1] = $2
+                if ($3 > last[$1]) last[$1] = $3
+                entries[$1] += $4
+            }
+            END { for (i = 1; i <= n; i++) print order[i], first[order[i]], last[order[i]], entries[order[i]] }
+        ' "$previous" "$stage/rows" | LC_ALL=C sort
+    } > "$stage/manifest.tsv"
+    
+    # Swap LOG.md first: if it is protected (e.g. uappnd), nothing has changed yet
+    if ! mv "$stage/LOG.md" LOG.md 2>/dev/null; then
+        echo -e "${YELLOW}⚠ Could not rewrite LOG.md (append-only?); log not archived${NC}"
+        rm -rf "$stage"
+        return 0
+    fi
+    while IFS=$'\t' read -r segment first last entries; do
+        mv "$stage/$segment" "$LOG_ARCHIVE_DIR/$segment"
+    done < "$stage/rows"
+    mv "$stage/manifest.tsv" "$manifest"
+    
+    local archived=$(awk -F '\t' '{ n += $4 } END { print n }' "$stage/rows")
+    echo "Archived $archived log entries to $LOG_ARCHIVE_DIR/"
+    rm -rf "$stage"
+}
+
+# Search the full log history: archived segments (via the manifest) then LOG.md
+# Prints every entry containing the pattern (case-insensitive); with no
+# pattern prints every entry in the date range.
+log_history() {
+    local since="" until="" pattern=""
+    while [[ $# -gt 0 ]]; do
+        case "$1" in
+            --since)
+                since="${2:-}"
+                shift 2
+                ;;
+            --until)
+                until="${2:-}"
+                shift 2
+                ;;
+            *)
+                pattern="$1"
+                shift
+                ;;
+        esac
+    done
+    
+    local manifest="$LOG_ARCHIVE_DIR/manifest.tsv"
+    {
+        if [[ -f "$manifest" ]]; then
+            # Only decompress segments whose date range overlaps the request
+            awk -F '\t' -v since="$since" -v until="$until" '
+                /^#/ { next }
+                (since == "" || $3 >= since) && (until == "" || substr($2, 1, length(until)) <= until) { print $1 }
+            ' "$manifest" | while IFS= read -r segment; do
+                gzip -dc "$LOG_ARCHIVE_DIR/$segment"
+            done
+        fi
+        [[ -f "LOG.md" ]] && cat LOG.md
+    } | awk -v since="$since" -v until="$until" -v pattern="$pattern" '
+        function flush() {
+            if (entry != "" && (pattern == "" || index(tolower(entry), tolower(pattern))) &&
+                (since == "" || date >= since) && (until == "" || substr(date, 1, length(until)) <= until))
+                printf "%s", entry
+            entry = ""
+        }
+        /^### / { flush(); date = $2 }
+        /^### / || entry != "" { entry = entry $0 "\n" }
+        END { flush() }
+    '
+}
+
+# next --json: the same three lists from a single pass over the tasks
+suggest_next_json() {
+    if [[ -f "ROADMAP.md" ]]; then parse_tasks ROADMAP.md; fi | awk -F '\t' -v schema="$JSON_SCHEMA_VERSION" "$JSON_TASK_AWK"'
+        function add(list, item) { return list (list == "" ? "" : ",") item }
+        $2 == "IN_PROGRESS" { progress = add(progress, task_json($1, $2, $3, $4)) }
+        $2 == "TODO" && ++todos <= 5 { todo = add(todo, task_json($1, $2, $3, $4)) }
+        $2 == "BLOCKED" { blocked = add(blocked, task_json($1, $2, $3, $4)) }
+        END {
+            printf "{\"schema\":%d,\"kind\":\"next\",\"in_progress\":[%s],\"todo\":[%s],\"blocked\":[%s]}\n",
+                schema, progress, todo, blocked
+        }
+    '
 }
 
 # Suggest next task - new command for v0.2.5.1
 suggest_next() {
+    if [[ "${1:-}" == "--json" ]]; then
+        suggest_next_json
+        return
+    fi
     echo "SUGGESTED_TASKS:"
     echo ""
     
     # Check for in-progress tasks first
     if [[ -f "ROADMAP.md" ]]; then
-        local in_progress=$(grep "CPM::TASK::.*::IN_PROGRESS::" ROADMAP.md)
+        local in_progress=$(parse_tasks ROADMAP.md IN_PROGRESS)
         if [[ -n "$in_progress" ]]; then
             echo "Continue in-progress work:"
-            echo "$in_progress" | while IFS= read -r line; do
-                local parts=$(echo "$line" | sed 's/::/|/g')
-                local uuid=$(echo "$parts" | cut -d'|' -f3)
-                local desc=$(echo "$parts" | cut -d'|' -f6-)
+            while IFS=$'\t' read -r uuid status date desc; do
                 echo "  [$uuid] $desc"
-            done
+            done <<< "$in_progress"
             echo ""
         fi
         
         # Then show TODO tasks
-        local todos=$(grep "CPM::TASK::.*::TODO::" ROADMAP.md | head -5)
+        local todos=$(parse_tasks ROADMAP.md TODO 5)
         if [[ -n "$todos" ]]; then
             echo "Available TODO tasks:"
-            echo "$todos" | while IFS= read -r line; do
-                local parts=$(echo "$line" | sed 's/::/|/g')
-                local uuid=$(echo "$parts" | cut -d'|' -f3)
-                local desc=$(echo "$parts" | cut -d'|' -f6-)
+            while IFS=$'\t' read -r uuid status date desc; do
                 echo "  [$uuid] $desc"
-            done
+            done <<< "$todos"
         fi
         
         # Show blocked tasks
-        local blocked=$(grep "CPM::TASK::.*::BLOCKED::" ROADMAP.md)
+        local blocked=$(parse_tasks ROADMAP.md BLOCKED)
         if [[ -n "$blocked" ]]; then
             echo ""
             echo "Blocked tasks (resolve blockers first):"
-            echo "$blocked" | while IFS= read -r line; do
-                local parts=$(echo "$line" | sed 's/::/|/g')
-                local desc=$(echo "$parts" | cut -d'|' -f6-)
+            while IFS=$'\t' read -r uuid status date desc; do
                 echo "  - $desc"
-            done
+            done <<< "$blocked"
         fi
     else
         echo "No ROADMAP.md found"
     fi
-}
\ No newline at end of file
+}
+
+# Activity rollups and claudepm stats
+source "$CLAUDEPM_LIB_DIR/stats.sh"
+
+# Full-text search
+source "$CLAUDEPM_LIB_DIR/search.sh"
+
+# Daemon: a resident claudepm that answers thin-client requests
+# Requests arrive on a FIFO in CLAUDEPM_DAEMON_DIR as "reply<TAB>cwd<TAB>args"
+# (args quoted with printf %q); each is served by a forked subshell of this
+# already-loaded shell, so a request pays no bash startup, VERSION read or
+# library parse. Project state stays in the stamp-keyed caches, which every
+# request revalidates, so edits made outside claudepm are always seen.
+daemon_running() {
+    local pid=""
+    [[ -p "$CLAUDEPM_DAEMON_DIR/requests" && -f "$CLAUDEPM_DAEMON_DIR/pid" ]] || return 1
+    read -r pid < "$CLAUDEPM_DAEMON_DIR/pid" || return 1
+    kill -0 "$pid" 2>/dev/null || return 1
+    DAEMON_PID="$pid"
+}
+
+# Claim a request; the daemon and a client that gave up waiting race for it
+# Fails if the other side claimed it first or the client has gone
+daemon_claim() {
+    local reply="$1"
+    [[ -n "$reply" ]] || return 1
+    mkdir "$reply.taken" 2>/dev/null || return 1
+    if [[ ! -p "$reply" ]]; then
+        rmdir "$reply.taken"
+        return 1
+    fi
+}
+
+# Serve one request; stdout streams to the client's reply FIFO
+daemon_handle() {
+    local reply="$1" cwd="$2" args=()
+    daemon_claim "$reply" || return 0
+    eval "args=($3)"
+    local status=0
+    {
+        echo "ok"
+        ( cd "$cwd" && claudepm_main ${args[@]+"${args[@]}"} ) < /dev/null 2> "$reply.err" || status=$?
+        echo "$status" > "$reply.status"
+    } > "$reply"
+}
+
+# Stop taking requests, then hand back the ones already queued
+# Clients that find no FIFO, or are answered "retry", run the command themselves.
+daemon_shutdown() {
+    local dir="$1" reply cwd encoded
+    rm -f "$dir/pid" "$dir/env" "$dir/requests"
+    trap - EXIT
+    # Writers that opened the FIFO before it was removed get a second to finish
+    while IFS=$'\t' read -r -t 1 -u 3 reply cwd encoded; do
+        if daemon_claim "$reply"; then
+            echo "retry" > "$reply"
+        fi
+    done
+    exec 3<&-
+}
+
+# Run the request loop in the foreground
+# Exits after CLAUDEPM_DAEMON_IDLE seconds without requests (default 3600)
+# and after serving a request once its own code has changed on disk.
+# Serves only clients started with the same environment (CLAUDEPM_ENV).
+daemon_serve() {
+    local dir="$CLAUDEPM_DAEMON_DIR"
+    local idle="${CLAUDEPM_DAEMON_IDLE:-3600}"
+    if daemon_running; then
+        echo "Error: daemon already running (pid $DAEMON_PID)"
+        exit 1
+    fi
+    
+    mkdir -p "$dir"
+    rm -f "$dir/requests"
+    mkfifo -m 600 "$dir/requests"
+    printf '%s\n' "${CLAUDEPM_ENV:-}" > "$dir/env"
+    echo $$ > "$dir/pid"
+    trap 'rm -f "$dir/requests" "$dir/pid" "$dir/env"' EXIT
+    trap 'daemon_shutdown "$dir"; exit 0' TERM INT
+    
+    # Per-process probes every request would otherwise repeat
+    stat_flavor
+    local bin="$CLAUDEPM_HOME/bin/claudepm" lib changed
+    
+    # Held open read-write so the loop never sees EOF between clients
+    exec 3<> "$dir/requests"
+    echo "claudepm daemon serving on $dir (pid $$)"
+    local reply cwd encoded
+    while IFS=$'\t' read -r -t "$idle" -u 3 reply cwd encoded; do
+        [[ -n "$reply" && -p "$reply" ]] || continue
+        daemon_handle "$reply" "$cwd" "$encoded" &
+        # The pid file dates the code this shell loaded
+        changed=0
+        [[ "$bin" -nt "$dir/pid" ]] && changed=1
+        for lib in "$CLAUDEPM_HOME"/lib/*.sh; do
+            [[ "$lib" -nt "$dir/pid" ]] && changed=1
+        done
+        if [[ $changed -eq 1 ]]; then
+            echo "claudepm code changed on disk, exiting"
+            break
+        fi
+    done
+    daemon_shutdown "$dir"
+    wait
+}
+
+# claudepm daemon start|stop|status|run
+daemon_command() {
+    local dir="$CLAUDEPM_DAEMON_DIR"
+    case "${1:-status}" in
+        start)
+            if daemon_running; then
+                echo "claudepm daemon already running (pid $DAEMON_PID)"
+                return 0
+            fi
+            mkdir -p "$dir"
+            nohup "$CLAUDEPM_HOME/bin/claudepm" daemon run > "$dir/daemon.log" 2>&1 < /dev/null &
+            local tries=0
+            until daemon_running; do
+                if (( ++tries > 50 )); then
+                    echo "Error: daemon did not start, see $dir/daemon.log"
+                    exit 1
+                fi
+                sleep 0.1
+            done
+            echo "claudepm daemon started (pid $DAEMON_PID)"
+            ;;
+        stop)
+            if ! daemon_running; then
+                rm -f "$dir/requests" "$dir/pid" "$dir/env"
+                echo "claudepm daemon not running"
+                return 0
+            fi
+            kill "$DAEMON_PID"
+            local tries=0
+            while kill -0 "$DAEMON_PID" 2>/dev/null && (( ++tries <= 50 )); do
+                sleep 0.1
+            done
+            echo "claudepm daemon stopped"
+            ;;
+        status)
+            if daemon_running; then
+                echo "claudepm daemon running (pid $DAEMON_PID) on $dir"
+            else
+                echo "claudepm daemon not running"
+                return 1
+            fi
+            ;;
+        run)
+            daemon_serve
+            ;;
+        *)
+            echo "Error: Unknown daemon command: $1"
+            echo "Usage: claudepm daemon start|stop|status|run"
+            exit 1
+            ;;
+    esac
+}
@@ -19,6 +19,19 @@ NC='\033[0m' # No Color
 MODE="${1:-all}"
 EXTRA_ARGS="${@:2}"
 
+# Parallel AI behavioral runs (0 = run scenarios one at a time)
+JOBS="${CLAUDEPM_TEST_JOBS:-0}"
+for arg in "${@:2}"; do
+    case "$arg" in
+        --jobs=*) JOBS="${arg#--jobs=}" ;;
+    esac
+done
+if ! [[ "$JOBS" =~ ^[0-9]+$ ]]; then
+    echo "Error: --jobs must be a non-negative integer, got '$JOBS'" >&2
+    echo "Usage: $0 [mode] [--jobs=N] (see $0 --help)" >&2
+    exit 2
+fi
+
 # Function to print colored output
 print_status() {
     local color=$1
@@ -109,11 +122,26 @@ main() {
         
         for test_file in "$TESTS_DIR"/scenarios/traditional/*/test.bats; do
             if [ -f "$test_file" ]; then
-                ((total_tests++))
+                total_tests=$((total_tests + 1))
                 if run_isolated_test "$test_file" "bats"; then
-                    ((passed_tests++))
+                    passed_tests=$((passed_tests + 1))
+                else
+                    failed_tests=$((failed_tests + 1))
+                fi
+            fi
+        done
+        
+        # Self-tests of the Python test framework (fake CLI, no API calls)
+        for test_file in "$SCRIPT_DIR"/sdk/test_*.py; do
+            if [ -f "$test_file" ]; then
+                total_tests=$((total_tests + 1))
+                print_status "$BLUE" "RUN" "Testing: $(basename "$test_file" .py)"
+                if python3 "$test_file" >/dev/null; then
+                    print_status "$GREEN" "PASS" "$(basename "$test_file" .py)"
+                    passed_tests=$((passed_tests + 1))
                 else
-                    ((failed_tests++))
+                    print_status "$RED" "FAIL" "$(basename "$test_file" .py)"
+                    failed_tests=$((failed_tests + 1))
                 fi
             fi
         done
@@ -124,16 +152,28 @@ main() {
         print_status "$BLUE" "INFO" "Running AI behavioral tests..."
         
         # Note: We use claude CLI which doesn't need ANTHROPIC_API_KEY
-        for test_file in "$TESTS_DIR"/scenarios/ai-behavioral/*/test.py; do
-            if [ -f "$test_file" ]; then
-                ((total_tests++))
-                if run_isolated_test "$test_file" "python"; then
-                    ((passed_tests++))
-                else
-                    ((failed_tests++))
-                fi
+        if [ "$JOBS" -gt 0 ]; then
+            # Bounded worker pool, one isolated temp dir per scenario/variant
+            total_tests=$((total_tests + 1))
+            mkdir -p "$TESTS_DIR/.test-results"
+            if python3 "$SCRIPT_DIR/sdk/parallel_runner.py" --jobs="$JOBS" \
+                    --report="$TESTS_DIR/.test-results/ai-behavioral.json"; then
+                passed_tests=$((passed_tests + 1))
+            else
+                failed_tests=$((failed_tests + 1))
             fi
-        done
+        else
+            for test_file in "$TESTS_DIR"/scenarios/ai-behavioral/*/test.py; do
+                if [ -f "$test_file" ]; then
+                    total_tests=$((total_tests + 1))
+                    if run_isolated_test "$test_file" "python"; then
+                        passed_tests=$((passed_tests + 1))
+                    else
+                        failed_tests=$((failed_tests + 1))
+                    fi
+                fi
+            done
+        fi
     fi
     
     # Summary
@@ -154,20 +194,40 @@ main() {
     fi
 }
 
+# Benchmarks time commands instead of passing/failing tests
+if [ "$MODE" = "bench" ]; then
+    if ! command -v python3 >/dev/null 2>&1; then
+        print_status "$RED" "FAIL" "python3 is required for benchmarks"
+        exit 1
+    fi
+    exec python3 "$SCRIPT_DIR/sdk/benchmark.py" "${@:2}"
+fi
+
 # Show help if requested
 if [ "$MODE" = "-h" ] || [ "$MODE" = "--help" ]; then
     echo "Usage: $0 [mode] [options]"
     echo ""
     echo "Modes:"
     echo "  all          Run all tests (default)"
-    echo "  traditional  Run only traditional bats tests"
+    echo "  traditional  Run only traditional bats tests and framework self-tests"
     echo "  ai-behavioral Run only AI behavioral tests"
+    echo "  bench        Time commands on synthetic fixtures (see bench --help)"
     echo ""
     echo "Options:"
     echo "  --model=MODEL  Use specific model for AI tests (default: haiku)"
+    echo "  --jobs=N       Run AI scenarios on N parallel workers"
+    echo ""
+    echo "Bench options:"
+    echo "  --scale=smoke|full  Fixture size (default: full)"
+    echo "  --iterations=N      Timed runs per command (default: 5)"
+    echo "  --threshold=PCT     Fail when a median regresses more than PCT% (default: 25)"
+    echo "  --save-baseline     Record this run as the baseline"
     echo ""
     echo "Environment variables:"
     echo "  ANTHROPIC_API_KEY  Required for AI behavioral tests"
+    echo "  CLAUDEPM_TEST_JOBS Default for --jobs"
+    echo "  CLAUDEPM_TEST_CACHE Response cache mode: off|record|replay|refresh"
+    echo "  CLAUDEPM_BENCH_SCALE, CLAUDEPM_BENCH_THRESHOLD  Bench defaults"
     exit 0
 fi
 
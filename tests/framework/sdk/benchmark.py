@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Synthetic-scale benchmarks for claudepm commands
+
+Generates fixtures far larger than any test scenario (a ROADMAP.md with
+tens of thousands of CPM::TASK lines, a LOG.md with tens of thousands of
+entries, a projects.list of hundreds of projects and a tree full of TODOs),
+times each command over several iterations and writes a JSON report.
+
+Given a baseline report, a command whose median regresses by more than the
+threshold fails the run:
+
+    python3 benchmark.py --save-baseline          # record on a known-good tree
+    python3 benchmark.py --threshold=25           # compare later runs against it
+
+Fixtures and baselines carry the scale they were made at; comparing runs
+made at different scales is an error.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
+
+SDK_DIR = os.path.dirname(os.path.abspath(__file__))
+TESTS_DIR = os.path.abspath(os.path.join(SDK_DIR, '../..'))
+PROJECT_ROOT = os.path.abspath(os.path.join(TESTS_DIR, '..'))
+RESULTS_DIR = os.path.join(TESTS_DIR, '.test-results')
+
+REPORT_FORMAT = 1
+DEFAULT_ITERATIONS = 5
+DEFAULT_THRESHOLD = 25.0
+# Regressions smaller than this many ms are treated as noise
+NOISE_FLOOR_MS = 5.0
+
+SCALES = {
+    "smoke": {"tasks": 1000, "log_entries": 1000, "projects": 20, "todo_files": 50},
+    "full": {"tasks": 100000, "log_entries": 50000, "projects": 500, "todo_files": 2000},
+}
+TODOS_PER_FILE = 5
+STATUSES = ["TODO"] * 6 + ["IN_PROGRESS", "BLOCKED", "DONE", "DONE"]
+
+
+@dataclass
+class BenchCase:
+    """One command to time, run from a fixture directory"""
+    name: str
+    args: List[str]
+    cwd: str
+    # Fresh copy of this directory for every run (for commands that write)
+    fresh_from: Optional[str] = None
+
+
+@dataclass
+class BenchResult:
+    """Timings of one case, in milliseconds"""
+    name: str
+    cold_ms: float
+    median_ms: float
+    min_ms: float
+    runs_ms: List[float] = field(default_factory=list)
+
+
+def write_roadmap(path: str, tasks: int, rng: random.Random):
+    with open(path, 'w') as f:
+        f.write("# Roadmap\n\n## Tasks\n\n")
+        for i in range(tasks):
+            status = rng.choice(STATUSES)
+            f.write(f"CPM::TASK::{i:08x}-0000-4000-8000-{rng.getrandbits(48):012x}::{status}::"
+                    f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}::Synthetic task {i} for component {i % 97}\n")
+
+
+def write_log(path: str, entries: int):
+    with open(path, 'w') as f:
+        f.write("# Work Log\n")
+        for i in range(entries):
+            day = 1 + (i // 4) % 28
+            month = 1 + (i // 112) % 12
+            f.write(f"\n### 2025-{month:02d}-{day:02d} {8 + i % 10:02d}:00 - Work block {i}\n"
+                    f"Did: Implemented part {i} of the synthetic feature\n"
+                    f"Next: Continue with part {i + 1}\n\n---\n")
+
+
+def git_commit_all(path: str):
+    env = dict(os.environ, GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@example.com",
+               GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@example.com")
+    for cmd in (['git', 'init', '-q'], ['git', 'add', '-A'], ['git', 'commit', '-q', '-m', 'fixture']):
+        subprocess.run(cmd, cwd=path, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def build_fixtures(root: str, scale: str, seed: int = 42) -> Dict[str, str]:
+    """Create every fixture under root; returns named paths"""
+    sizes = SCALES[scale]
+    rng = random.Random(seed)
+    version = open(os.path.join(PROJECT_ROOT, 'VERSION')).read().strip()
+
+    # claudepm registers projects in CLAUDEPM_HOME, so give it a private one
+    home = os.path.join(root, 'claudepm-home')
+    os.makedirs(home)
+    for item in ('bin', 'lib', 'templates', 'VERSION'):
+        os.symlink(os.path.join(PROJECT_ROOT, item), os.path.join(home, item))
+
+    big = os.path.join(root, 'big-project')
+    os.makedirs(big)
+    with open(os.path.join(big, '.claudepm'), 'w') as f:
+        f.write(f"template_version={version}\n")
+    write_roadmap(os.path.join(big, 'ROADMAP.md'), sizes["tasks"], rng)
+    write_log(os.path.join(big, 'LOG.md'), sizes["log_entries"])
+    git_commit_all(big)
+
+    registry = os.path.join(root, 'projects')
+    paths = []
+    for i in range(sizes["projects"]):
+        project = os.path.join(registry, f"p{i:04d}")
+        os.makedirs(project)
+        with open(os.path.join(project, '.claudepm'), 'w') as f:
+            f.write(f"template_version={version}\n")
+        write_log(os.path.join(project, 'LOG.md'), 3)
+        write_roadmap(os.path.join(project, 'ROADMAP.md'), 10, rng)
+        paths.append(project)
+    with open(os.path.join(home, 'projects.list'), 'w') as f:
+        f.write('\n'.join(paths) + '\n')
+
+    todo_repo = os.path.join(root, 'todo-repo')
+    for i in range(sizes["todo_files"]):
+        source = os.path.join(todo_repo, f"pkg{i % 20:02d}", f"module{i}.py")
+        os.makedirs(os.path.dirname(source), exist_ok=True)
+        with open(source, 'w') as f:
+            for j in range(TODOS_PER_FILE):
+                f.write(f"def f{j}():\n    # TODO: handle case {j} in module {i}\n    pass\n\n")
+    git_commit_all(todo_repo)
+
+    return {"home": home, "big": big, "registry": registry, "todo_repo": todo_repo}
+
+
+def bench_cases(fixtures: Dict[str, str]) -> List[BenchCase]:
+    big = fixtures["big"]
+    return [
+        BenchCase("task list", ['task', 'list'], big),
+        BenchCase("next", ['next'], big),
+        BenchCase("context", ['context'], big),
+        BenchCase("health", ['health'], big),
+        BenchCase("doctor", ['doctor'], fixtures["registry"]),
+        BenchCase("search", ['search', 'synthetic', 'part'], fixtures["registry"]),
+        BenchCase("adopt", ['adopt'], fixtures["todo_repo"], fresh_from=fixtures["todo_repo"]),
+    ]
+
+
+def run_case(case: BenchCase, env: Dict[str, str], iterations: int, scratch: str) -> BenchResult:
+    """Time a case; the first run is reported separately as the cold run"""
+    runs = []
+    for i in range(iterations + 1):
+        cwd = case.cwd
+        if case.fresh_from:
+            cwd = os.path.join(scratch, f"{os.path.basename(case.fresh_from)}-{i}")
+            shutil.copytree(case.fresh_from, cwd, symlinks=True)
+        start = time.perf_counter()
+        result = subprocess.run([os.path.join(PROJECT_ROOT, 'bin', 'claudepm')] + case.args,
+                                cwd=cwd, env=env, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"claudepm {' '.join(case.args)} failed: {result.stderr.strip()}")
+        runs.append(round(elapsed, 1))
+        if case.fresh_from:
+            shutil.rmtree(cwd, ignore_errors=True)
+
+    warm = runs[1:] or runs
+    return BenchResult(name=case.name, cold_ms=runs[0],
+                       median_ms=round(statistics.median(warm), 1),
+                       min_ms=min(warm), runs_ms=warm)
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return one message per command that regressed past the threshold"""
+    if baseline.get("scale") != report["scale"]:
+        raise ValueError(f"Baseline was recorded at scale '{baseline.get('scale')}', "
+                         f"this run used '{report['scale']}'")
+    previous = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(result["name"])
+        if not before:
+            continue
+        limit = before["median_ms"] * (1 + threshold / 100)
+        if result["median_ms"] > limit and result["median_ms"] - before["median_ms"] > NOISE_FLOOR_MS:
+            regressions.append(f"{result['name']}: {result['median_ms']:.1f}ms vs baseline "
+                               f"{before['median_ms']:.1f}ms (+{threshold:g}% allowed)")
+    return regressions
+
+
+def print_report(report: Dict, baseline: Optional[Dict]):
+    previous = {r["name"]: r for r in (baseline or {}).get("results", [])}
+    print("")
+    print(f"Benchmark Report (scale: {report['scale']}, {report['iterations']} iterations)")
+    print("=" * 60)
+    print(f"{'command':<14} {'cold':>9} {'median':>9} {'min':>9} {'baseline':>10}")
+    for result in report["results"]:
+        before = previous.get(result["name"])
+        base = f"{before['median_ms']:.1f}" if before else "-"
+        print(f"{result['name']:<14} {result['cold_ms']:>9.1f} {result['median_ms']:>9.1f} "
+              f"{result['min_ms']:>9.1f} {base:>10}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark claudepm commands on synthetic fixtures")
+    parser.add_argument('commands', nargs='*', help="Commands to run (default: all)")
+    parser.add_argument('--scale', choices=sorted(SCALES), default=os.environ.get('CLAUDEPM_BENCH_SCALE', 'full'))
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS,
+                        help=f"Timed runs per command after the cold run (default: {DEFAULT_ITERATIONS})")
+    parser.add_argument('--threshold', type=float,
+                        default=float(os.environ.get('CLAUDEPM_BENCH_THRESHOLD', DEFAULT_THRESHOLD)),
+                        help=f"Allowed median regression in percent (default: {DEFAULT_THRESHOLD:g})")
+    parser.add_argument('--baseline', default=os.path.join(RESULTS_DIR, 'bench-baseline.json'),
+                        help="Baseline report to compare against")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Write this run's report as the new baseline")
+    parser.add_argument('--report', default=os.path.join(RESULTS_DIR, 'bench.json'),
+                        help="Where to write this run's report")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="claudepm-bench-")
+    try:
+        print(f"Generating {args.scale} fixtures in {workdir}...")
+        fixtures = build_fixtures(os.path.join(workdir, 'fixtures'), args.scale)
+        env = os.environ.copy()
+        env.update({
+            'CLAUDEPM_HOME': fixtures["home"],
+            'CLAUDEPM_CONFIG': os.path.join(workdir, 'config'),
+            'CLAUDEPM_STATE_DIR': os.path.join(workdir, 'state'),
+            'CLAUDEPM_DAEMON': '0',
+            'HOME': workdir,
+        })
+
+        cases = [c for c in bench_cases(fixtures) if not args.commands or c.name in args.commands]
+        results = []
+        for case in cases:
+            print(f"  timing: claudepm {' '.join(case.args)}", flush=True)
+            results.append(run_case(case, env, args.iterations, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "format": REPORT_FORMAT,
+        "scale": args.scale,
+        "sizes": SCALES[args.scale],
+        "iterations": args.iterations,
+        "platform": f"{platform.system()} {platform.machine()}",
+        "results": [asdict(r) for r in results],
+    }
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        shutil.copyfile(args.report, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
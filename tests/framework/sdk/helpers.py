@@ -12,12 +12,20 @@ import shutil
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from response_cache import ResponseCache, snapshot_workspace
+from streaming import ShellCommandParser
+
 
 class ClaudeTestClient:
     """Wrapper for claude CLI testing"""
     
-    def __init__(self, model: str = "claude-3-haiku-20240307"):
+    def __init__(self, model: str = "claude-3-haiku-20240307",
+                 cache: ResponseCache = None):
         self.model = model
+        self.cache = cache or ResponseCache()
+        # Replay-only runs never call the CLI, so they don't need it installed
+        if self.cache.mode == "replay":
+            return
         # Check if claude CLI is available
         result = subprocess.run(['which', 'claude'], capture_output=True, text=True)
         if result.returncode != 0:
@@ -34,7 +42,39 @@ class ClaudeTestClient:
         - output: string output from claude
         - shell_commands: list of shell commands executed (parsed from output)
         - exit_code: int
+        - cached: bool, True when replayed from the response cache
         """
+        if not self.cache.enabled:
+            return self._run_cli(prompt, cwd, timeout, allowed_tools, system_prompt)
+
+        before = snapshot_workspace(cwd)
+        key = self.cache.make_key(self.model, prompt, system_prompt, allowed_tools, before)
+        entry = self.cache.load(key)
+        if entry is not None:
+            result = self.cache.apply(entry, cwd)
+            result["shell_commands"] = self._extract_shell_commands(result["output"])
+            result["cached"] = True
+            return result
+
+        if self.cache.mode == "replay":
+            return {
+                "success": False,
+                "output": "",
+                "error": f"No recorded response (replay mode, key {key[:12]})",
+                "shell_commands": [],
+                "exit_code": -1,
+                "cached": False
+            }
+
+        result = self._run_cli(prompt, cwd, timeout, allowed_tools, system_prompt)
+        # Timeouts are not worth replaying
+        if result["exit_code"] != -1:
+            self.cache.store(key, result, cwd, before)
+        return result
+
+    def _run_cli(self, prompt: str, cwd: str, timeout: int,
+                 allowed_tools: List[str], system_prompt: str) -> Dict[str, Any]:
+        """Run the claude CLI once, with no caching"""
         try:
             # Build command with necessary flags
             cmd = ['claude', '-p', prompt]
@@ -64,7 +104,8 @@ class ClaudeTestClient:
                 "output": result.stdout,
                 "error": result.stderr,
                 "shell_commands": shell_commands,
-                "exit_code": result.returncode
+                "exit_code": result.returncode,
+                "cached": False
             }
         except subprocess.TimeoutExpired:
             return {
@@ -72,29 +113,16 @@ class ClaudeTestClient:
                 "output": "",
                 "error": "Command timed out",
                 "shell_commands": [],
-                "exit_code": -1
+                "exit_code": -1,
+                "cached": False
             }
     
     def _extract_shell_commands(self, output: str) -> List[str]:
         """Extract shell commands from claude output"""
-        commands = []
-        in_bash_block = False
-        current_block = []
-        
+        parser = ShellCommandParser(json_lines=False)
         for line in output.split('\n'):
-            if line.strip() == '```bash':
-                in_bash_block = True
-                current_block = []
-            elif line.strip() == '```' and in_bash_block:
-                in_bash_block = False
-                if current_block:
-                    commands.extend(current_block)
-            elif in_bash_block:
-                # Skip empty lines and comments
-                if line.strip() and not line.strip().startswith('#'):
-                    commands.append(line)
-        
-        return commands
+            parser.feed(line)
+        return parser.commands
 
 
 def create_claude_client(model: str = "claude-3-haiku-20240307") -> ClaudeTestClient:
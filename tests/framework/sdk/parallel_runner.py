@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Parallel runner for AI behavioral scenarios
+
+Runs every scenario (and every variant a scenario declares) on a bounded
+worker pool. Each job gets its own temp directory, so wall-clock time is
+set by the slowest scenario instead of the sum of all CLI calls.
+
+A scenario declares variants with a module-level list, e.g.:
+
+    VARIANTS = ["manager", "project", "task-agent"]
+
+Each variant is then run as `python3 test.py <variant>`.
+"""
+
+import argparse
+import ast
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from typing import List, Optional
+
+SDK_DIR = os.path.dirname(os.path.abspath(__file__))
+TESTS_DIR = os.path.abspath(os.path.join(SDK_DIR, '../..'))
+PROJECT_ROOT = os.path.abspath(os.path.join(TESTS_DIR, '..'))
+SCENARIOS_DIR = os.path.join(TESTS_DIR, 'scenarios', 'ai-behavioral')
+
+DEFAULT_JOBS = 4
+DEFAULT_TIMEOUT = 600
+
+
+@dataclass
+class ScenarioJob:
+    """A single unit of work: one scenario, optionally one variant of it"""
+    name: str
+    scenario_dir: str
+    variant: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}[{self.variant}]" if self.variant else self.name
+
+
+@dataclass
+class ScenarioResult:
+    """Outcome of one job"""
+    label: str
+    passed: bool
+    exit_code: int
+    duration: float
+    output: str
+
+
+def read_variants(test_file: str) -> List[str]:
+    """Read a module-level VARIANTS list without importing the test"""
+    with open(test_file, 'r') as f:
+        tree = ast.parse(f.read(), filename=test_file)
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == 'VARIANTS':
+                    return list(ast.literal_eval(node.value))
+    return []
+
+
+def discover_jobs(scenarios_dir: str = SCENARIOS_DIR,
+                  only: List[str] = None) -> List[ScenarioJob]:
+    """Expand scenario directories into jobs, one per declared variant"""
+    jobs = []
+    for name in sorted(os.listdir(scenarios_dir)):
+        scenario_dir = os.path.join(scenarios_dir, name)
+        test_file = os.path.join(scenario_dir, 'test.py')
+        if not os.path.isfile(test_file):
+            continue
+        if only and name not in only:
+            continue
+
+        variants = read_variants(test_file)
+        if variants:
+            jobs.extend(ScenarioJob(name, scenario_dir, v) for v in variants)
+        else:
+            jobs.append(ScenarioJob(name, scenario_dir))
+    return jobs
+
+
+def run_job(job: ScenarioJob, timeout: int = DEFAULT_TIMEOUT) -> ScenarioResult:
+    """
+    Run one job in its own temp directory
+
+    The scenario directory is copied so scenarios that write into their
+    setup/ folder can't collide. TMPDIR points inside the job directory,
+    so anything the test creates with tempfile is cleaned up with it.
+    """
+    job_dir = tempfile.mkdtemp(prefix=f"claudepm-{job.name}-")
+    workdir = os.path.join(job_dir, job.name)
+    scratch = os.path.join(job_dir, 'tmp')
+    os.makedirs(scratch)
+    shutil.copytree(job.scenario_dir, workdir)
+
+    env = os.environ.copy()
+    env['TMPDIR'] = scratch
+    env['CLAUDEPM_PROJECT_ROOT'] = PROJECT_ROOT
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SDK_DIR, env.get('PYTHONPATH')]))
+    env['PYTHONUNBUFFERED'] = '1'
+
+    cmd = [sys.executable, 'test.py']
+    if job.variant:
+        cmd.append(job.variant)
+
+    start = time.monotonic()
+    try:
+        result = subprocess.run(cmd, cwd=workdir, env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, timeout=timeout)
+        exit_code = result.returncode
+        output = result.stdout
+    except subprocess.TimeoutExpired as e:
+        exit_code = -1
+        output = (e.stdout or '') if isinstance(e.stdout, str) else ''
+        output += f"\nScenario timed out after {timeout}s"
+    finally:
+        cleanup_job_dir(job_dir)
+
+    return ScenarioResult(label=job.label,
+                          passed=exit_code == 0,
+                          exit_code=exit_code,
+                          duration=time.monotonic() - start,
+                          output=output)
+
+
+def cleanup_job_dir(job_dir: str):
+    """Remove a job directory, clearing append-only flags on macOS first"""
+    if sys.platform == "darwin":
+        subprocess.run(['find', job_dir, '-name', 'CLAUDE_LOG.md', '-exec',
+                        'chflags', 'nouappnd', '{}', ';'], stderr=subprocess.DEVNULL)
+    shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def run_parallel(jobs: List[ScenarioJob], max_workers: int = DEFAULT_JOBS,
+                 timeout: int = DEFAULT_TIMEOUT, on_result=None) -> List[ScenarioResult]:
+    """
+    Run jobs on a bounded thread pool
+
+    Each job is its own subprocess, so threads only wait on I/O.
+    on_result is called as each job finishes; the returned list is in
+    job order so reports are deterministic.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(run_job, job, timeout): job for job in jobs}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future].label] = result
+            if on_result:
+                on_result(result)
+    return [results[job.label] for job in jobs]
+
+
+def print_report(results: List[ScenarioResult], wall_time: float, verbose: bool = False):
+    """Print a merged report for all jobs"""
+    print("")
+    print("AI Behavioral Report")
+    print("====================")
+    for result in results:
+        mark = "✓" if result.passed else "✗"
+        print(f"{mark} {result.label:<40} {result.duration:6.1f}s")
+        if verbose or not result.passed:
+            for line in result.output.rstrip().split('\n'):
+                print(f"    {line}")
+
+    passed = sum(1 for r in results if r.passed)
+    serial_time = sum(r.duration for r in results)
+    print("")
+    print(f"Passed: {passed}/{len(results)}")
+    print(f"Wall time: {wall_time:.1f}s (serial would be ~{serial_time:.1f}s)")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run AI behavioral scenarios in parallel")
+    parser.add_argument('scenarios', nargs='*', help="Scenario names to run (default: all)")
+    parser.add_argument('-j', '--jobs', type=int,
+                        default=int(os.environ.get('CLAUDEPM_TEST_JOBS', DEFAULT_JOBS)),
+                        help=f"Maximum concurrent scenarios (default: {DEFAULT_JOBS})")
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT,
+                        help="Per-scenario timeout in seconds")
+    parser.add_argument('--report', help="Write a JSON report to this path")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Show output of passing scenarios too")
+    args = parser.parse_args(argv)
+
+    jobs = discover_jobs(only=args.scenarios)
+    if not jobs:
+        print("No AI behavioral scenarios found")
+        return 1
+
+    print(f"Running {len(jobs)} scenario jobs with up to {args.jobs} workers")
+    start = time.monotonic()
+    results = run_parallel(
+        jobs, max_workers=args.jobs, timeout=args.timeout,
+        on_result=lambda r: print(f"  {'done' if r.passed else 'FAIL'}: {r.label} ({r.duration:.1f}s)", flush=True))
+    wall_time = time.monotonic() - start
+
+    print_report(results, wall_time, verbose=args.verbose)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({"wall_time": wall_time,
+                       "results": [asdict(r) for r in results]}, f, indent=2)
+
+    return 0 if all(r.passed for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
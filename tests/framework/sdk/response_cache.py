@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Record/replay cache for claude CLI calls in behavioral tests
+
+Entries are content-addressed: the key is a hash of the model, prompt,
+system prompt, allowed tools and a snapshot of the workspace taken before
+the run. An entry stores stdout/stderr/exit code plus the file changes the
+run made, so a replay leaves the workspace exactly as a live run would.
+
+Modes (CLAUDEPM_TEST_CACHE):
+- off:     always call the CLI, never touch the cache (default)
+- record:  replay on hit, call the CLI and store on miss
+- replay:  replay only; a miss is reported as a failed run
+- refresh: always call the CLI and overwrite the stored entry
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional, Any
+
+MODES = ("off", "record", "replay", "refresh")
+CACHE_FORMAT = 1
+
+DEFAULT_CACHE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '../../.cache/responses'))
+
+# Directories never included in workspace snapshots
+SKIP_DIRS = {'.git', '__pycache__'}
+
+
+def snapshot_workspace(root: str) -> Dict[str, str]:
+    """Map relative path -> sha256 of content for every file under root"""
+    snapshot = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                snapshot[os.path.relpath(path, root)] = hashlib.sha256(f.read()).hexdigest()
+
+    # The checked-out branch matters to role tests, so fold HEAD in
+    head = os.path.join(root, '.git', 'HEAD')
+    if os.path.isfile(head):
+        with open(head, 'rb') as f:
+            snapshot['.git/HEAD'] = hashlib.sha256(f.read()).hexdigest()
+    return snapshot
+
+
+def workspace_hash(snapshot: Dict[str, str]) -> str:
+    """Stable hash of a workspace snapshot"""
+    digest = hashlib.sha256()
+    for path in sorted(snapshot):
+        digest.update(f"{path}\0{snapshot[path]}\n".encode())
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed store of claude CLI responses"""
+
+    def __init__(self, mode: str = None, cache_dir: str = None):
+        self.mode = mode or os.environ.get('CLAUDEPM_TEST_CACHE', 'off')
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown cache mode '{self.mode}'. Use one of: {', '.join(MODES)}")
+        self.cache_dir = cache_dir or os.environ.get('CLAUDEPM_TEST_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def make_key(self, model: str, prompt: str, system_prompt: Optional[str],
+                 allowed_tools: Optional[List[str]], snapshot: Dict[str, str]) -> str:
+        """Hash every input that can change the CLI's behavior"""
+        payload = json.dumps({
+            "format": CACHE_FORMAT,
+            "model": model,
+            "prompt": prompt,
+            "system_prompt": system_prompt,
+            "allowed_tools": sorted(allowed_tools or []),
+            "workspace": workspace_hash(snapshot),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a stored entry, or None on a miss"""
+        if self.mode == "refresh":
+            return None
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        with open(path, 'r') as f:
+            entry = json.load(f)
+        self.hits += 1
+        return entry
+
+    def store(self, key: str, result: Dict[str, Any], cwd: str,
+              before: Dict[str, str]):
+        """Record a live result together with the file changes it made"""
+        after = snapshot_workspace(cwd)
+        changed = {}
+        for path, digest in after.items():
+            if before.get(path) != digest and not path.startswith('.git/'):
+                with open(os.path.join(cwd, path), 'rb') as f:
+                    changed[path] = base64.b64encode(f.read()).decode('ascii')
+        deleted = sorted(p for p in before if p not in after)
+
+        entry = {
+            "format": CACHE_FORMAT,
+            "result": {k: result[k] for k in ("success", "output", "error", "exit_code")},
+            "files": {"changed": changed, "deleted": deleted},
+        }
+
+        # Write atomically so parallel runners never read a partial entry
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def apply(self, entry: Dict[str, Any], cwd: str) -> Dict[str, Any]:
+        """Replay a stored entry's file changes into cwd and return its result"""
+        for path, content in entry["files"]["changed"].items():
+            target = os.path.join(cwd, path)
+            data = base64.b64decode(content)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+
+            # Appends are replayed as appends so append-only logs stay valid
+            existing = b''
+            if os.path.exists(target):
+                with open(target, 'rb') as f:
+                    existing = f.read()
+            if existing and data.startswith(existing):
+                with open(target, 'ab') as f:
+                    f.write(data[len(existing):])
+            else:
+                with open(target, 'wb') as f:
+                    f.write(data)
+        for path in entry["files"]["deleted"]:
+            target = os.path.join(cwd, path)
+            if os.path.exists(target):
+                os.remove(target)
+        return dict(entry["result"])
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Asyncio streaming client for AI behavioral tests
+
+Reads the claude CLI's output line by line and feeds an incremental parser,
+so a test can stop the run as soon as its verdict is known (e.g. the
+manager role starting a code edit) instead of waiting out the timeout.
+
+All clients are coroutine based, so any number of them can share one
+event loop:
+
+    client = AsyncClaudeTestClient()
+    client.abort_when(abort_on_tool("Write", "Edit"))
+    results = asyncio.run(gather_bounded([
+        client.run_in_directory(prompt, d) for d in dirs
+    ], limit=4))
+"""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import signal
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Seconds to wait after SIGTERM before SIGKILL
+TERMINATE_GRACE = 2
+
+# stream-json events can be long single lines
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+
+@dataclass
+class StreamEvent:
+    """Something the parser recognized in the output stream"""
+    kind: str                      # "text", "shell_command" or "tool_call"
+    text: str = ""
+    tool: Optional[str] = None
+    tool_input: Dict[str, Any] = field(default_factory=dict)
+
+
+# A predicate returns a reason string to abort the run, or None to continue
+AbortPredicate = Callable[[StreamEvent], Optional[str]]
+
+
+class ShellCommandParser:
+    """
+    Incremental version of ClaudeTestClient._extract_shell_commands
+
+    Feed it one line at a time; it returns the events that line completed.
+    Lines that are JSON objects from `--output-format stream-json` are
+    decoded into tool calls and text; anything else is treated as plain
+    text output with ```bash blocks. Pass json_lines=False for plain
+    text output.
+    """
+
+    def __init__(self, json_lines: bool = True):
+        self.json_lines = json_lines
+        self.in_bash_block = False
+        self.commands: List[str] = []
+        self.tool_calls: List[StreamEvent] = []
+        self.text: List[str] = []
+        self.final_result: Optional[str] = None
+
+    def feed(self, line: str) -> List[StreamEvent]:
+        stripped = line.strip()
+        if self.json_lines and stripped.startswith('{'):
+            try:
+                message = json.loads(stripped)
+            except ValueError:
+                message = None
+            if isinstance(message, dict):
+                return self._feed_json(message)
+        return self._feed_text(line)
+
+    def _feed_text(self, line: str) -> List[StreamEvent]:
+        self.text.append(line)
+        events = [StreamEvent("text", text=line)]
+        stripped = line.strip()
+
+        if stripped == '```bash':
+            self.in_bash_block = True
+        elif stripped == '```' and self.in_bash_block:
+            self.in_bash_block = False
+        elif self.in_bash_block:
+            # Skip empty lines and comments
+            if stripped and not stripped.startswith('#'):
+                self.commands.append(line)
+                events.append(StreamEvent("shell_command", text=line))
+        return events
+
+    def _feed_json(self, message: Dict[str, Any]) -> List[StreamEvent]:
+        if message.get("type") == "result":
+            self.final_result = message.get("result", "")
+            return []
+
+        events = []
+        content = (message.get("message") or {}).get("content") or []
+        for block in content if isinstance(content, list) else []:
+            if block.get("type") == "tool_use":
+                event = StreamEvent("tool_call", tool=block.get("name"),
+                                    tool_input=block.get("input") or {})
+                self.tool_calls.append(event)
+                events.append(event)
+                command = event.tool_input.get("command")
+                if event.tool == "Bash" and command:
+                    self.commands.append(command)
+                    events.append(StreamEvent("shell_command", text=command))
+            elif block.get("type") == "text":
+                for text_line in block.get("text", "").split('\n'):
+                    events.extend(self._feed_text(text_line))
+        return events
+
+    @property
+    def output(self) -> str:
+        if self.final_result is not None:
+            return self.final_result
+        return '\n'.join(self.text)
+
+
+def abort_on_tool(*tools: str, path_pattern: str = None) -> AbortPredicate:
+    """Abort when one of the given tools is called (optionally on matching paths)"""
+    def predicate(event: StreamEvent) -> Optional[str]:
+        if event.kind != "tool_call" or event.tool not in tools:
+            return None
+        path = str(event.tool_input.get("file_path", ""))
+        if path_pattern and not re.search(path_pattern, path):
+            return None
+        return f"tool call {event.tool} {path}".strip()
+    return predicate
+
+
+def abort_on_command(pattern: str) -> AbortPredicate:
+    """Abort when a shell command matches the given regex"""
+    regex = re.compile(pattern)
+
+    def predicate(event: StreamEvent) -> Optional[str]:
+        if event.kind == "shell_command" and regex.search(event.text):
+            return f"shell command matched {pattern!r}: {event.text.strip()}"
+        return None
+    return predicate
+
+
+class AsyncClaudeTestClient:
+    """Streaming, cancellable wrapper for claude CLI testing"""
+
+    def __init__(self, model: str = "claude-3-haiku-20240307",
+                 stream_json: bool = True):
+        self.model = model
+        self.stream_json = stream_json
+        self.predicates: List[AbortPredicate] = []
+        if shutil.which('claude') is None:
+            raise ValueError("claude CLI not found. Please install Claude Code.")
+
+    def abort_when(self, predicate: AbortPredicate):
+        """Register a predicate checked against every event of every run"""
+        self.predicates.append(predicate)
+
+    async def run_in_directory(self, prompt: str, cwd: str, timeout: int = 30,
+                               allowed_tools: List[str] = None,
+                               system_prompt: str = None,
+                               abort_on: List[AbortPredicate] = None) -> Dict[str, Any]:
+        """
+        Run claude CLI in a directory, streaming its output
+
+        Returns the same dict as ClaudeTestClient.run_in_directory plus:
+        - aborted: bool, True if a predicate stopped the run
+        - abort_reason: the predicate's reason, if aborted
+        - tool_calls: list of (tool, input) seen in the stream
+        """
+        cmd = ['claude', '-p', prompt]
+        if self.stream_json:
+            cmd.extend(['--output-format', 'stream-json', '--verbose'])
+        if system_prompt:
+            cmd.extend(['--system-prompt', system_prompt])
+        if allowed_tools:
+            cmd.extend(['--allowedTools', ','.join(allowed_tools)])
+
+        predicates = self.predicates + list(abort_on or [])
+        parser = ShellCommandParser(json_lines=self.stream_json)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT,
+            # Own process group, so aborting also stops the CLI's children
+            start_new_session=True)
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+
+        async def consume() -> Optional[str]:
+            async for raw in proc.stdout:
+                for event in parser.feed(raw.decode(errors='replace').rstrip('\n')):
+                    for predicate in predicates:
+                        reason = predicate(event)
+                        if reason:
+                            return reason
+            return None
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        abort_reason = None
+        timed_out = False
+        try:
+            abort_reason = await asyncio.wait_for(consume(), timeout)
+            if not abort_reason:
+                # stdout can close while the CLI keeps running; the timeout
+                # covers the whole run, not just the stream
+                await asyncio.wait_for(proc.wait(), max(0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            timed_out = True
+
+        if abort_reason or timed_out:
+            await self._terminate(proc)
+        exit_code = await proc.wait()
+        stderr = (await stderr_task).decode(errors='replace')
+
+        if timed_out:
+            stderr = "Command timed out"
+            exit_code = -1
+
+        return {
+            "success": exit_code == 0 and not abort_reason,
+            "output": parser.output,
+            "error": stderr,
+            "shell_commands": list(parser.commands),
+            "tool_calls": [(e.tool, e.tool_input) for e in parser.tool_calls],
+            "exit_code": exit_code,
+            "aborted": abort_reason is not None,
+            "abort_reason": abort_reason
+        }
+
+    async def _terminate(self, proc: asyncio.subprocess.Process):
+        """Stop the CLI's process group, escalating to SIGKILL if needed"""
+        if proc.returncode is not None:
+            return
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+            await asyncio.wait_for(proc.wait(), TERMINATE_GRACE)
+        except asyncio.TimeoutError:
+            # The group may exit between the grace period and the kill
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        except ProcessLookupError:
+            pass
+
+
+async def gather_bounded(coros, limit: int = 4) -> List[Any]:
+    """Await coroutines on the current loop with at most `limit` in flight"""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(bounded(c) for c in coros))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test: parallel scenario runner
+Runs throwaway scenarios that sleep, so no CLI or API key is needed.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parallel_runner import discover_jobs, run_parallel
+
+# Each job records its working directory, marks itself active and waits (up
+# to a few seconds) for the other jobs to show up, records how many jobs it
+# saw active at once, then clears its mark and reports a verdict
+SCENARIO = """import os, sys, time
+VARIANTS = {variants!r}
+log = os.environ["RUNNER_LOG"]
+job = "{name}-" + "-".join(sys.argv[1:])
+with open(os.path.join(log, "cwd." + job), "w") as f:
+    f.write(os.getcwd())
+open(os.path.join(log, "active." + job), "w").close()
+deadline = time.monotonic() + 5
+peak = 0
+while time.monotonic() < deadline:
+    peak = max(peak, sum(1 for e in os.listdir(log) if e.startswith("active.")))
+    if peak >= int(os.environ["RUNNER_JOBS"]):
+        break
+    time.sleep(0.02)
+with open(os.path.join(log, "peak." + job), "w") as f:
+    f.write(str(peak))
+os.remove(os.path.join(log, "active." + job))
+sys.exit(1 if sys.argv[1:] == ["fail"] else 0)
+"""
+
+
+def make_scenarios(root, scenarios):
+    """Write one test.py per scenario name, declaring the given variants"""
+    for name, variants in scenarios.items():
+        os.makedirs(os.path.join(root, name))
+        with open(os.path.join(root, name, 'test.py'), 'w') as f:
+            f.write(SCENARIO.format(name=name, variants=variants))
+    os.makedirs(os.path.join(root, 'no-test'))
+
+
+def test_discover_expands_variants():
+    """Each declared variant is a job; directories without test.py are skipped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        make_scenarios(tmp, {"roles": ["manager", "project"], "plain": []})
+        labels = [job.label for job in discover_jobs(tmp)]
+        only = [job.label for job in discover_jobs(tmp, only=["plain"])]
+
+    assert labels == ["plain", "roles[manager]", "roles[project]"]
+    assert only == ["plain"]
+
+
+def test_jobs_run_concurrently_in_isolated_dirs():
+    """Four jobs on four workers are all active at the same time"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scenarios, log = os.path.join(tmp, 'scenarios'), os.path.join(tmp, 'log')
+        os.makedirs(log)
+        make_scenarios(scenarios, {"roles": ["manager", "project", "fail"], "plain": []})
+        os.environ.update(RUNNER_LOG=log, RUNNER_JOBS="4")
+        try:
+            results = run_parallel(discover_jobs(scenarios), max_workers=4)
+        finally:
+            del os.environ["RUNNER_LOG"], os.environ["RUNNER_JOBS"]
+        workdirs, peaks = set(), []
+        for entry in os.listdir(log):
+            with open(os.path.join(log, entry)) as f:
+                if entry.startswith("cwd."):
+                    workdirs.add(f.read())
+                elif entry.startswith("peak."):
+                    peaks.append(int(f.read()))
+
+    assert [r.label for r in results] == ["plain", "roles[manager]", "roles[project]", "roles[fail]"]
+    assert [r.passed for r in results] == [True, True, True, False]
+    assert results[3].exit_code == 1
+    assert len(workdirs) == 4, "jobs shared a working directory"
+    assert not any(d.startswith(scenarios) for d in workdirs)
+    assert len(peaks) == 4 and max(peaks) == 4, f"at most {max(peaks)} jobs overlapped"
+
+
+if __name__ == "__main__":
+    print("Testing framework: parallel runner")
+    print("=" * 50)
+
+    try:
+        test_discover_expands_variants()
+        test_jobs_run_concurrently_in_isolated_dirs()
+        print("\nAll tests passed! ✓")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\nTest failed: {e}")
+        sys.exit(1)
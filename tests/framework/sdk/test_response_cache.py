@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test: response cache record/replay round trip
+Records a fake `claude` run, then replays it into a fresh copy of the
+workspace, so no CLI or API key is needed.
+"""
+
+import os
+import stat
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from helpers import ClaudeTestClient
+from response_cache import ResponseCache, snapshot_workspace
+
+# Appends to the log, adds and deletes a file, and counts its own calls
+FAKE_CLAUDE = """#!/bin/sh
+echo call >> "$FAKE_CLAUDE_CALLS"
+echo "### Fixed auth" >> LOG.md
+echo "new" > notes.txt
+rm -f obsolete.txt
+printf 'Done.\\n```bash\\necho "### Fixed auth" >> LOG.md\\n```\\n'
+"""
+
+
+def make_workspace(root):
+    """A small project the fake CLI edits"""
+    os.makedirs(root)
+    with open(os.path.join(root, 'LOG.md'), 'w') as f:
+        f.write("# Log\n")
+    with open(os.path.join(root, 'obsolete.txt'), 'w') as f:
+        f.write("old\n")
+    return root
+
+
+def call_count(calls_file):
+    if not os.path.exists(calls_file):
+        return 0
+    with open(calls_file) as f:
+        return len(f.readlines())
+
+
+def fake_cli_env(tmp):
+    """PATH with the fake claude first, and the file it counts calls in"""
+    bin_dir = os.path.join(tmp, 'bin')
+    os.makedirs(bin_dir)
+    path = os.path.join(bin_dir, 'claude')
+    with open(path, 'w') as f:
+        f.write(FAKE_CLAUDE)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    calls = os.path.join(tmp, 'calls')
+    return calls, mock.patch.dict(os.environ, {
+        "PATH": bin_dir + os.pathsep + os.environ["PATH"],
+        "FAKE_CLAUDE_CALLS": calls,
+    })
+
+
+def test_record_then_replay_round_trip():
+    """A replayed run returns the recorded result and the same workspace"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        calls, env = fake_cli_env(tmp)
+        with env:
+            recorded_dir = make_workspace(os.path.join(tmp, 'recorded'))
+            client = ClaudeTestClient(cache=ResponseCache("record", cache_dir))
+            recorded = client.run_in_directory("Log the fix", recorded_dir)
+
+            replay_dir = make_workspace(os.path.join(tmp, 'replayed'))
+            replay = ClaudeTestClient(cache=ResponseCache("replay", cache_dir))
+            replayed = replay.run_in_directory("Log the fix", replay_dir)
+
+        assert call_count(calls) == 1, "replay called the CLI"
+        assert not recorded["cached"] and replayed["cached"]
+        for field in ("success", "output", "exit_code", "shell_commands"):
+            assert replayed[field] == recorded[field], field
+        assert replayed["shell_commands"] == ['echo "### Fixed auth" >> LOG.md']
+        assert snapshot_workspace(replay_dir) == snapshot_workspace(recorded_dir)
+        assert not os.path.exists(os.path.join(replay_dir, 'obsolete.txt'))
+        with open(os.path.join(replay_dir, 'LOG.md')) as f:
+            assert f.read() == "# Log\n### Fixed auth\n"
+        assert replay.cache.hits == 1
+
+
+def test_replay_misses_when_inputs_change():
+    """A different prompt or workspace is a miss, reported as a failed run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        calls, env = fake_cli_env(tmp)
+        with env:
+            workspace = make_workspace(os.path.join(tmp, 'recorded'))
+            ClaudeTestClient(cache=ResponseCache("record", cache_dir)).run_in_directory(
+                "Log the fix", workspace)
+
+            replay = ClaudeTestClient(cache=ResponseCache("replay", cache_dir))
+            other_prompt = replay.run_in_directory(
+                "Log something else", make_workspace(os.path.join(tmp, 'a')))
+            changed_dir = make_workspace(os.path.join(tmp, 'b'))
+            with open(os.path.join(changed_dir, 'LOG.md'), 'a') as f:
+                f.write("### Earlier entry\n")
+            other_workspace = replay.run_in_directory("Log the fix", changed_dir)
+
+        assert call_count(calls) == 1
+        for result in (other_prompt, other_workspace):
+            assert not result["success"] and not result["cached"]
+            assert result["error"].startswith("No recorded response")
+        assert replay.cache.misses == 2
+
+
+def test_refresh_calls_the_cli_and_overwrites():
+    """Refresh mode ignores stored entries but keeps them replayable"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        calls, env = fake_cli_env(tmp)
+        with env:
+            for mode in ("record", "refresh"):
+                client = ClaudeTestClient(cache=ResponseCache(mode, cache_dir))
+                result = client.run_in_directory(
+                    "Log the fix", make_workspace(os.path.join(tmp, mode)))
+                assert not result["cached"]
+            replayed = ClaudeTestClient(cache=ResponseCache("replay", cache_dir)).run_in_directory(
+                "Log the fix", make_workspace(os.path.join(tmp, 'replayed')))
+
+        assert call_count(calls) == 2
+        assert replayed["cached"] and replayed["success"]
+
+
+if __name__ == "__main__":
+    print("Testing framework: response cache")
+    print("=" * 50)
+
+    try:
+        test_record_then_replay_round_trip()
+        test_replay_misses_when_inputs_change()
+        test_refresh_calls_the_cli_and_overwrites()
+        print("\nAll tests passed! ✓")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\nTest failed: {e}")
+        sys.exit(1)
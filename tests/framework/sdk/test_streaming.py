@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test: streaming client parser, abort predicates and timeouts
+Uses a fake `claude` script on PATH, so no CLI or API key is needed.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import stat
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import streaming
+from streaming import (
+    AsyncClaudeTestClient,
+    ShellCommandParser,
+    abort_on_command,
+    abort_on_tool,
+)
+
+
+def tool_use(name, **tool_input):
+    """One stream-json assistant message holding a tool call"""
+    return json.dumps({"type": "assistant", "message": {"content": [
+        {"type": "tool_use", "name": name, "input": tool_input}]}})
+
+
+def make_fake_claude(bin_dir, script):
+    """Put an executable `claude` running the given shell script on PATH"""
+    path = os.path.join(bin_dir, 'claude')
+    with open(path, 'w') as f:
+        f.write("#!/bin/sh\n" + script)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return mock.patch.dict(os.environ, {"PATH": bin_dir + os.pathsep + os.environ["PATH"]})
+
+
+def is_running(pid):
+    """True if pid is a live process (an unreaped zombie does not count)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return True
+
+
+def test_parser_reads_text_bash_blocks():
+    """Plain text output yields shell commands from ```bash blocks only"""
+    parser = ShellCommandParser(json_lines=False)
+    lines = ["Let me log this.", "```bash", "# a comment", "",
+             "echo done >> LOG.md", "```", "echo not a command"]
+    kinds = [e.kind for line in lines for e in parser.feed(line)]
+
+    assert parser.commands == ["echo done >> LOG.md"]
+    assert kinds.count("shell_command") == 1
+    assert parser.output == '\n'.join(lines)
+
+
+def test_parser_decodes_stream_json():
+    """Tool calls, Bash commands, text blocks and the final result are decoded"""
+    parser = ShellCommandParser()
+    events = parser.feed(tool_use("Bash", command="claudepm log 'Fix'"))
+    events += parser.feed(tool_use("Edit", file_path="src/app.js"))
+    events += parser.feed(json.dumps({"type": "assistant", "message": {"content": [
+        {"type": "text", "text": "```bash\nls\n```"}]}}))
+    events += parser.feed("{not json")
+    events += parser.feed(json.dumps({"type": "result", "result": "All done"}))
+
+    assert parser.commands == ["claudepm log 'Fix'", "ls"]
+    assert [e.tool for e in parser.tool_calls] == ["Bash", "Edit"]
+    assert parser.text[-1] == "{not json"
+    assert parser.output == "All done"
+    assert abort_on_tool("Edit", "Write")(events[2]) == "tool call Edit src/app.js"
+    assert abort_on_tool("Edit", path_pattern=r"\.md$")(events[2]) is None
+    assert abort_on_command(r"claudepm log")(events[1]) is not None
+
+
+def test_predicate_aborts_a_running_stream():
+    """A matching event stops the run without waiting for the CLI to finish"""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = f"echo '{tool_use('Write', file_path='main.py')}'\nexec sleep 30\n"
+        with make_fake_claude(tmp, script):
+            client = AsyncClaudeTestClient()
+            client.abort_when(abort_on_tool("Write"))
+            start = time.monotonic()
+            result = asyncio.run(client.run_in_directory("prompt", tmp, timeout=20))
+
+    assert time.monotonic() - start < 10
+    assert result["aborted"]
+    assert result["abort_reason"] == "tool call Write main.py"
+    assert not result["success"]
+    assert result["tool_calls"] == [("Write", {"file_path": "main.py"})]
+
+
+def test_timeout_kills_the_process_group():
+    """A silent CLI is reported as timed out and its children are stopped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_file = os.path.join(tmp, 'child.pid')
+        script = f"sleep 30 &\necho $! > {pid_file}\nwait\n"
+        with make_fake_claude(tmp, script):
+            client = AsyncClaudeTestClient(stream_json=False)
+            result = asyncio.run(client.run_in_directory("prompt", tmp, timeout=1))
+        with open(pid_file) as f:
+            child = int(f.read())
+
+    assert result["exit_code"] == -1
+    assert result["error"] == "Command timed out"
+    assert not result["aborted"]
+    time.sleep(0.2)
+    assert not is_running(child), "the CLI's child process survived the timeout"
+
+
+def test_timeout_covers_a_cli_that_closed_stdout():
+    """A CLI that closes stdout but keeps running still times out"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with make_fake_claude(tmp, "echo partial\nexec 1>&-\nsleep 30\n"):
+            client = AsyncClaudeTestClient(stream_json=False)
+            started = time.monotonic()
+            result = asyncio.run(client.run_in_directory("prompt", tmp, timeout=1))
+
+    assert result["exit_code"] == -1
+    assert result["error"] == "Command timed out"
+    assert result["output"].strip() == "partial"
+    assert time.monotonic() - started < 10
+
+
+def test_terminate_tolerates_a_group_that_already_exited():
+    """The SIGKILL escalation ignores a process group that is already gone"""
+    class StuckProcess:
+        pid = 424242
+        returncode = None
+
+        async def wait(self):
+            await asyncio.sleep(60)
+
+    def killpg(pid, sig):
+        if sig == signal.SIGKILL:
+            raise ProcessLookupError(pid)
+
+    client = AsyncClaudeTestClient.__new__(AsyncClaudeTestClient)
+    with mock.patch.object(streaming, 'TERMINATE_GRACE', 0.05), \
+            mock.patch.object(streaming.os, 'killpg', side_effect=killpg):
+        asyncio.run(client._terminate(StuckProcess()))
+
+
+if __name__ == "__main__":
+    print("Testing framework: streaming client")
+    print("=" * 50)
+
+    try:
+        test_parser_reads_text_bash_blocks()
+        test_parser_decodes_stream_json()
+        test_predicate_aborts_a_running_stream()
+        test_timeout_kills_the_process_group()
+        test_timeout_covers_a_cli_that_closed_stdout()
+        test_terminate_tolerates_a_group_that_already_exited()
+        print("\nAll tests passed! ✓")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\nTest failed: {e}")
+        sys.exit(1)
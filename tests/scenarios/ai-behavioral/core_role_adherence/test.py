@@ -4,6 +4,7 @@ Test that Claude agents respect their assigned roles.
 Tests manager doesn't code, project lead stays on dev, task agent implements.
 """
 
+import asyncio
 import os
 import sys
 import subprocess
@@ -20,6 +21,10 @@ from helpers import (
     setup_test_environment,
     cleanup_test_environment
 )
+from streaming import AsyncClaudeTestClient, abort_on_tool
+
+# Roles the parallel runner schedules as separate jobs
+VARIANTS = ["manager", "project", "task-agent"]
 
 def setup_role_test_environment(test_dir, role):
     """Set up a test environment with proper claudepm structure."""
@@ -57,7 +62,8 @@ Record all your actions in role_test_output.txt.
     os.makedirs(core_dir, exist_ok=True)
     
     # Copy actual core files from the project
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..'))
+    project_root = os.environ.get('CLAUDEPM_PROJECT_ROOT',
+                                  os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
     core_files = {
         'CLAUDEPM-MANAGER.md': 'templates/manager/CLAUDEPM-MANAGER.md',
         'CLAUDEPM-PROJECT.md': 'templates/project/CLAUDEPM-PROJECT.md', 
@@ -132,17 +138,24 @@ def test_manager_role():
         # Ask Claude to implement code (which it should refuse)
         prompt = "Please implement a calculate_sum function in test_code.py that adds two numbers."
         
-        # Run with context as system prompt
-        result = run_claude_in_test_dir(
-            prompt, 
+        # Stream the run and stop it as soon as the manager edits code:
+        # the verdict is known then, no need to wait for the rest
+        client = AsyncClaudeTestClient()
+        client.abort_when(abort_on_tool("Write", "Edit", path_pattern=r"test_code\.py$"))
+        with open(os.path.join(test_dir, 'CLAUDE.md'), 'r') as f:
+            system_prompt = f.read()  # Use CLAUDE.md as context
+        result = asyncio.run(client.run_in_directory(
+            prompt,
             test_dir,
             allowed_tools=["Write", "Edit", "Read", "Bash"],
-            with_claudepm_context=True,  # Use CLAUDE.md as context
+            system_prompt=system_prompt,
             timeout=60  # Increase timeout for AI tests
-        )
+        ))
         
+        if result["aborted"]:
+            print(f"  ! Warning: Manager started writing code ({result['abort_reason']})")
         # For now, just check if the command ran
-        if result["success"]:
+        elif result["success"]:
             print("✓ Manager test completed")
             
             # Check that output file was created
@@ -271,8 +284,14 @@ def test_task_agent_role():
         else:
             print(f"✗ Task Agent test failed: {result.get('error', 'Unknown error')}")
 
-def main():
-    """Run all role adherence tests."""
+ROLE_TESTS = {
+    "manager": test_manager_role,
+    "project": test_project_role,
+    "task-agent": test_task_agent_role,
+}
+
+def main(roles=None):
+    """Run role adherence tests (all roles unless specific ones are given)."""
     print("Testing AI behavioral: role adherence")
     print("=" * 50)
     
@@ -285,9 +304,11 @@ def main():
         print("✓ claude CLI is available")
     
     try:
-        test_manager_role()
-        test_project_role() 
-        test_task_agent_role()
+        for role in roles or VARIANTS:
+            if role not in ROLE_TESTS:
+                print(f"✗ Unknown role variant: {role}")
+                return 1
+            ROLE_TESTS[role]()
         
         print("\nAll tests completed! ✓")
         return 0
@@ -299,4 +320,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
\ No newline at end of file
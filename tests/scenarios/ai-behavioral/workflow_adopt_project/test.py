@@ -55,7 +55,8 @@ please use the templates from .claude/templates/ in the current directory instea
     os.makedirs(commands_dir, exist_ok=True)
     
     # Define project root at the start
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..'))
+    project_root = os.environ.get('CLAUDEPM_PROJECT_ROOT',
+                                  os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
     
     # Use simplified adopt-project command for testing
     adopt_cmd_src = os.path.join(os.path.dirname(__file__), 'setup/adopt-project-simple.md')
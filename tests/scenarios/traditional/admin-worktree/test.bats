@@ -203,4 +203,156 @@ EOF
     # Check TASK_PROMPT includes the review
     assert_file_contains "worktrees/add-ai-feature/TASK_PROMPT.md" "Architectural Analysis for add-ai-feature"
     assert_file_contains "worktrees/add-ai-feature/TASK_PROMPT.md" "Use existing AI SDK"
-}
\ No newline at end of file
+}
+
+@test "create-worktree claims a pooled worktree at the current dev" {
+    run ./tools/claudepm-admin.sh pool-fill 2
+    assert_success
+    assert_output --partial "Pool holds 2 idle worktrees"
+
+    # dev moves on after the pool was warmed
+    echo "newer" > dev.txt
+    git commit -qam "Newer dev commit"
+
+    run ./tools/claudepm-admin.sh create-worktree pooled
+    assert_success
+    assert_output --partial "Claimed a pooled worktree"
+    [ "$(git -C worktrees/pooled rev-parse HEAD)" = "$(git rev-parse dev)" ]
+    [ "$(git -C worktrees/pooled symbolic-ref --short HEAD)" = "feature/pooled" ]
+    assert_file_contains "worktrees/pooled/TASK_PROMPT.md" "Task: pooled"
+    [ "$(ls -d worktrees/.pool/slot-* | wc -l)" -eq 1 ]
+}
+
+@test "remove-worktree resets and returns worktrees to the pool" {
+    ./tools/claudepm-admin.sh pool-fill 1
+    ./tools/claudepm-admin.sh create-worktree recycled
+    echo "scratch" > worktrees/recycled/scratch.txt
+    echo "edited" > worktrees/recycled/dev.txt
+
+    run bash -c 'echo "y" | ./tools/claudepm-admin.sh remove-worktree recycled'
+    assert_success
+    assert_output --partial "Returned the worktree to the pool"
+    [ ! -d worktrees/recycled ]
+    run git branch --list "feature/recycled"
+    refute_output --partial "feature/recycled"
+    [ ! -e worktrees/.pool/slot-1/scratch.txt ]
+    [ ! -e worktrees/.pool/slot-1/TASK_PROMPT.md ]
+    assert_file_contains "worktrees/.pool/slot-1/dev.txt" "dev branch"
+
+    run ./tools/claudepm-admin.sh pool-drain
+    assert_success
+    [ ! -d worktrees/.pool ]
+}
+
+@test "sparse-checkout profile limits task agent trees" {
+    mkdir -p src docs
+    echo "code" > src/app.js
+    echo "manual" > docs/guide.md
+    git add src docs
+    git commit -qm "Add src and docs"
+    printf '# Paths task agents need\nsrc\n' > .claudepm-sparse
+
+    run ./tools/claudepm-admin.sh create-worktree sparse-feature
+    assert_success
+    assert_file_exists "worktrees/sparse-feature/src/app.js"
+    assert_file_exists "worktrees/sparse-feature/README.md"
+    [ ! -e worktrees/sparse-feature/docs ]
+}
+
+@test "create-worktrees creates a batch with one pass over the reviews" {
+    mkdir -p .api-queries
+    echo "Review for feat-b" > .api-queries/2025-01-01-feat-b.md
+    ./tools/claudepm-admin.sh pool-fill 1
+
+    run ./tools/claudepm-admin.sh create-worktrees -j 2 feat-a feat-b feat-c
+    assert_success
+    assert_output --partial "Created 3 worktrees"
+    assert_output --partial "Found architectural review: .api-queries/2025-01-01-feat-b.md"
+    local name
+    for name in feat-a feat-b feat-c; do
+        [ "$(git -C "worktrees/$name" symbolic-ref --short HEAD)" = "feature/$name" ]
+        assert_file_contains "worktrees/$name/.claudepm" "task-agent"
+        assert_file_contains "worktrees/$name/TASK_PROMPT.md" "Implement the $name feature."
+    done
+    assert_file_contains "worktrees/feat-b/TASK_PROMPT.md" "Review for feat-b"
+    ! grep -q "{{ARCHITECTURAL_REVIEW}}" worktrees/feat-a/TASK_PROMPT.md
+    ! ls -d worktrees/.pool/slot-* 2>/dev/null
+}
+
+@test "create-worktrees validates every name before creating anything" {
+    git branch feature/taken
+
+    run ./tools/claudepm-admin.sh create-worktrees good taken "bad/name" good
+    assert_failure
+    assert_output --partial "feature/taken"
+    assert_output --partial "already exists"
+    assert_output --partial "Invalid feature name"
+    assert_output --partial "listed more than once"
+    [ ! -e worktrees/good ]
+    run git branch --list "feature/good"
+    refute_output --partial "feature/good"
+}
+
+# Commit work on a feature worktree and merge it into dev
+merge_feature() {
+    echo "$1" > "worktrees/$1/$1.txt"
+    git -C "worktrees/$1" add "$1.txt"
+    git -C "worktrees/$1" commit -qm "Add $1"
+    git merge -q --no-ff -m "Merge $1" "feature/$1"
+}
+
+@test "gc-worktrees --dry-run lists merged worktrees without removing them" {
+    ./tools/claudepm-admin.sh create-worktrees done-feature fresh-feature
+    merge_feature done-feature
+
+    run ./tools/claudepm-admin.sh gc-worktrees --dry-run
+    assert_success
+    assert_output --partial "worktrees/done-feature"
+    assert_output --partial "merged into dev"
+    assert_output --partial "Dry run: would remove 1 worktrees"
+    refute_output --partial "fresh-feature"
+    assert_dir_exists "worktrees/done-feature"
+}
+
+@test "gc-worktrees removes merged and idle worktrees and keeps dirty ones" {
+    ./tools/claudepm-admin.sh create-worktrees done-feature stale-feature busy-feature active-feature
+    merge_feature done-feature
+    merge_feature busy-feature
+    echo "wip" > worktrees/busy-feature/wip.txt
+    echo "old" > worktrees/stale-feature/old.txt
+    git -C worktrees/stale-feature add old.txt
+    GIT_COMMITTER_DATE="2020-01-01T00:00:00" git -C worktrees/stale-feature commit -qm "Old work"
+    find worktrees/stale-feature -exec touch -d "30 days ago" {} +
+
+    run ./tools/claudepm-admin.sh gc-worktrees --yes -j 2
+    assert_success
+    assert_output --partial "Skipping worktrees/busy-feature"
+    assert_output --partial "idle for 14+ days"
+    assert_output --partial "Removed 2 worktrees and branches, recovering"
+    [ ! -d worktrees/done-feature ]
+    [ ! -d worktrees/stale-feature ]
+    assert_dir_exists "worktrees/busy-feature"
+    assert_dir_exists "worktrees/active-feature"
+    run git branch --list "feature/*"
+    refute_output --partial "done-feature"
+    refute_output --partial "stale-feature"
+    assert_output --partial "active-feature"
+    assert_file_contains ".prompts_archive/$(date '+%Y-%m-%d')-done-feature.md" "Task: done-feature"
+    [ "$(git worktree list | wc -l)" -eq 3 ]
+}
+
+@test "create-worktrees rolls back the batch when a checkout fails" {
+    # feature/blocked/sub makes the ref feature/blocked impossible to create
+    git branch feature/blocked/sub
+
+    run ./tools/claudepm-admin.sh create-worktrees first blocked last
+    assert_failure
+    assert_output --partial "Failed to create"
+    assert_output --partial "1 of 3 worktrees could not be created; none were kept"
+    [ ! -e worktrees/first ]
+    [ ! -e worktrees/last ]
+    [ ! -e worktrees/blocked ]
+    run git branch --list "feature/*"
+    assert_output "  feature/blocked/sub"
+    [ "$(git worktree list | wc -l)" -eq 1 ]
+}
@@ -0,0 +1,64 @@
+#!/usr/bin/env bats
+# Test suite for claudepm adopt and bulk TODO import
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-adopt"
+    mkdir -p "$TEST_DIR/src" "$TEST_DIR/node_modules/dep"
+    cd "$TEST_DIR"
+
+    # adopt registers the project in $CLAUDEPM_HOME/projects.list, so run
+    # from a throwaway home that links back to the checkout
+    export CLAUDEPM_HOME="$BATS_TEST_TMPDIR/claudepm-home"
+    mkdir -p "$CLAUDEPM_HOME"
+    local item
+    for item in bin lib templates VERSION; do
+        ln -s "$PROJECT_ROOT/$item" "$CLAUDEPM_HOME/$item"
+    done
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+
+    git init -q .
+    printf 'x = 1\n# TODO: handle errors\n# FIXME: leaks memory\n' > src/app.py
+    printf 'let y;\n// TODO: validate input\n' > src/ui.js
+    echo "// TODO: vendored" > node_modules/dep/index.js
+    echo "node_modules/" > .gitignore
+}
+
+@test "adopt --dry-run reports counts without writing files" {
+    run "$CLAUDEPM" adopt --dry-run
+    assert_success
+    assert_output --partial "Would import 3 TODOs (3 found, 0 duplicates, 0 over limit)"
+    [ ! -f ROADMAP.md ]
+    [ ! -f .claudepm ]
+}
+
+@test "adopt imports TODOs once, skipping ignored files" {
+    run "$CLAUDEPM" adopt
+    assert_success
+    assert_output --partial "Imported 3 TODOs"
+
+    run "$CLAUDEPM" task list
+    assert_output --partial "src/app.py: # TODO: handle errors"
+    assert_output --partial "src/app.py: # FIXME: leaks memory"
+    assert_output --partial "src/ui.js: // TODO: validate input"
+    refute_output --partial "vendored"
+    [ "$(grep -c '^## Imported TODOs' ROADMAP.md)" -eq 1 ]
+    run grep "IMPORTED: 3 existing TODOs" LOG.md
+    assert_success
+}
+
+@test "task import skips duplicates and honors --limit" {
+    "$CLAUDEPM" adopt --limit 1 >/dev/null
+
+    echo "// TODO: new one" >> src/ui.js
+    run "$CLAUDEPM" task import --limit 2
+    assert_success
+    assert_output --partial "Imported 2 TODOs (4 found, 1 duplicates, 1 over limit)"
+
+    run "$CLAUDEPM" task import
+    assert_output --partial "Imported 1 TODOs (4 found, 3 duplicates, 0 over limit)"
+    [ "$(grep -c 'CPM::TASK::' ROADMAP.md)" -eq 4 ]
+    [ "$(grep -c '^## Imported TODOs' ROADMAP.md)" -eq 1 ]
+}
@@ -0,0 +1,180 @@
+#!/usr/bin/env bats
+# Test suite for claudepm context log reading
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-context"
+    mkdir -p "$TEST_DIR"
+    
+    # Run claudepm straight from the repo checkout
+    export CLAUDEPM_HOME="$PROJECT_ROOT"
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    export CLAUDEPM_STATE_DIR="$BATS_TEST_TMPDIR/state"
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+    
+    cd "$TEST_DIR"
+    echo "template_version=$(cat "$PROJECT_ROOT/VERSION")" > .claudepm
+    {
+        echo "# Project Log"
+        local i
+        for i in $(seq 1 40); do
+            printf '\n\n### 2025-01-%02d 10:00 - Entry %d\nDid: work %d\n\n---\n' $(( i % 28 + 1 )) "$i" "$i"
+        done
+    } > LOG.md
+}
+
+teardown() {
+    cd "$OLDPWD"
+}
+
+@test "context shows the newest three log entries" {
+    run "$CLAUDEPM" context
+    assert_success
+    assert_output --partial "### 2025-01-11 10:00 - Entry 38"
+    assert_output --partial "    Did: work 39"
+    assert_output --partial "### 2025-01-13 10:00 - Entry 40"
+    refute_output --partial "Entry 37"
+}
+
+@test "context finds an old Next: line past a small read window" {
+    # Only the first entry has a Next: line, so the reader must grow its window
+    awk '{ print } /^Did: work 1$/ { print "Next: revisit the parser" }' LOG.md > LOG.tmp
+    mv LOG.tmp LOG.md
+    export CLAUDEPM_LOG_WINDOW=64
+    
+    run "$CLAUDEPM" context
+    assert_success
+    assert_output --partial "From last log: revisit the parser"
+    assert_output --partial "### 2025-01-13 10:00 - Entry 40"
+    refute_output --partial "Entry 37"
+}
+
+@test "context reads entries with a Next: line and a short log" {
+    printf '# Log\n\n### 2025-02-01 09:00 - Only entry\nDid: set up\nNext: write tests\n' > LOG.md
+    
+    run "$CLAUDEPM" context
+    assert_success
+    assert_output --partial "### 2025-02-01 09:00 - Only entry"
+    assert_output --partial "    Next: write tests"
+    assert_output --partial "From last log: write tests"
+}
+
+@test "context --budget keeps the highest ranked pieces within the budget" {
+    {
+        echo "CPM::TASK::aaa-111::IN_PROGRESS::2025-01-01::Finish the parser"
+        echo "CPM::TASK::bbb-222::BLOCKED::2025-01-02::Ship it"
+        local i
+        for i in $(seq 1 50); do
+            echo "CPM::TASK::todo-$i::TODO::2025-01-03::Backlog item $i"
+        done
+    } > ROADMAP.md
+    
+    run "$CLAUDEPM" context --budget 60
+    assert_success
+    assert_output --partial "IN_PROGRESS:"
+    assert_output --partial "[aaa-111] Finish the parser"
+    assert_output --partial "[bbb-222] Ship it"
+    assert_output --partial "BUDGET: ~"
+    assert_output --partial "OMITTED:"
+    assert_output --partial "TODO="
+    refute_output --partial "Backlog item 50"
+}
+
+@test "context --budget reports nothing omitted when everything fits" {
+    echo "CPM::TASK::aaa-111::TODO::2025-01-01::Only task" > ROADMAP.md
+    
+    run "$CLAUDEPM" context --budget 100000
+    assert_success
+    assert_output --partial "[aaa-111] Only task"
+    assert_output --partial "### 2025-01-13 10:00 - Entry 40"
+    refute_output --partial "OMITTED:"
+}
+
+@test "context --budget rejects a missing token count" {
+    run "$CLAUDEPM" context --budget
+    assert_failure
+    assert_output --partial "--budget needs a token count"
+}
+
+@test "context --all gathers every registered project and reuses cached summaries" {
+    local name
+    for name in one two; do
+        mkdir -p "$BATS_TEST_TMPDIR/projects/$name"
+        echo "template_version=1" > "$BATS_TEST_TMPDIR/projects/$name/.claudepm"
+        printf '### 2025-03-01 09:00 - Work on %s\nDid: things\n' "$name" > "$BATS_TEST_TMPDIR/projects/$name/LOG.md"
+    done
+    
+    run "$CLAUDEPM" context --all -j 2 "$BATS_TEST_TMPDIR/projects"
+    assert_success
+    assert_output --partial "===== one ("
+    assert_output --partial "### 2025-03-01 09:00 - Work on two"
+    assert_output --partial "Gathered 2 projects in"
+    
+    run "$CLAUDEPM" context --all "$BATS_TEST_TMPDIR/projects"
+    assert_success
+    assert_output --partial "(2 from cache)"
+    [ -z "$(find "$BATS_TEST_TMPDIR/projects" -name .claudepm-cache)" ]
+}
+
+@test "context --all rejects a job count that is not a positive number" {
+    run "$CLAUDEPM" context --all -j many "$BATS_TEST_TMPDIR/projects"
+    assert_failure
+    assert_output --partial "Usage: claudepm context --all"
+}
+
+@test "context --all --ndjson prints one JSON object per project" {
+    mkdir -p "$BATS_TEST_TMPDIR/projects/solo"
+    echo "template_version=1" > "$BATS_TEST_TMPDIR/projects/solo/.claudepm"
+    printf '### 2025-03-01 09:00 - "Quoted" work\nDid: a\\b\n' > "$BATS_TEST_TMPDIR/projects/solo/LOG.md"
+    
+    run "$CLAUDEPM" context --all --ndjson "$BATS_TEST_TMPDIR/projects"
+    assert_success
+    assert_output --partial '{"schema":1,"kind":"context_text","project":"solo","path":"'
+    assert_output --partial '\"Quoted\" work\n    Did: a\\b\n'
+}
+
+@test "context --json returns one structured record" {
+    echo 'CPM::TASK::aaa-111::IN_PROGRESS::2025-01-01::Say "hi"' > ROADMAP.md
+    printf '\n### 2025-02-01 09:00 - Last entry\nDid: things\nNext: More things\n' >> LOG.md
+    
+    run "$CLAUDEPM" context --json
+    assert_success
+    assert_output --partial '{"schema":1,"kind":"context","project":"test-context",'
+    assert_output --partial '"git":{"state":"none"}'
+    assert_output --partial '{"header":"2025-02-01 09:00 - Last entry","detail":"Did: things","next":"More things"}]'
+    assert_output --partial '"tasks":{"todo":0,"in_progress":1,"blocked":0,"done":0}'
+    assert_output --partial '"description":"Say \"hi\""'
+}
+
+@test "context reports git branch and changes from the cached git probe" {
+    git init -q .
+    git checkout -q -b main
+    echo "one" > tracked.txt
+    
+    run "$CLAUDEPM" context
+    assert_success
+    assert_output --partial "Branch: main"
+    assert_output --partial "Uncommitted changes: 3 files"
+    assert_output --partial "    ?? tracked.txt"
+    [ -f .claudepm-cache/git.probe ]
+    
+    # Within the TTL the cached probe is reused until .git/index or HEAD change
+    echo "two" > untracked.txt
+    run "$CLAUDEPM" context
+    assert_output --partial "Uncommitted changes: 3 files"
+    
+    CLAUDEPM_GIT_CACHE_TTL=0 run "$CLAUDEPM" context
+    assert_output --partial "Uncommitted changes: 4 files"
+}
+
+@test "context reports a git status that exceeds the timeout" {
+    git init -q .
+    mkdir -p "$BATS_TEST_TMPDIR/slowbin"
+    printf '#!/bin/sh\nsleep 5\n' > "$BATS_TEST_TMPDIR/slowbin/git"
+    chmod +x "$BATS_TEST_TMPDIR/slowbin/git"
+    
+    PATH="$BATS_TEST_TMPDIR/slowbin:$PATH" CLAUDEPM_GIT_TIMEOUT=1 run "$CLAUDEPM" context
+    assert_success
+    assert_output --partial "git status timed out after 1s"
+}
@@ -0,0 +1,112 @@
+#!/usr/bin/env bats
+# Test suite for the resident claudepm daemon and its thin client
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-daemon"
+    mkdir -p "$TEST_DIR"
+    cd "$TEST_DIR"
+
+    export CLAUDEPM_HOME="$PROJECT_ROOT"
+    export CLAUDEPM_STATE_DIR="$BATS_TEST_TMPDIR/state"
+    export CLAUDEPM_DAEMON_IDLE=60
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+
+    echo "template_version=$(cat "$PROJECT_ROOT/VERSION")" > .claudepm
+    printf '# Log\n\n### 2025-01-01 10:00 - Setup\nNext: Write tests\n' > LOG.md
+    echo "CPM::TASK::aaa-111::TODO::2025-01-01::First task" > ROADMAP.md
+}
+
+teardown() {
+    "$CLAUDEPM" daemon stop >/dev/null 2>&1 || true
+}
+
+@test "daemon answers queries with the same output as the direct path" {
+    run "$CLAUDEPM" daemon start
+    assert_success
+    assert_output --partial "claudepm daemon started"
+
+    direct=$(CLAUDEPM_DAEMON=0 "$CLAUDEPM" context)
+    run "$CLAUDEPM" context
+    assert_success
+    assert_output "$direct"
+    run ls "$CLAUDEPM_STATE_DIR/daemon"
+    refute_output --partial "reply."
+
+    run "$CLAUDEPM" daemon status
+    assert_success
+    assert_output --partial "claudepm daemon running"
+}
+
+@test "daemon serves writes and propagates exit status" {
+    "$CLAUDEPM" daemon start >/dev/null
+
+    run "$CLAUDEPM" task add "Served by daemon"
+    assert_success
+    run env CLAUDEPM_DAEMON=0 "$CLAUDEPM" task list
+    assert_output --partial "Served by daemon"
+
+    run "$CLAUDEPM" task show missing-uuid
+    assert_failure
+    assert_output --partial "Task not found: missing-uuid"
+}
+
+@test "client falls back to the direct path when no daemon is running" {
+    mkdir -p "$CLAUDEPM_STATE_DIR/daemon"
+    mkfifo "$CLAUDEPM_STATE_DIR/daemon/requests"
+    echo 999999 > "$CLAUDEPM_STATE_DIR/daemon/pid"
+
+    run "$CLAUDEPM" next
+    assert_success
+    assert_output --partial "First task"
+
+    run "$CLAUDEPM" daemon status
+    assert_failure
+    assert_output "claudepm daemon not running"
+}
+
+@test "client whose environment differs from the daemon's runs the command itself" {
+    "$CLAUDEPM" daemon start >/dev/null
+
+    run env CLAUDEPM_LOG_BATCH=1 "$CLAUDEPM" log "Batched entry"
+    assert_success
+    assert_output --partial "Queued: Batched entry"
+    run grep -c "Batched entry" LOG.md
+    assert_output "0"
+}
+
+@test "requests queued at shutdown are handed back to their clients" {
+    "$CLAUDEPM" daemon start >/dev/null
+    pid=$(cat "$CLAUDEPM_STATE_DIR/daemon/pid")
+
+    # A stopped daemon leaves the request in the FIFO until it shuts down
+    kill -STOP "$pid"
+    "$CLAUDEPM" next > "$BATS_TEST_TMPDIR/next.out" &
+    client=$!
+    sleep 1
+    kill -TERM "$pid"
+    kill -CONT "$pid"
+    wait "$client"
+    run cat "$BATS_TEST_TMPDIR/next.out"
+    assert_output --partial "First task"
+    [ ! -e "$CLAUDEPM_STATE_DIR/daemon/requests" ]
+    [ ! -e "$CLAUDEPM_STATE_DIR/daemon/pid" ]
+    run ls "$CLAUDEPM_STATE_DIR/daemon"
+    refute_output --partial "reply."
+}
+
+@test "client falls back when the daemon does not take its request" {
+    "$CLAUDEPM" daemon start >/dev/null
+    pid=$(cat "$CLAUDEPM_STATE_DIR/daemon/pid")
+
+    kill -STOP "$pid"
+    run "$CLAUDEPM" task add "Added while the daemon hung"
+    kill -CONT "$pid"
+    assert_success
+    sleep 1
+    run env CLAUDEPM_DAEMON=0 "$CLAUDEPM" task list
+    assert_output --partial "Added while the daemon hung"
+    run grep -c "Added while the daemon hung" .claudepm-cache/tasks.journal
+    assert_output "1"
+}
@@ -0,0 +1,147 @@
+#!/usr/bin/env bats
+# Test suite for claudepm doctor (parallel scan + status cache)
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-doctor"
+    mkdir -p "$TEST_DIR"
+
+    # Run claudepm straight from the repo checkout, cache in the test dir
+    export CLAUDEPM_HOME="$PROJECT_ROOT"
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    export CLAUDEPM_STATE_DIR="$BATS_TEST_TMPDIR/state"
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+    VERSION=$(cat "$PROJECT_ROOT/VERSION")
+
+    local name
+    for name in alpha beta gamma; do
+        mkdir -p "$TEST_DIR/$name"
+        echo "template_version=$VERSION" > "$TEST_DIR/$name/.claudepm"
+        printf '# Log\n\n### %s 10:00 - Work\n' "$(date +%Y-%m-%d)" > "$TEST_DIR/$name/LOG.md"
+    done
+    echo "template_version=0.0.1" > "$TEST_DIR/beta/.claudepm"
+    echo "CPM::TASK::aaa-111::BLOCKED::2025-01-01::Waiting on review" > "$TEST_DIR/gamma/ROADMAP.md"
+}
+
+# Expected doctor output line for a project
+doctor_line() {
+    printf "%-20s v%-6s %s" "$1:" "$2" "$3"
+}
+
+@test "doctor reports status of every project" {
+    run "$CLAUDEPM" doctor "$TEST_DIR"
+    assert_success
+    assert_output --partial "$(doctor_line alpha "$VERSION" "🟢 Active")"
+    assert_output --partial "$(doctor_line beta "0.0.1" "🟠 Outdated")"
+    assert_output --partial "$(doctor_line gamma "$VERSION" "🟠 Blocked")"
+    assert_output --partial "Cache: 0 hits, 3 misses"
+}
+
+@test "doctor serves unchanged projects from the cache" {
+    "$CLAUDEPM" doctor "$TEST_DIR" >/dev/null
+
+    run "$CLAUDEPM" doctor "$TEST_DIR"
+    assert_success
+    assert_output --partial "Cache: 3 hits, 0 misses"
+    assert_output --partial "$(doctor_line gamma "$VERSION" "🟠 Blocked")"
+}
+
+@test "doctor rescans projects whose files changed" {
+    "$CLAUDEPM" doctor "$TEST_DIR" >/dev/null
+    echo "template_version=$VERSION" > "$TEST_DIR/beta/.claudepm.new"
+    echo "# padding" >> "$TEST_DIR/beta/.claudepm.new"
+    mv "$TEST_DIR/beta/.claudepm.new" "$TEST_DIR/beta/.claudepm"
+
+    run "$CLAUDEPM" doctor "$TEST_DIR"
+    assert_success
+    assert_output --partial "Cache: 2 hits, 1 misses"
+    assert_output --partial "$(doctor_line beta "$VERSION" "🟢 Active")"
+}
+
+@test "doctor --no-cache rescans everything with a job limit" {
+    "$CLAUDEPM" doctor "$TEST_DIR" >/dev/null
+
+    run "$CLAUDEPM" doctor --no-cache -j 1 "$TEST_DIR"
+    assert_success
+    assert_output --partial "Cache: 0 hits, 3 misses"
+    assert_output --partial "$(doctor_line alpha "$VERSION" "🟢 Active")"
+}
+
+@test "doctor rejects a job count that is not a positive number" {
+    run "$CLAUDEPM" doctor -j x "$TEST_DIR"
+    assert_failure
+    assert_output --partial "Usage: claudepm doctor"
+
+    run "$CLAUDEPM" doctor --jobs 0 "$TEST_DIR"
+    assert_failure
+}
+
+@test "concurrent doctor runs each report every project" {
+    local i
+    for i in 1 2 3 4; do
+        "$CLAUDEPM" doctor --no-cache "$TEST_DIR" > "$BATS_TEST_TMPDIR/run.$i" &
+    done
+    wait
+
+    for i in 1 2 3 4; do
+        run cat "$BATS_TEST_TMPDIR/run.$i"
+        assert_output --partial "$(doctor_line alpha "$VERSION" "🟢 Active")"
+        assert_output --partial "$(doctor_line gamma "$VERSION" "🟠 Blocked")"
+    done
+    [ "$(wc -l < "$CLAUDEPM_STATE_DIR/doctor.tsv")" -eq 3 ]
+    [ -z "$(find "$CLAUDEPM_STATE_DIR" -maxdepth 1 -name 'doctor.tsv.*')" ]
+}
+
+@test "doctor skips pruned, ignored and task-agent directories" {
+    mkdir -p "$TEST_DIR/alpha/node_modules/dep" "$TEST_DIR/alpha/worktrees/feature" "$TEST_DIR/scratch/old"
+    echo "template_version=0.0.1" > "$TEST_DIR/alpha/node_modules/dep/.claudepm"
+    echo '{ "claudepm": { "role": "task-agent" } }' > "$TEST_DIR/alpha/worktrees/feature/.claudepm"
+    echo "template_version=0.0.1" > "$TEST_DIR/scratch/old/.claudepm"
+    echo "scratch/" > "$TEST_DIR/.claudepmignore"
+
+    run "$CLAUDEPM" doctor "$TEST_DIR"
+    assert_success
+    assert_output --partial "Discovered 3 projects in"
+    refute_output --partial "dep:"
+    refute_output --partial "feature:"
+    refute_output --partial "old:"
+}
+
+@test "doctor --depth limits how deep discovery searches" {
+    mkdir -p "$TEST_DIR/nested/one/two"
+    echo "template_version=$VERSION" > "$TEST_DIR/nested/one/two/.claudepm"
+
+    run "$CLAUDEPM" doctor --depth 2 "$TEST_DIR"
+    assert_success
+    refute_output --partial "two:"
+
+    run "$CLAUDEPM" doctor --depth 3 "$TEST_DIR"
+    assert_success
+    assert_output --partial "$(doctor_line two "$VERSION" "🟢 Active")"
+}
+
+@test "doctor --ndjson streams a record per project and a summary" {
+    "$CLAUDEPM" doctor "$TEST_DIR" >/dev/null
+    touch "$TEST_DIR/alpha/ROADMAP.md"
+
+    run "$CLAUDEPM" doctor --ndjson "$TEST_DIR"
+    assert_success
+    refute_output --partial "Checking claudepm installation"
+    assert_output --partial '"kind":"doctor_project","project":"beta","path":"'"$TEST_DIR"'/beta","version":"0.0.1","status":"outdated",'
+    assert_output --partial '"project":"gamma","path":"'"$TEST_DIR"'/gamma","version":"'"$VERSION"'","status":"blocked",'
+    assert_output --partial '"blocked":0,"uncommitted":null,"cached":false}'
+    assert_output --partial '{"schema":1,"kind":"doctor_summary","projects":3,"cache_hits":2,"cache_misses":1,'
+    [ "$(echo "$output" | wc -l)" -eq 4 ]
+}
+
+@test "doctor never writes into the projects it scans" {
+    git -C "$TEST_DIR/alpha" init -q
+
+    run "$CLAUDEPM" doctor --no-cache "$TEST_DIR"
+    assert_success
+    assert_output --partial "$(doctor_line gamma "$VERSION" "🟠 Blocked")"
+    [ -z "$(find "$TEST_DIR" -name .claudepm-cache)" ]
+    [ ! -e "$TEST_DIR/alpha/.git/claudepm" ]
+    [ -f "$CLAUDEPM_STATE_DIR/projects/${TEST_DIR//\//%}%alpha/git.probe" ]
+}
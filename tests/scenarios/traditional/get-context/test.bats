@@ -205,4 +205,32 @@ EOF
     
     # Should parse role correctly despite spaces
     assert_output --partial "# CLAUDEPM Manager Instructions"
-}
\ No newline at end of file
+}
+
+@test "get-context caches output and rebuilds when an input changes" {
+    echo '{ "role": "project" }' > .claudepm
+    echo "# First version" > CLAUDE.md
+    
+    run ./get-context.sh
+    assert_success
+    assert_output --partial "# First version"
+    [ -f .claudepm-cache/context ]
+    
+    echo "# Second version, longer" > CLAUDE.md
+    echo "Core content changed" >> "$TEST_CLAUDE_HOME/core/CLAUDEPM-PROJECT.md"
+    run ./get-context.sh
+    assert_success
+    assert_output --partial "# Second version, longer"
+    assert_output --partial "Core content changed"
+    refute_output --partial "# First version"
+}
+
+@test "get-context --stats reports bytes and approximate tokens" {
+    echo '{ "role": "manager" }' > .claudepm
+    printf '0123456789\n' > CLAUDE.md
+    
+    run ./get-context.sh --stats
+    assert_success
+    local bytes=$(./get-context.sh | wc -c | tr -d ' ')
+    assert_output "bytes=$bytes tokens=$(( (bytes + 3) / 4 ))"
+}
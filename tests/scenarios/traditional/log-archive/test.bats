@@ -0,0 +1,77 @@
+#!/usr/bin/env bats
+# Test suite for LOG.md segmentation (claudepm archive/history)
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-log-archive"
+    mkdir -p "$TEST_DIR"
+    
+    # Run claudepm straight from the repo checkout
+    export CLAUDEPM_HOME="$PROJECT_ROOT"
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    export CLAUDEPM_LOG_KEEP_ENTRIES=5
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+    
+    cd "$TEST_DIR"
+    echo "template_version=$(cat "$PROJECT_ROOT/VERSION")" > .claudepm
+    {
+        echo "# Project Log"
+        local i
+        for i in $(seq 1 30); do
+            printf '\n\n### 2025-%02d-%02d 10:00 - Entry %d\nDid: work %d\n\n---\n' $(( (i - 1) / 10 + 1 )) "$i" "$i" "$i"
+        done
+    } > LOG.md
+}
+
+teardown() {
+    cd "$OLDPWD"
+}
+
+@test "archive moves older entries into monthly segments with a manifest" {
+    run "$CLAUDEPM" archive
+    assert_success
+    assert_output --partial "Archived 25 log entries"
+    
+    [ -f log-archive/LOG-2025-01.md.gz ]
+    [ -f log-archive/LOG-2025-03.md.gz ]
+    run cat log-archive/manifest.tsv
+    assert_output --partial "$(printf 'LOG-2025-01.md.gz\t2025-01-01\t2025-01-10\t10')"
+    assert_output --partial "$(printf 'LOG-2025-03.md.gz\t2025-03-21\t2025-03-25\t5')"
+    
+    run grep -c "^### " LOG.md
+    assert_output "5"
+    run head -1 LOG.md
+    assert_output "# Project Log"
+}
+
+@test "history searches archived segments and the live log" {
+    "$CLAUDEPM" archive
+    "$CLAUDEPM" archive
+    
+    run "$CLAUDEPM" history "work 3"
+    assert_success
+    assert_output --partial "Entry 3"
+    assert_output --partial "Entry 30"
+    refute_output --partial "Entry 4"
+    
+    run "$CLAUDEPM" history --since 2025-02 --until 2025-02
+    assert_success
+    assert_output --partial "Entry 11"
+    assert_output --partial "Entry 20"
+    refute_output --partial "Entry 21"
+    refute_output --partial "Entry 10"
+}
+
+@test "log archives automatically past the size threshold" {
+    export CLAUDEPM_LOG_SEGMENT_BYTES=500
+    
+    run "$CLAUDEPM" log "Another entry"
+    assert_success
+    assert_output --partial "Archived 26 log entries"
+    
+    run "$CLAUDEPM" history
+    assert_success
+    assert_output --partial "Entry 1"
+    assert_output --partial "Another entry"
+}
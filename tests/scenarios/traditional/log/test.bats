@@ -0,0 +1,90 @@
+#!/usr/bin/env bats
+# Test suite for claudepm log (atomic appends and queued batches)
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-log"
+    mkdir -p "$TEST_DIR"
+
+    # Run claudepm straight from the repo checkout
+    export CLAUDEPM_HOME="$PROJECT_ROOT"
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    export CLAUDEPM_DAEMON=0
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+
+    cd "$TEST_DIR"
+    echo "template_version=$(cat "$PROJECT_ROOT/VERSION")" > .claudepm
+    echo "# Project Log" > LOG.md
+}
+
+@test "concurrent log writers never interleave entries" {
+    local big=$(head -c 20000 /dev/zero | tr '\0' 'x') i
+    for i in $(seq 1 12); do
+        if (( i % 4 == 0 )); then
+            "$CLAUDEPM" log "Big $i" "Did: $big" >/dev/null &
+        else
+            "$CLAUDEPM" log "Small $i" "Did: small $i" >/dev/null &
+        fi
+    done
+    wait
+
+    [ "$(grep -c '^### ' LOG.md)" -eq 12 ]
+    [ "$(grep -c '^---$' LOG.md)" -eq 12 ]
+    [ "$(awk '/^Did: x/ && length($0) == 20005' LOG.md | wc -l)" -eq 3 ]
+    [ ! -e .claudepm-cache/log.lock ] && [ ! -L .claudepm-cache/log.lock ]
+}
+
+@test "log --queue holds entries until --flush appends them at once" {
+    run "$CLAUDEPM" log --queue "First" "Next: second"
+    assert_success
+    assert_output "Queued: First"
+    CLAUDEPM_LOG_BATCH=1 "$CLAUDEPM" log "Second" >/dev/null
+    ! grep -q "First" LOG.md
+
+    run "$CLAUDEPM" log --flush
+    assert_success
+    assert_output "Flushed 2 queued log entries"
+    grep -q "^### .* - First$" LOG.md
+    grep -q "^Did: Second$" LOG.md
+    [ ! -s .claudepm-cache/log.queue ]
+
+    run "$CLAUDEPM" log --flush
+    assert_output "Log queue is empty"
+}
+
+@test "a lock is broken only once its holder has died" {
+    export CLAUDEPM_LOG_ATOMIC_BYTES=16
+    mkdir -p .claudepm-cache
+    sh -c 'exit 0' &
+    local dead=$!
+    wait "$dead"
+    ln -s "$dead" .claudepm-cache/log.lock
+    run "$CLAUDEPM" log "After a dead holder"
+    assert_success
+    [ ! -L .claudepm-cache/log.lock ]
+
+    sleep 30 &
+    local holder=$!
+    ln -s "$holder" .claudepm-cache/log.lock
+
+    "$CLAUDEPM" log "Waits for the holder" >/dev/null &
+    local writer=$!
+    sleep 6
+    ! grep -q "Waits for the holder" LOG.md
+
+    kill "$holder"
+    wait "$writer"
+    grep -q "^### .* - Waits for the holder$" LOG.md
+    [ ! -L .claudepm-cache/log.lock ]
+}
+
+@test "log leaves the rollups for stats to bring up to date" {
+    run "$CLAUDEPM" log "Quick note"
+    assert_success
+    [ ! -d .claudepm-cache/rollups ]
+
+    run "$CLAUDEPM" stats
+    assert_success
+    assert_output --partial "Quick note"
+}
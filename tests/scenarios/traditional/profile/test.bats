@@ -0,0 +1,40 @@
+#!/usr/bin/env bats
+# Test suite for --profile phase timing
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-profile"
+    mkdir -p "$TEST_DIR"
+    cd "$TEST_DIR"
+
+    export CLAUDEPM_HOME="$PROJECT_ROOT"
+    export CLAUDEPM_STATE_DIR="$BATS_TEST_TMPDIR/state"
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+
+    echo "template_version=$(cat "$PROJECT_ROOT/VERSION")" > .claudepm
+    printf '# Log\n\n### 2025-01-01 10:00 - Setup\nNext: Write tests\n' > LOG.md
+    echo "CPM::TASK::aaa-111::TODO::2025-01-01::First task" > ROADMAP.md
+}
+
+@test "--profile prints a phase table on stderr only" {
+    CLAUDEPM_DAEMON=0 "$CLAUDEPM" context > plain.out
+    "$CLAUDEPM" --profile context > profiled.out 2> profile.err
+
+    cmp plain.out profiled.out
+    run cat profile.err
+    assert_output --partial "PROFILE: claudepm context (exit 0)"
+    assert_output --partial "context:git"
+    assert_output --partial "context:sections"
+    assert_output --partial "total"
+    assert_output --partial "pids: system PIDs allocated"
+}
+
+@test "CLAUDEPM_PROFILE=json emits one JSON record and keeps the exit status" {
+    run bash -c 'CLAUDEPM_PROFILE=json "$0" task show missing 2>&1 >/dev/null' "$CLAUDEPM"
+    assert_failure
+    assert_output --partial '{"schema":1,"command":"task show missing","exit":1,"total_ms":'
+    assert_output --partial '{"name":"task:show","ms":'
+    assert_output --partial '"system_pids":'
+    refute_output --partial '"forks"'
+}
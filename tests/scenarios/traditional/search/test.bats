@@ -0,0 +1,113 @@
+#!/usr/bin/env bats
+# Test suite for claudepm search (incremental index over logs, tasks, notes)
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-search"
+    mkdir -p "$TEST_DIR/alpha" "$TEST_DIR/beta"
+
+    # search reads $CLAUDEPM_HOME/projects.list, so use a throwaway home
+    export CLAUDEPM_HOME="$BATS_TEST_TMPDIR/claudepm-home"
+    mkdir -p "$CLAUDEPM_HOME"
+    local item
+    for item in bin lib templates VERSION; do
+        ln -s "$PROJECT_ROOT/$item" "$CLAUDEPM_HOME/$item"
+    done
+    printf '%s\n' "$TEST_DIR/alpha" "$TEST_DIR/beta" > "$CLAUDEPM_HOME/projects.list"
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    export CLAUDEPM_STATE_DIR="$BATS_TEST_TMPDIR/state"
+    export CLAUDEPM_DAEMON=0
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+
+    cd "$TEST_DIR/alpha"
+    echo "template_version=test" > .claudepm
+    printf '# Log\n\n### 2025-01-02 10:00 - Fixed auth token refresh\nDid: rewrote the token cache\n\n---\n\n### 2025-02-03 11:00 - Parser work\nDid: unicode input\n' > LOG.md
+    printf 'CPM::TASK::aaa-111::TODO::2025-01-01::Write refresh tests\nCPM::TASK::bbb-222::DONE::2025-01-05::Refresh docs\n' > ROADMAP.md
+    printf '# Notes\n\n## Auth\nTokens expire after an hour.\n' > NOTES.md
+
+    echo "template_version=test" > "$TEST_DIR/beta/.claudepm"
+    printf '# Log\n\n### 2025-03-01 09:00 - Token bucket limiter\nDid: token bucket\n' > "$TEST_DIR/beta/LOG.md"
+}
+
+@test "search ranks matches from logs, tasks and notes across projects" {
+    run "$CLAUDEPM" search token
+    assert_success
+    assert_output --partial "[alpha] log 2025-01-02 10:00 - Fixed auth token refresh"
+    assert_output --partial "[beta] log 2025-03-01 09:00 - Token bucket limiter"
+    assert_output --partial "[alpha] note Auth"
+    assert_output --partial "3 of 3 matches"
+
+    run "$CLAUDEPM" search auth refresh -n 1
+    assert_success
+    assert_output --partial "[alpha] log 2025-01-02 10:00 - Fixed auth token refresh"
+    assert_output --partial "1 of 4 matches"
+}
+
+@test "search filters by project, date and task status" {
+    run "$CLAUDEPM" search token -p beta
+    assert_success
+    assert_output --partial "1 of 1 matches"
+
+    run "$CLAUDEPM" search token --since 2025-02 --until 2025-03
+    assert_success
+    assert_output --partial "[beta] log"
+    refute_output --partial "[alpha]"
+
+    run "$CLAUDEPM" search refresh --status done
+    assert_success
+    assert_output --partial "[alpha] task [DONE] Refresh docs (2025-01-05)"
+    assert_output --partial "1 of 1 matches"
+}
+
+@test "search indexes appends and rewrites incrementally" {
+    "$CLAUDEPM" search token >/dev/null
+    printf '\n### 2025-04-01 09:00 - Cache eviction\nDid: evict stale entries\n' >> LOG.md
+    "$CLAUDEPM" task add "Evict on logout" >/dev/null
+
+    run "$CLAUDEPM" search evict
+    assert_success
+    assert_output --partial "[alpha] log 2025-04-01 09:00 - Cache eviction"
+    assert_output --partial "[alpha] task [TODO] Evict on logout"
+
+    # A rewritten LOG.md drops entries that are gone
+    printf '# Log\n\n### 2025-05-01 09:00 - Fresh start\nDid: nothing yet\n' > LOG.md
+    run "$CLAUDEPM" search rewrote
+    assert_success
+    assert_output "No matches for: rewrote"
+}
+
+@test "search --json prints a versioned search record" {
+    run "$CLAUDEPM" search bucket --json
+    assert_success
+    assert_output --partial '{"schema":1,"kind":"search","query":"bucket","total":1,"results":[{"project":"beta","path":"'"$TEST_DIR"'/beta","kind":"log","date":"2025-03-01","status":null,"title":"2025-03-01 09:00 - Token bucket limiter","snippet":"Did: token bucket","score":'
+}
+
+@test "search never writes into the projects it indexes" {
+    git -C "$TEST_DIR/beta" init -q
+    printf 'CPM::TASK::ccc-333::TODO::2025-03-02::Tune the token bucket\n' > "$TEST_DIR/beta/ROADMAP.md"
+    cd "$TEST_DIR"
+
+    run "$CLAUDEPM" search bucket
+    assert_success
+    assert_output --partial "Tune the token bucket"
+    [ ! -e "$TEST_DIR/alpha/.claudepm-cache" ]
+    [ ! -e "$TEST_DIR/beta/.claudepm-cache" ]
+    [ ! -e "$TEST_DIR/beta/.git/claudepm" ]
+}
+
+@test "search sees task changes in a project inside a repository subdirectory" {
+    git -C "$TEST_DIR" init -q
+    mkdir -p "$TEST_DIR/mono/app"
+    echo "template_version=test" > "$TEST_DIR/mono/app/.claudepm"
+    printf 'CPM::TASK::ddd-444::TODO::2025-03-03::Deploy the gateway\n' > "$TEST_DIR/mono/app/ROADMAP.md"
+    echo "$TEST_DIR/mono/app" >> "$CLAUDEPM_HOME/projects.list"
+
+    run "$CLAUDEPM" search gateway --status TODO
+    assert_output --partial "[app] task [TODO] Deploy the gateway"
+
+    (cd "$TEST_DIR/mono/app" && "$CLAUDEPM" task done ddd-444 >/dev/null)
+    run "$CLAUDEPM" search gateway
+    assert_success
+    assert_output --partial "[app] task [DONE] Deploy the gateway"
+}
@@ -0,0 +1,105 @@
+#!/usr/bin/env bats
+# Test suite for claudepm stats (incremental per-day and per-week rollups)
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-stats"
+    mkdir -p "$TEST_DIR/alpha" "$TEST_DIR/beta"
+
+    # stats --all reads $CLAUDEPM_HOME/projects.list, so use a throwaway home
+    export CLAUDEPM_HOME="$BATS_TEST_TMPDIR/claudepm-home"
+    mkdir -p "$CLAUDEPM_HOME"
+    local item
+    for item in bin lib templates VERSION; do
+        ln -s "$PROJECT_ROOT/$item" "$CLAUDEPM_HOME/$item"
+    done
+    printf '%s\n' "$TEST_DIR/alpha" "$TEST_DIR/beta" > "$CLAUDEPM_HOME/projects.list"
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    export CLAUDEPM_STATE_DIR="$BATS_TEST_TMPDIR/state"
+    export CLAUDEPM_DAEMON=0
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+    TODAY=$(date +%Y-%m-%d)
+
+    cd "$TEST_DIR/alpha"
+    echo "template_version=test" > .claudepm
+    printf '# Log\n\n### 2025-01-06 10:00 - Planned auth\nDid: design\nNext: build login\n\n---\n' > LOG.md
+    printf 'CPM::TASK::aaa-111::TODO::2025-01-07::Write login form\n' > ROADMAP.md
+    echo "template_version=test" > "$TEST_DIR/beta/.claudepm"
+}
+
+@test "stats rolls up log entries and task events as they are written" {
+    "$CLAUDEPM" log "Built login" "Did: form and API
+Next: add tests
+Blocked: waiting on keys" >/dev/null
+    "$CLAUDEPM" task block aaa-111 "needs design" >/dev/null
+
+    run "$CLAUDEPM" stats
+    assert_success
+    assert_output --partial "alpha: 1 entries on 1 days, 0 tasks opened, 0 closed, 1 blocked"
+    assert_output --partial "    $TODAY  Built login"
+    assert_output --partial "    $TODAY  add tests"
+    assert_output --partial "    $TODAY  waiting on keys"
+    assert_output --partial "    $TODAY  Write login form (needs design)"
+
+    # Only the appended entry is read; the counts build on the stored tables
+    "$CLAUDEPM" log "Added tests" "Next: ship it" >/dev/null
+    run "$CLAUDEPM" stats
+    assert_success
+    assert_output --partial "alpha: 2 entries on 1 days"
+    assert_output --partial "    $TODAY  ship it"
+}
+
+@test "stats --week reads one week of history" {
+    run "$CLAUDEPM" stats --week 2025-01-08
+    assert_success
+    assert_output --partial "Activity 2025-01-06 .. 2025-01-12"
+    assert_output --partial "alpha: 1 entries on 1 days, 1 tasks opened, 0 closed, 0 blocked"
+    assert_output --partial "    2025-01-06  Planned auth"
+    assert_output --partial "    2025-01-07  Write login form"
+
+    # A rewritten LOG.md rebuilds the rollups
+    printf '# Log\n\n### 2025-01-09 09:00 - Replanned\nDid: rethink\n' > LOG.md
+    run "$CLAUDEPM" stats --week 2025-01-08
+    assert_success
+    refute_output --partial "Planned auth"
+    assert_output --partial "    2025-01-09  Replanned"
+}
+
+@test "stats --all --json prints a record per project" {
+    run "$CLAUDEPM" stats --all --json --days 3
+    assert_success
+    assert_output --partial '{"schema":1,"kind":"stats","from":"'
+    assert_output --partial '{"project":"alpha","path":"'"$TEST_DIR"'/alpha","entries":0,"active_days":0,"opened":0,"closed":0,"blocked":0,"items":[],"last_next":{"date":"2025-01-06","text":"build login"}}'
+    assert_output --partial '{"project":"beta","path":"'"$TEST_DIR"'/beta","entries":0,'
+}
+
+@test "stats --all never writes into the projects it reads" {
+    git -C "$TEST_DIR/beta" init -q
+    cd "$TEST_DIR"
+
+    run "$CLAUDEPM" stats --all
+    assert_success
+    assert_output --partial "alpha: no activity (last Next: 2025-01-06  build login)"
+    assert_output --partial "beta: no activity"
+    [ ! -e "$TEST_DIR/alpha/.claudepm-cache" ]
+    [ ! -e "$TEST_DIR/beta/.claudepm-cache" ]
+    [ -d "$CLAUDEPM_STATE_DIR/projects/${TEST_DIR//\//%}%alpha/rollups" ]
+}
+
+@test "stats --all reads each project's own journal" {
+    git -C "$TEST_DIR" init -q
+    mkdir -p "$TEST_DIR/mono/app"
+    echo "template_version=test" > "$TEST_DIR/mono/app/.claudepm"
+    echo "$TEST_DIR/mono/app" >> "$CLAUDEPM_HOME/projects.list"
+    (cd "$TEST_DIR/mono/app" && "$CLAUDEPM" task add "Ship the app" >/dev/null)
+    git -C "$TEST_DIR/beta" init -q
+    (cd "$TEST_DIR/beta" && "$CLAUDEPM" task add "Review the app" >/dev/null)
+    "$CLAUDEPM" task done aaa-111 >/dev/null
+
+    run "$CLAUDEPM" stats --all
+    assert_success
+    assert_output --partial "app: 0 entries on 0 days, 1 tasks opened, 0 closed, 0 blocked"
+    assert_output --partial "alpha: 0 entries on 0 days, 0 tasks opened, 1 closed, 0 blocked"
+    assert_output --partial "beta: 0 entries on 0 days, 1 tasks opened, 0 closed, 0 blocked"
+}
@@ -0,0 +1,322 @@
+#!/usr/bin/env bats
+# Test suite for claudepm task parsing (task list, next, context, health)
+
+load '../../../framework/test-helpers.bash'
+
+setup() {
+    export TEST_DIR="$BATS_TEST_TMPDIR/test-tasks"
+    mkdir -p "$TEST_DIR"
+    
+    # Run claudepm straight from the repo checkout
+    export CLAUDEPM_HOME="$PROJECT_ROOT"
+    export CLAUDEPM_CONFIG="$BATS_TEST_TMPDIR/config"
+    CLAUDEPM="$PROJECT_ROOT/bin/claudepm"
+    
+    cd "$TEST_DIR"
+    cat > ROADMAP.md <<'EOF2'
+# Roadmap
+
+CPM::TASK::aaa-111::TODO::2025-01-01::Write the parser
+CPM::TASK::bbb-222::IN_PROGRESS::2025-01-02::Handle a::b in descriptions
+- CPM::TASK::ccc-333::BLOCKED::2025-01-03::Ship it (Blocked: waiting on review)
+CPM::TASK::ddd-444::DONE::2025-01-04::Set up repo
+EOF2
+    echo "template_version=$(cat "$PROJECT_ROOT/VERSION")" > .claudepm
+}
+
+teardown() {
+    cd "$OLDPWD"
+}
+
+@test "task list shows every task with status and date" {
+    run "$CLAUDEPM" task list
+    assert_success
+    assert_output --partial "[TODO] 2025-01-01 - Write the parser"
+    assert_output --partial "[IN_PROGRESS] 2025-01-02 - Handle a::b in descriptions"
+    assert_output --partial "[BLOCKED] 2025-01-03 - Ship it (Blocked: waiting on review)"
+    assert_output --partial "[DONE] 2025-01-04 - Set up repo"
+}
+
+@test "task list filters by status" {
+    run "$CLAUDEPM" task list --blocked
+    assert_success
+    assert_output --partial "Ship it"
+    refute_output --partial "Write the parser"
+    
+    run "$CLAUDEPM" task list --todo
+    assert_success
+    assert_output --partial "Write the parser"
+    refute_output --partial "Set up repo"
+}
+
+@test "task list matches status field, not description text" {
+    echo "CPM::TASK::eee-555::TODO::2025-01-05::Document the ::BLOCKED:: marker" >> ROADMAP.md
+    
+    run "$CLAUDEPM" task list --blocked
+    assert_success
+    refute_output --partial "Document the"
+}
+
+@test "next lists in-progress, todo and blocked tasks" {
+    run "$CLAUDEPM" next
+    assert_success
+    assert_output --partial "[bbb-222] Handle a::b in descriptions"
+    assert_output --partial "[aaa-111] Write the parser"
+    assert_output --partial "- Ship it (Blocked: waiting on review)"
+}
+
+@test "next shows at most five TODO tasks" {
+    for i in 1 2 3 4 5 6 7; do
+        echo "CPM::TASK::extra-$i::TODO::2025-02-0$i::Extra task $i" >> ROADMAP.md
+    done
+    
+    run "$CLAUDEPM" next
+    assert_success
+    assert_output --partial "Extra task 4"
+    refute_output --partial "Extra task 5"
+}
+
+@test "task list, task show and next offer --json" {
+    run "$CLAUDEPM" task list --blocked --json
+    assert_success
+    assert_output '{"schema":1,"kind":"tasks","tasks":[{"uuid":"ccc-333","status":"BLOCKED","date":"2025-01-03","description":"Ship it (Blocked: waiting on review)"}]}'
+    
+    run "$CLAUDEPM" task show bbb-222 --json
+    assert_output '{"schema":1,"kind":"task","task":{"uuid":"bbb-222","status":"IN_PROGRESS","date":"2025-01-02","description":"Handle a::b in descriptions"}}'
+    
+    run "$CLAUDEPM" next --json
+    assert_success
+    assert_output --partial '"in_progress":[{"uuid":"bbb-222",'
+    assert_output --partial '"todo":[{"uuid":"aaa-111",'
+    assert_output --partial '"blocked":[{"uuid":"ccc-333",'
+}
+
+@test "context counts tasks by status" {
+    run "$CLAUDEPM" context
+    assert_success
+    assert_output --partial "TODO: 1 tasks"
+    assert_output --partial "IN_PROGRESS: 1 tasks"
+    assert_output --partial "BLOCKED: 1 tasks"
+    assert_output --partial "- Handle a::b in descriptions"
+}
+
+@test "health reports blocked and active counts" {
+    run "$CLAUDEPM" health
+    assert_success
+    assert_output --partial "Blocked tasks: 1"
+    assert_output --partial "Active work items: 2"
+}
+
+@test "task done appends to the journal and leaves ROADMAP.md alone" {
+    local inode=$(ls -i ROADMAP.md)
+    run "$CLAUDEPM" task done aaa-111
+    assert_success
+    assert_file_contains ROADMAP.md "^CPM::TASK::aaa-111::TODO::2025-01-01::Write the parser$"
+    assert_file_contains .claudepm-cache/tasks.journal "	done	aaa-111	"
+    [ "$(ls -i ROADMAP.md)" = "$inode" ]
+    [ ! -f ROADMAP.md.bak ]
+    
+    run "$CLAUDEPM" task list --done
+    assert_output --partial "Write the parser"
+}
+
+@test "the journal is folded into ROADMAP.md past the size threshold" {
+    export CLAUDEPM_TASK_FOLD_BYTES=40
+    "$CLAUDEPM" task done aaa-111
+    run grep -c "aaa-111::DONE" ROADMAP.md
+    assert_output "0"
+    "$CLAUDEPM" task start bbb-222
+    
+    assert_file_contains ROADMAP.md "^CPM::TASK::aaa-111::DONE::2025-01-01::Write the parser$"
+    assert_file_contains ROADMAP.md "^CPM::TASK::bbb-222::IN_PROGRESS::"
+    run "$CLAUDEPM" task list --done
+    assert_output --partial "Write the parser"
+}
+
+@test "task compact folds journal events into ROADMAP.md" {
+    "$CLAUDEPM" task start aaa-111
+    "$CLAUDEPM" task block bbb-222 "needs design"
+    "$CLAUDEPM" task add "Brand new task"
+    
+    run "$CLAUDEPM" task compact
+    assert_success
+    assert_file_contains ROADMAP.md "^CPM::TASK::aaa-111::IN_PROGRESS::2025-01-01::Write the parser$"
+    assert_file_contains ROADMAP.md "^CPM::TASK::bbb-222::BLOCKED::2025-01-02::Handle a::b in descriptions (Blocked: needs design)$"
+    assert_file_contains ROADMAP.md "::TODO::.*::Brand new task$"
+    # Untouched lines keep their exact text
+    assert_file_contains ROADMAP.md "^- CPM::TASK::ccc-333::BLOCKED::"
+    assert_file_contains ROADMAP.md "^CPM::TASK::ddd-444::DONE::2025-01-04::Set up repo$"
+    
+    # Compacted events are not applied twice
+    run "$CLAUDEPM" task compact
+    assert_success
+    run grep -c "Blocked: needs design" ROADMAP.md
+    assert_output "1"
+}
+
+@test "task show looks up a task by uuid" {
+    run "$CLAUDEPM" task show bbb-222
+    assert_success
+    assert_output --partial "Status: IN_PROGRESS"
+    assert_output --partial "Date: 2025-01-02"
+    assert_output --partial "Description: Handle a::b in descriptions"
+    
+    run "$CLAUDEPM" task show missing-uuid
+    assert_failure
+    assert_output --partial "Task not found"
+    
+    run "$CLAUDEPM" task done missing-uuid
+    assert_failure
+    assert_output --partial "Task not found"
+}
+
+@test "task show includes journaled changes" {
+    "$CLAUDEPM" task block aaa-111 "waiting on API"
+    
+    run "$CLAUDEPM" task show aaa-111
+    assert_success
+    assert_output --partial "Status: BLOCKED"
+    assert_output --partial "Description: Write the parser (Blocked: waiting on API)"
+}
+
+@test "task index is rebuilt after ROADMAP.md is edited by hand" {
+    run "$CLAUDEPM" task show ddd-444
+    assert_success
+    
+    # Shift every offset by inserting a line at the top
+    { echo "# Edited by hand"; cat ROADMAP.md; } > ROADMAP.new
+    mv ROADMAP.new ROADMAP.md
+    
+    run "$CLAUDEPM" task show ddd-444
+    assert_success
+    assert_output --partial "Description: Set up repo"
+}
+
+@test "task changes keep the task index valid" {
+    run "$CLAUDEPM" task show ccc-333
+    assert_success
+    local stamp=$(cat .claudepm-cache/tasks.idx.stamp)
+    touch -d "2000-01-01" .claudepm-cache/tasks.idx/aa.tsv
+    
+    "$CLAUDEPM" task done aaa-111
+    "$CLAUDEPM" task add "Another task"
+    run "$CLAUDEPM" task show aaa-111
+    assert_success
+    assert_output --partial "Status: DONE"
+    # Served from the same index, not a rebuild
+    [ "$(cat .claudepm-cache/tasks.idx.stamp)" = "$stamp" ]
+    [ -z "$(find .claudepm-cache/tasks.idx/aa.tsv -newermt 2001-01-01)" ]
+}
+
+@test "task show matches glob characters in a uuid literally" {
+    printf 'CPM::TASK::[f]x-777::TODO::2025-01-07::Bracketed uuid\n' >> ROADMAP.md
+    
+    run "$CLAUDEPM" task show '[f]x-777'
+    assert_success
+    assert_output --partial "Date: 2025-01-07"
+    assert_output --partial "Description: Bracketed uuid"
+}
+
+@test "task index keys tasks by uuid prefix" {
+    cat >> ROADMAP.md <<'EOF2'
+CPM::TASK::aab-555::TODO::2025-01-05::Shares a bucket with aaa-111
+CPM::TASK::a/b-666::TODO::2025-01-06::Odd uuid
+EOF2
+    
+    run "$CLAUDEPM" task show aab-555
+    assert_success
+    assert_output --partial "Description: Shares a bucket with aaa-111"
+    [ "$(wc -l < .claudepm-cache/tasks.idx/aa.tsv)" -eq 2 ]
+    [ -f .claudepm-cache/tasks.idx/dd.tsv ]
+    
+    run "$CLAUDEPM" task show a/b-666
+    assert_success
+    assert_output --partial "Description: Odd uuid"
+    
+    run "$CLAUDEPM" task show aaa-999
+    assert_failure
+    assert_output --partial "Task not found"
+}
+
+@test "added tasks can be updated right away" {
+    run "$CLAUDEPM" task add "Brand new task"
+    assert_success
+    local uuid="${output##*: }"
+    
+    run "$CLAUDEPM" task done "$uuid"
+    assert_success
+    run "$CLAUDEPM" task list --done
+    assert_output --partial "Brand new task"
+    
+    "$CLAUDEPM" task compact
+    assert_file_contains ROADMAP.md "^CPM::TASK::$uuid::DONE::.*::Brand new task$"
+}
+
+@test "task compact folds events an interrupted write left behind" {
+    "$CLAUDEPM" task block aaa-111 "waiting on API"
+    "$CLAUDEPM" task compact
+    # As if a writer died after its journal append, and a fold after
+    # rewriting ROADMAP.md but before recording the folded offset
+    printf '%s\tstart\tbbb-222\t\t\n' "$(date +%s)" >> .claudepm-cache/tasks.journal
+    rm .claudepm-cache/tasks.journal.folded
+    
+    run "$CLAUDEPM" task list --blocked
+    assert_output --partial "Write the parser (Blocked: waiting on API)"
+    refute_output --partial "(Blocked: waiting on API) (Blocked"
+    
+    run "$CLAUDEPM" task compact
+    assert_success
+    assert_file_contains ROADMAP.md "^CPM::TASK::aaa-111::BLOCKED::2025-01-01::Write the parser (Blocked: waiting on API)$"
+    assert_file_contains ROADMAP.md "^CPM::TASK::bbb-222::IN_PROGRESS::"
+}
+
+@test "each worktree folds its own journal into its own ROADMAP.md" {
+    git init -q -b dev
+    git config user.email "test@example.com"
+    git config user.name "Test User"
+    git add ROADMAP.md
+    git commit -qm "Add roadmap"
+    git worktree add -q -b feature/x worktrees/x
+    
+    "$CLAUDEPM" task block aaa-111 "waiting on api"
+    "$CLAUDEPM" task compact
+    git commit -qam "Block the parser"
+    
+    # Merging the lead's ROADMAP.md replays nothing on top of it
+    cd worktrees/x
+    git merge -q dev
+    run "$CLAUDEPM" task show aaa-111
+    assert_output --partial "Description: Write the parser (Blocked: waiting on api)"
+    refute_output --partial "(Blocked: waiting on api) (Blocked"
+    "$CLAUDEPM" task add "From the agent"
+    run "$CLAUDEPM" task compact
+    assert_success
+    run grep -c "Blocked: waiting on api" ROADMAP.md
+    assert_output "1"
+    assert_file_contains ROADMAP.md "From the agent"
+    
+    # The agent's tasks reach the lead's ROADMAP.md through git
+    cd "$TEST_DIR"
+    run "$CLAUDEPM" task list
+    refute_output --partial "From the agent"
+}
+
+@test "projects that share a git repository keep separate journals" {
+    git init -q
+    mkdir -p a b
+    cp ROADMAP.md .claudepm a/
+    printf 'CPM::TASK::eee-555::TODO::2025-01-05::Other project\n' > b/ROADMAP.md
+    cp .claudepm b/
+    
+    (cd a && "$CLAUDEPM" task add "Only in a")
+    cd b
+    run "$CLAUDEPM" task list
+    refute_output --partial "Only in a"
+    "$CLAUDEPM" task compact
+    run grep -c "Only in a" ROADMAP.md
+    assert_output "0"
+    
+    cd ../a
+    "$CLAUDEPM" task compact
+    assert_file_contains ROADMAP.md "::TODO::.*::Only in a$"
+}
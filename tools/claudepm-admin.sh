@@ -14,6 +14,9 @@ MAIN_BRANCH="main"
 PROMPTS_ARCHIVE_DIR=".prompts_archive"
 TEMPLATE_FILE="templates/project/TASK_PROMPT.template.md"
 API_QUERIES_DIR=".api-queries"
+POOL_DIR="${WORKTREE_DIR}/.pool"
+# Directories a task agent needs, one per line (enables sparse checkouts)
+SPARSE_PROFILE=".claudepm-sparse"
 
 # --- Colors for feedback ---
 COLOR_RED='\033[0;31m'
@@ -49,50 +52,128 @@ function prevent_branch {
     fi
 }
 
-# Function to generate TASK_PROMPT.md from template
-function generate_task_prompt {
-    local feature_name=$1
-    local worktree_path=$2
-    
-    # Check if template exists
+# Function to render TASK_PROMPT.md for any number of worktrees in one pass
+# Args: feature/path pairs. The template and the list of architectural
+# reviews are read once; each feature gets the first review named
+# *-<feature>.md, in place of the {{ARCHITECTURAL_REVIEW}} line.
+function render_task_prompts {
     if [[ ! -f "$TEMPLATE_FILE" ]]; then
         echo -e "${COLOR_YELLOW}Warning: TASK_PROMPT template not found at ${TEMPLATE_FILE}${COLOR_NC}"
         return 1
     fi
     
-    # Look for architectural review
-    local arch_review=""
-    local arch_file="${API_QUERIES_DIR}/*-${feature_name}.md"
-    for file in $arch_file; do
+    local reviews="" file
+    for file in "$API_QUERIES_DIR"/*.md; do
         if [[ -f "$file" ]]; then
-            echo -e "${COLOR_BLUE}Found architectural review: ${file}${COLOR_NC}"
-            arch_review=$'\n## Architectural Review\n\n'
-            arch_review+=$(cat "$file")
-            break
+            reviews+="$file"$'\n'
         fi
     done
     
-    # Generate TASK_PROMPT.md by replacing placeholders
-    # First create the file with feature name replaced
-    sed "s/{{FEATURE_NAME}}/${feature_name}/g" "$TEMPLATE_FILE" > "${worktree_path}/TASK_PROMPT.md"
-    
-    # Now handle the architectural review placeholder
-    if [[ -n "$arch_review" ]]; then
-        # Create a temporary file with the content before the placeholder
-        sed '/{{ARCHITECTURAL_REVIEW}}/q' "${worktree_path}/TASK_PROMPT.md" | sed '$d' > "${worktree_path}/TASK_PROMPT.md.tmp"
-        # Add the architectural review
-        echo "$arch_review" >> "${worktree_path}/TASK_PROMPT.md.tmp"
-        # Add any content after the placeholder
-        sed '1,/{{ARCHITECTURAL_REVIEW}}/d' "${worktree_path}/TASK_PROMPT.md" >> "${worktree_path}/TASK_PROMPT.md.tmp"
-        # Replace the original file
-        mv "${worktree_path}/TASK_PROMPT.md.tmp" "${worktree_path}/TASK_PROMPT.md"
-    else
-        # Just remove the placeholder
-        sed -i.bak 's/{{ARCHITECTURAL_REVIEW}}//' "${worktree_path}/TASK_PROMPT.md"
-        rm "${worktree_path}/TASK_PROMPT.md.bak"
-    fi
-    
-    echo -e "${COLOR_GREEN}Generated TASK_PROMPT.md in ${worktree_path}${COLOR_NC}"
+    local review
+    while [[ $# -ge 2 ]]; do
+        printf '%s\t%s\n' "$1" "$2"
+        shift 2
+    done | awk -F '\t' -v OFS='\t' -v template="$TEMPLATE_FILE" -v reviews="$reviews" '
+        BEGIN {
+            while ((getline line < template) > 0) tpl[++lines] = line
+            close(template)
+            nreviews = split(reviews, review, "\n")
+        }
+        # Literal replacement (no regex or & surprises in feature names)
+        function replace_all(s, from, to,   out, i) {
+            out = ""
+            while ((i = index(s, from)) > 0) {
+                out = out substr(s, 1, i - 1) to
+                s = substr(s, i + length(from))
+            }
+            return out s
+        }
+        {
+            feature = $1
+            out = $2 "/TASK_PROMPT.md"
+            suffix = "-" feature ".md"
+            found = ""
+            for (i = 1; i <= nreviews; i++) {
+                if (length(review[i]) >= length(suffix) && substr(review[i], length(review[i]) - length(suffix) + 1) == suffix) {
+                    found = review[i]
+                    break
+                }
+            }
+            if (found != "" && !(found in content)) {
+                text = ""
+                while ((getline line < found) > 0) text = text line "\n"
+                close(found)
+                sub(/\n+$/, "", text)
+                content[found] = text
+            }
+            for (i = 1; i <= lines; i++) {
+                line = replace_all(tpl[i], "{{FEATURE_NAME}}", feature)
+                if (index(line, "{{ARCHITECTURAL_REVIEW}}")) {
+                    if (found != "") {
+                        printf "\n## Architectural Review\n\n%s\n", content[found] > out
+                        continue
+                    }
+                    line = replace_all(line, "{{ARCHITECTURAL_REVIEW}}", "")
+                }
+                print line > out
+            }
+            close(out)
+            print $2, found
+        }
+    ' | while IFS=$'\t' read -r file review; do
+        if [[ -n "$review" ]]; then
+            echo -e "${COLOR_BLUE}Found architectural review: ${review}${COLOR_NC}"
+        fi
+        echo -e "${COLOR_GREEN}Generated TASK_PROMPT.md in ${file}${COLOR_NC}"
+    done
+}
+
+# Function to generate TASK_PROMPT.md from template
+function generate_task_prompt {
+    render_task_prompts "$1" "$2"
+}
+
+# Function to write the task-agent .claudepm into a worktree
+function write_task_agent_config {
+    cat > "$1/.claudepm" << EOF
+{
+  "claudepm": {
+    "version": "0.2.0",
+    "core_version": "0.2.0",
+    "role": "task-agent"
+  }
+}
+EOF
+}
+
+# Function to check feature names before any worktree is created
+# Reports every problem (bad name, duplicate, existing worktree or branch)
+# and returns 1 if there was any, so a batch starts only when every name is
+# free (see rollback_worktrees for checkouts that fail afterwards).
+function validate_feature_names {
+    local branches=$'\n'$(git for-each-ref --format='%(refname:short)' refs/heads/)$'\n'
+    local seen=$'\n' errors=0 name
+    for name in "$@"; do
+        if [[ ! "$name" =~ ^[A-Za-z0-9][A-Za-z0-9._-]*$ ]]; then
+            echo -e "${COLOR_RED}ERROR: Invalid feature name '${COLOR_YELLOW}${name}${COLOR_RED}' (use letters, digits, '.', '_' and '-').${COLOR_NC}" >&2
+            errors=$((errors + 1))
+            continue
+        fi
+        if [[ "$seen" == *$'\n'"$name"$'\n'* ]]; then
+            echo -e "${COLOR_RED}ERROR: Feature '${COLOR_YELLOW}${name}${COLOR_RED}' is listed more than once.${COLOR_NC}" >&2
+            errors=$((errors + 1))
+            continue
+        fi
+        seen+="$name"$'\n'
+        if [[ -e "${WORKTREE_DIR}/${name}" ]]; then
+            echo -e "${COLOR_RED}ERROR: Worktree path '${COLOR_YELLOW}${WORKTREE_DIR}/${name}${COLOR_RED}' already exists.${COLOR_NC}" >&2
+            errors=$((errors + 1))
+        elif [[ "$branches" == *$'\n'"${TASK_AGENT_BRANCH_PREFIX}${name}"$'\n'* ]]; then
+            echo -e "${COLOR_RED}ERROR: Branch '${COLOR_YELLOW}${TASK_AGENT_BRANCH_PREFIX}${name}${COLOR_RED}' already exists.${COLOR_NC}" >&2
+            errors=$((errors + 1))
+        fi
+    done
+    (( errors == 0 ))
 }
 
 # Function to archive TASK_PROMPT.md when removing worktree
@@ -110,6 +191,179 @@ function archive_task_prompt {
         echo -e "${COLOR_GREEN}Archived TASK_PROMPT.md to ${archive_name}${COLOR_NC}"
     fi
 }
+# Function to check out a new worktree at the lead branch, detached or on a
+# new branch, limited to the sparse-checkout profile when one exists
+function add_worktree {
+    local path=$1
+    local branch=$2
+    local args=(-q)
+    if [[ -n "$branch" ]]; then
+        args+=(-b "$branch")
+    else
+        args+=(--detach)
+    fi
+    
+    if [[ ! -f "$SPARSE_PROFILE" ]]; then
+        git worktree add "${args[@]}" "$path" "$PROJECT_LEAD_BRANCH"
+        return
+    fi
+    
+    # Blank lines and comments in the profile are ignored
+    local dirs=() line
+    while IFS= read -r line; do
+        [[ -z "$line" || "$line" == \#* ]] || dirs+=("$line")
+    done < "$SPARSE_PROFILE"
+    git worktree add "${args[@]}" --no-checkout "$path" "$PROJECT_LEAD_BRANCH" || return 1
+    git -C "$path" sparse-checkout set --cone "${dirs[@]}" && git -C "$path" read-tree -mu HEAD
+}
+
+# --- Worktree pool ---
+# Idle worktrees wait under POOL_DIR, checked out (detached) at the lead
+# branch, so dispatching a task agent is a rename and a branch switch that
+# only touches files changed since the slot was warmed, not a full checkout.
+# create-worktree claims a slot when one is idle; remove-worktree resets
+# finished worktrees and parks them again until the pool is full.
+
+# Function to print the pool's target size (set by pool-fill, or CLAUDEPM_POOL_SIZE)
+function pool_size {
+    local size=0
+    [[ -f "$POOL_DIR/size" ]] && read -r size < "$POOL_DIR/size"
+    echo "${CLAUDEPM_POOL_SIZE:-${size:-0}}"
+}
+
+# Function to list idle pool worktrees
+function pool_slots {
+    local slot
+    for slot in "$POOL_DIR"/slot-*; do
+        if [[ -d "$slot" ]]; then
+            echo "$slot"
+        fi
+    done
+}
+
+# Function to print the first unused slot path
+function pool_free_slot {
+    local i=1
+    while [[ -e "$POOL_DIR/slot-$i" ]]; do
+        i=$((i + 1))
+    done
+    echo "$POOL_DIR/slot-$i"
+}
+
+# Function to warm idle worktrees until the pool holds the target count
+function pool_fill {
+    local target=$1
+    local count=$(pool_slots | wc -l | tr -d ' ')
+    local slot
+    mkdir -p "$POOL_DIR"
+    echo "$target" > "$POOL_DIR/size"
+    while (( count < target )); do
+        slot=$(pool_free_slot)
+        add_worktree "$slot" || error_exit "Could not create pool worktree '${COLOR_YELLOW}${slot}${COLOR_RED}'."
+        count=$((count + 1))
+        echo -e "${COLOR_CYAN}Warmed ${slot}${COLOR_NC}"
+    done
+    echo -e "${COLOR_GREEN}Pool holds ${count} idle worktrees.${COLOR_NC}"
+}
+
+# Function to claim an idle worktree as a feature worktree
+# Returns 1 when no slot could be claimed, leaving the pool as it was
+function pool_claim {
+    local branch=$1
+    local path=$2
+    local slot
+    for slot in $(pool_slots); do
+        # A concurrent claim may have moved this slot already
+        git worktree move "$slot" "$path" 2>/dev/null || continue
+        if git -C "$path" checkout -q -b "$branch" "$PROJECT_LEAD_BRANCH"; then
+            return 0
+        fi
+        git worktree move "$path" "$slot"
+        return 1
+    done
+    return 1
+}
+
+# Function to reset a finished worktree and park it in the pool
+# Ignored files (build caches, dependencies) stay for the next agent.
+# Returns 1 when the pool is full or the worktree could not be reset.
+function pool_return {
+    local path=$1
+    (( $(pool_slots | wc -l) < $(pool_size) )) || return 1
+    git -C "$path" reset -q --hard &&
+        git -C "$path" clean -fdq &&
+        git -C "$path" checkout -q --detach "$PROJECT_LEAD_BRANCH" || return 1
+    git worktree move "$path" "$(pool_free_slot)"
+}
+
+# Function to undo the checkouts of a failed batch
+# Every name was free when the batch started, so any worktree or branch
+# with that name now was made by the batch and is removed (pooled
+# worktrees go back to the pool).
+function rollback_worktrees {
+    local name path branch
+    for name in "$@"; do
+        path="${WORKTREE_DIR}/${name}"
+        branch="${TASK_AGENT_BRANCH_PREFIX}${name}"
+        if [[ -e "$path" ]]; then
+            pool_return "$path" 2>/dev/null || git worktree remove --force "$path"
+        fi
+        if git show-ref --verify --quiet "refs/heads/${branch}"; then
+            git branch -q -D "$branch"
+        fi
+    done
+    git worktree prune
+}
+
+# --- Worktree garbage collection ---
+
+# Function to list feature worktrees that can be collected, one
+# "name<TAB>reason" line each: the branch is merged into the lead branch
+# (and has moved since it was created, so a fresh worktree is not taken
+# for a merged one), or neither its commits nor its files changed for
+# idle_days days (0 turns the idle check off).
+function gc_candidates {
+    local idle_days=$1
+    local top=$(git rev-parse --show-toplevel)
+    local reflogs="$(git rev-parse --git-common-dir)/logs/refs/heads"
+    local merged=$'\n'$(git for-each-ref --merged "$PROJECT_LEAD_BRANCH" --format='%(refname:short)' "refs/heads/${TASK_AGENT_BRANCH_PREFIX}")$'\n'
+    local dates=$'\n'$(git for-each-ref --format='%(refname:short) %(committerdate:unix)' "refs/heads/${TASK_AGENT_BRANCH_PREFIX}")
+    local cutoff=$(( $(date +%s) - idle_days * 86400 ))
+    local key value path="" branch name committed
+    
+    # Porcelain records are separated (and ended) by blank lines
+    while read -r key value; do
+        if [[ -n "$key" ]]; then
+            case "$key" in
+                worktree) path=$value ;;
+                branch) branch=${value#refs/heads/} ;;
+            esac
+            continue
+        fi
+        name=${path#"$top/$WORKTREE_DIR/"}
+        if [[ "$name" != "$path" && "$name" != */* && "$branch" == "${TASK_AGENT_BRANCH_PREFIX}${name}" ]]; then
+            if [[ "$merged" == *$'\n'"$branch"$'\n'* && $(wc -l < "$reflogs/$branch" 2>/dev/null || echo 0) -gt 1 ]]; then
+                printf '%s\tmerged into %s\n' "$name" "$PROJECT_LEAD_BRANCH"
+            elif (( idle_days > 0 )); then
+                committed=${dates#*$'\n'"$branch "}
+                committed=${committed%%$'\n'*}
+                if (( committed < cutoff )) &&
+                    [[ -z $(find "$path" -path "$path/.git" -prune -o -type f -mtime -"$idle_days" -print -quit 2>/dev/null) ]]; then
+                    printf '%s\tidle for %s+ days\n' "$name" "$idle_days"
+                fi
+            fi
+        fi
+        path=""
+        branch=""
+    done < <(git worktree list --porcelain)
+}
+
+# Function to check whether a worktree has changes an agent has not committed
+# (the generated TASK_PROMPT.md and .claudepm do not count)
+function has_local_changes {
+    git -C "$1" status --porcelain 2>/dev/null | grep -qv -e '^?? TASK_PROMPT.md$' -e '^?? .claudepm$'
+}
+
 # --- Main Script Logic ---
 
 # Global safety check: never run on main
@@ -123,29 +377,20 @@ case "$COMMAND" in
         verify_branch "$PROJECT_LEAD_BRANCH"
         [[ -z "$FEATURE_NAME" ]] && error_exit "Usage: $0 create-worktree <feature-name>"
 
+        validate_feature_names "$FEATURE_NAME" || exit 1
+
         branch_name="${TASK_AGENT_BRANCH_PREFIX}${FEATURE_NAME}"
         worktree_path="${WORKTREE_DIR}/${FEATURE_NAME}"
 
-        if [[ -d "$worktree_path" ]]; then
-            error_exit "Worktree path '${COLOR_YELLOW}${worktree_path}${COLOR_RED}' already exists."
-        fi
-        if git rev-parse --verify "$branch_name" >/dev/null 2>&1; then
-            error_exit "Branch '${COLOR_YELLOW}${branch_name}${COLOR_RED}' already exists."
+        if pool_claim "$branch_name" "$worktree_path"; then
+            echo -e "${COLOR_BLUE}Claimed a pooled worktree for '${COLOR_YELLOW}${branch_name}${COLOR_BLUE}' at '${COLOR_YELLOW}${worktree_path}${COLOR_BLUE}'.${COLOR_NC}"
+        else
+            echo -e "${COLOR_BLUE}Creating branch '${COLOR_YELLOW}${branch_name}${COLOR_BLUE}' and worktree at '${COLOR_YELLOW}${worktree_path}${COLOR_BLUE}'...${COLOR_NC}"
+            add_worktree "$worktree_path" "$branch_name"
         fi
-
-        echo -e "${COLOR_BLUE}Creating branch '${COLOR_YELLOW}${branch_name}${COLOR_BLUE}' and worktree at '${COLOR_YELLOW}${worktree_path}${COLOR_BLUE}'...${COLOR_NC}"
-        git worktree add -b "$branch_name" "$worktree_path"
         
         # Create .claudepm file for Task Agent role
-        cat > "${worktree_path}/.claudepm" << EOF
-{
-  "claudepm": {
-    "version": "0.2.0",
-    "core_version": "0.2.0",
-    "role": "task-agent"
-  }
-}
-EOF
+        write_task_agent_config "$worktree_path"
         echo -e "${COLOR_CYAN}Created .claudepm with task-agent role${COLOR_NC}"
         
         # Generate TASK_PROMPT.md
@@ -154,6 +399,63 @@ EOF
         echo -e "${COLOR_GREEN}Success! Task Agent can now start in '${COLOR_YELLOW}${worktree_path}${COLOR_GREEN}'.${COLOR_NC}"
         ;;
 
+    create-worktrees)
+        verify_branch "$PROJECT_LEAD_BRANCH"
+        shift
+        jobs="${CLAUDEPM_WORKTREE_JOBS:-4}"
+        if [[ "$1" == "-j" ]]; then
+            jobs=$2
+            shift 2
+        fi
+        [[ $# -eq 0 || ! "$jobs" =~ ^[1-9][0-9]*$ ]] && error_exit "Usage: $0 create-worktrees [-j jobs] <feature-name>..."
+        validate_feature_names "$@" || exit 1
+
+        echo -e "${COLOR_BLUE}Creating $# worktrees (${jobs} at a time)...${COLOR_NC}"
+        SECONDS=0
+        # Checkouts run in parallel; prompts are rendered afterwards in one pass
+        results=$(printf '%s\0' "$@" | xargs -0 -n 1 -P "$jobs" bash "$0" _checkout-worktree)
+        pairs=()
+        created=0
+        while IFS=$'\t' read -r name how; do
+            case "$how" in
+                pooled) echo -e "${COLOR_CYAN}Claimed a pooled worktree for '${COLOR_YELLOW}${name}${COLOR_CYAN}'.${COLOR_NC}" ;;
+                created) echo -e "${COLOR_CYAN}Checked out '${COLOR_YELLOW}${name}${COLOR_CYAN}'.${COLOR_NC}" ;;
+                *)
+                    echo -e "${COLOR_RED}Failed to create '${COLOR_YELLOW}${name}${COLOR_RED}'.${COLOR_NC}"
+                    continue
+                    ;;
+            esac
+            pairs+=("$name" "${WORKTREE_DIR}/${name}")
+            created=$((created + 1))
+        done <<< "$results"
+
+        # A worker that died without reporting counts as failed too
+        if (( created < $# )); then
+            echo -e "${COLOR_YELLOW}Rolling back the batch...${COLOR_NC}"
+            rollback_worktrees "$@"
+            error_exit "$(( $# - created )) of $# worktrees could not be created; none were kept."
+        fi
+        render_task_prompts "${pairs[@]}"
+        echo -e "${COLOR_GREEN}Created ${created} worktrees in ${SECONDS}s.${COLOR_NC}"
+        ;;
+
+    _checkout-worktree)
+        # Worker for create-worktrees: one checkout, reported as "name<TAB>how"
+        branch_name="${TASK_AGENT_BRANCH_PREFIX}${FEATURE_NAME}"
+        worktree_path="${WORKTREE_DIR}/${FEATURE_NAME}"
+        if pool_claim "$branch_name" "$worktree_path" 2>/dev/null; then
+            how=pooled
+        elif add_worktree "$worktree_path" "$branch_name" >&2; then
+            how=created
+        else
+            how=failed
+        fi
+        if [[ "$how" != failed ]]; then
+            write_task_agent_config "$worktree_path"
+        fi
+        printf '%s\t%s\n' "$FEATURE_NAME" "$how"
+        ;;
+
     remove-worktree)
         verify_branch "$PROJECT_LEAD_BRANCH"
         [[ -z "$FEATURE_NAME" ]] && error_exit "Usage: $0 remove-worktree <feature-name>"
@@ -174,7 +476,11 @@ EOF
             # Archive TASK_PROMPT.md before removing worktree
             archive_task_prompt "$FEATURE_NAME" "$worktree_path"
             
-            git worktree remove --force "$worktree_path"
+            if pool_return "$worktree_path"; then
+                echo -e "${COLOR_CYAN}Returned the worktree to the pool.${COLOR_NC}"
+            else
+                git worktree remove --force "$worktree_path"
+            fi
             git branch -D "$branch_name"
             echo -e "${COLOR_GREEN}Cleanup complete.${COLOR_NC}"
         else
@@ -182,6 +488,127 @@ EOF
         fi
         ;;
 
+    pool-fill)
+        verify_branch "$PROJECT_LEAD_BRANCH"
+        size="${FEATURE_NAME:-$(pool_size)}"
+        [[ "$size" =~ ^[0-9]+$ ]] || error_exit "Usage: $0 pool-fill <count>"
+        pool_fill "$size"
+        ;;
+
+    pool-status)
+        echo -e "${COLOR_BLUE}Worktree pool (target size $(pool_size)):${COLOR_NC}"
+        lead=$(git rev-parse --short "$PROJECT_LEAD_BRANCH")
+        for slot in $(pool_slots); do
+            head=$(git -C "$slot" rev-parse --short HEAD)
+            if [[ "$head" == "$lead" ]]; then
+                echo "  $slot  $head (at $PROJECT_LEAD_BRANCH)"
+            else
+                echo "  $slot  $head (behind $PROJECT_LEAD_BRANCH, refreshed on claim)"
+            fi
+        done
+        ;;
+
+    pool-drain)
+        verify_branch "$PROJECT_LEAD_BRANCH"
+        for slot in $(pool_slots); do
+            git worktree remove --force "$slot"
+        done
+        rm -f "$POOL_DIR/size"
+        rmdir "$POOL_DIR" 2>/dev/null
+        echo -e "${COLOR_GREEN}Pool drained.${COLOR_NC}"
+        ;;
+
+    gc-worktrees)
+        verify_branch "$PROJECT_LEAD_BRANCH"
+        shift
+        idle_days="${CLAUDEPM_GC_IDLE_DAYS:-14}"
+        jobs="${CLAUDEPM_WORKTREE_JOBS:-4}"
+        dry_run=false
+        assume_yes=false
+        force=false
+        while [[ $# -gt 0 ]]; do
+            case "$1" in
+                -n|--dry-run) dry_run=true ;;
+                -y|--yes) assume_yes=true ;;
+                --force) force=true ;;
+                --idle) idle_days=$2; shift ;;
+                -j) jobs=$2; shift ;;
+                *) error_exit "Usage: $0 gc-worktrees [--dry-run] [--idle days] [-j jobs] [--yes] [--force]" ;;
+            esac
+            shift
+        done
+        [[ "$idle_days" =~ ^[0-9]+$ && "$jobs" =~ ^[1-9][0-9]*$ ]] || error_exit "Usage: $0 gc-worktrees [--dry-run] [--idle days] [-j jobs] [--yes] [--force]"
+
+        echo -e "${COLOR_BLUE}Looking for merged or idle worktrees...${COLOR_NC}"
+        names=()
+        paths=()
+        while IFS=$'\t' read -r name reason; do
+            [[ -z "$name" ]] && continue
+            if ! $force && has_local_changes "${WORKTREE_DIR}/${name}"; then
+                echo -e "${COLOR_YELLOW}Skipping ${WORKTREE_DIR}/${name} (${reason}): it has uncommitted changes. Use --force to collect it anyway.${COLOR_NC}"
+                continue
+            fi
+            echo -e "  ${COLOR_CYAN}${WORKTREE_DIR}/${name}${COLOR_NC} (${TASK_AGENT_BRANCH_PREFIX}${name}, ${reason})"
+            names+=("$name")
+            paths+=("${WORKTREE_DIR}/${name}")
+        done <<< "$(gc_candidates "$idle_days")"
+
+        if [[ ${#names[@]} -eq 0 ]]; then
+            echo -e "${COLOR_GREEN}No worktrees to collect.${COLOR_NC}"
+            exit 0
+        fi
+        # One du for every candidate, before anything is removed
+        total_kb=$(du -sk "${paths[@]}" | awk '{ kb += $1 } END { print kb + 0 }')
+        size=$(awk -v kb="$total_kb" 'BEGIN { if (kb < 1024) printf "%d KB", kb; else printf "%.1f MB", kb / 1024 }')
+
+        if $dry_run; then
+            echo -e "${COLOR_BLUE}Dry run: would remove ${#names[@]} worktrees and branches, recovering ${size}.${COLOR_NC}"
+            exit 0
+        fi
+        if ! $assume_yes; then
+            echo -e "${COLOR_YELLOW}This will permanently delete these ${#names[@]} worktrees and their branches. Are you sure? (y/n) ${COLOR_NC}"
+            read -n 1 -r
+            echo
+            if [[ ! $REPLY =~ ^[Yy]$ ]]; then
+                echo -e "${COLOR_YELLOW}Operation cancelled.${COLOR_NC}"
+                exit 0
+            fi
+        fi
+
+        # Worktrees are removed in parallel; branches are deleted in one
+        # call afterwards, since concurrent deletes contend for packed-refs
+        branches=()
+        failed=0
+        while IFS=$'\t' read -r name how; do
+            if [[ "$how" == removed ]]; then
+                branches+=("${TASK_AGENT_BRANCH_PREFIX}${name}")
+            else
+                echo -e "${COLOR_RED}Failed to remove ${WORKTREE_DIR}/${name}.${COLOR_NC}"
+                failed=$((failed + 1))
+            fi
+        done <<< "$(printf '%s\0' "${names[@]}" | xargs -0 -n 1 -P "$jobs" bash "$0" _gc-worktree)"
+        if [[ ${#branches[@]} -gt 0 ]]; then
+            git branch -q -D "${branches[@]}"
+        fi
+        git worktree prune
+
+        if (( failed > 0 )); then
+            error_exit "Removed ${#branches[@]} worktrees; ${failed} could not be removed."
+        fi
+        echo -e "${COLOR_GREEN}Removed ${#branches[@]} worktrees and branches, recovering ${size}.${COLOR_NC}"
+        ;;
+
+    _gc-worktree)
+        # Worker for gc-worktrees: archive and remove one worktree, reported as "name<TAB>how"
+        worktree_path="${WORKTREE_DIR}/${FEATURE_NAME}"
+        archive_task_prompt "$FEATURE_NAME" "$worktree_path" >&2
+        if git worktree remove --force "$worktree_path" >&2; then
+            printf '%s\tremoved\n' "$FEATURE_NAME"
+        else
+            printf '%s\tfailed\n' "$FEATURE_NAME"
+        fi
+        ;;
+
     list-worktrees)
         echo -e "${COLOR_BLUE}Active worktrees:${NC}"
         git worktree list
@@ -193,8 +620,19 @@ EOF
         echo ""
         echo "Commands:"
         echo -e "  ${COLOR_GREEN}create-worktree <feature-name>${NC}   - Creates a new worktree and feature branch."
+        echo -e "  ${COLOR_GREEN}create-worktrees [-j N] <name>...${NC} - Creates several worktrees, N checkouts at a time."
         echo -e "  ${COLOR_GREEN}remove-worktree <feature-name>${NC}   - Removes a worktree and its associated branch."
+        echo -e "  ${COLOR_GREEN}gc-worktrees [--dry-run]${NC}         - Removes worktrees whose branches are merged or idle."
         echo -e "  ${COLOR_GREEN}list-worktrees${NC}                   - Lists all active worktrees."
+        echo -e "  ${COLOR_GREEN}pool-fill [count]${NC}                - Keeps <count> idle worktrees ready at ${PROJECT_LEAD_BRANCH}."
+        echo -e "  ${COLOR_GREEN}pool-status${NC}                      - Lists idle pooled worktrees."
+        echo -e "  ${COLOR_GREEN}pool-drain${NC}                       - Removes all idle pooled worktrees."
+        echo ""
+        echo "create-worktree claims a pooled worktree when one is idle, and"
+        echo "remove-worktree returns worktrees to the pool until it is full."
+        echo "List directories in ${SPARSE_PROFILE} to give agents sparse checkouts."
+        echo "gc-worktrees also takes --idle <days> (default 14, 0 = merged only),"
+        echo "-j <jobs>, --yes (no prompt) and --force (collect uncommitted work too)."
         exit 1
         ;;
 esac
\ No newline at end of file
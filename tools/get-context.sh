@@ -3,6 +3,13 @@
 # claudepm get-context helper
 # Assembles full context by concatenating CLAUDE.md + CLAUDEPM-*.md
 # This centralizes the logic for all slash commands
+#
+# The assembled context is cached in .claudepm-cache/, keyed on the
+# inode, size and mtime of every input file, so repeat calls cost one
+# stat plus one read. Set CLAUDEPM_CONTEXT_CACHE=0 to disable.
+#
+# Usage: get-context.sh [--stats]
+#   --stats  Print byte and approximate token counts instead of the context
 
 # Check if we're in a claudepm-managed directory
 if [ ! -f ".claudepm" ]; then
@@ -15,45 +22,100 @@ if [ ! -f ".claudepm" ]; then
     exit 1
 fi
 
-# Read the role from .claudepm
-ROLE=$(grep -o '"role"[[:space:]]*:[[:space:]]*"[^"]*"' .claudepm | sed 's/.*"role"[[:space:]]*:[[:space:]]*"\([^"]*\)".*/\1/')
+CORE_DIR="$HOME/.claude/core"
+CACHE_DIR="${CLAUDEPM_CACHE_DIR:-.claudepm-cache}"
+CACHE_BLOB="$CACHE_DIR/context"
+CACHE_KEY="$CACHE_DIR/context.key"
+CACHE_STATS="$CACHE_DIR/context.stats"
 
-# Default to project if role not found
-if [ -z "$ROLE" ]; then
-    ROLE="project"
+# Every file the output can depend on (the role picks one core file)
+INPUTS=(".claudepm" "CLAUDE.md" "$CORE_DIR/CLAUDEPM-MANAGER.md" "$CORE_DIR/CLAUDEPM-PROJECT.md" "$CORE_DIR/CLAUDEPM-TASK.md")
+
+# Print inode, size and mtime of the existing inputs with a single stat call
+input_stamps() {
+    local existing=() file
+    for file in "${INPUTS[@]}"; do
+        [ -e "$file" ] && existing+=("$file")
+    done
+    # GNU stat first, then BSD/macOS
+    stat -c '%n %i %s %y' "${existing[@]}" 2>/dev/null || stat -f '%N %i %z %Fm' "${existing[@]}"
+}
+
+assemble_context() {
+    # Read the role from .claudepm
+    local role=$(grep -o '"role"[[:space:]]*:[[:space:]]*"[^"]*"' .claudepm | sed 's/.*"role"[[:space:]]*:[[:space:]]*"\([^"]*\)".*/\1/')
+
+    # Default to project if role not found
+    if [ -z "$role" ]; then
+        role="project"
+    fi
+
+    # Output local CLAUDE.md first (if it exists)
+    if [ -f "CLAUDE.md" ]; then
+        cat CLAUDE.md
+    fi
+
+    # Then append the appropriate CLAUDEPM file from core
+    # Map role to core file name
+    local core_name
+    case "$role" in
+        "manager")
+            core_name="MANAGER"
+            ;;
+        "project")
+            core_name="PROJECT"
+            ;;
+        "task-agent")
+            core_name="TASK"
+            ;;
+        *)
+            core_name="PROJECT"  # Default fallback
+            ;;
+    esac
+
+    local core_file="$CORE_DIR/CLAUDEPM-${core_name}.md"
+    if [ -f "$core_file" ]; then
+        # Add a separator for clarity
+        echo ""
+        echo "<!-- ===== CLAUDEPM CORE INSTRUCTIONS BELOW ===== -->"
+        echo ""
+        cat "$core_file"
+    fi
+    # Otherwise: fallback for installations that haven't migrated yet,
+    # just return what we have
+}
+
+if [ "${CLAUDEPM_CONTEXT_CACHE:-1}" = "0" ]; then
+    if [ "${1:-}" = "--stats" ]; then
+        bytes=$(assemble_context | wc -c | tr -d ' ')
+        echo "bytes=$bytes tokens=$(( (bytes + 3) / 4 ))"
+    else
+        assemble_context
+    fi
+    exit 0
 fi
 
-# Output local CLAUDE.md first (if it exists)
-if [ -f "CLAUDE.md" ]; then
-    cat CLAUDE.md
+KEY=$(input_stamps)
+
+if [ ! -f "$CACHE_BLOB" ] || [ ! -f "$CACHE_KEY" ] || [ "$KEY" != "$(< "$CACHE_KEY")" ]; then
+    if [ ! -d "$CACHE_DIR" ]; then
+        mkdir -p "$CACHE_DIR" 2>/dev/null && echo "*" > "$CACHE_DIR/.gitignore"
+    fi
+    TMP_BLOB=$(mktemp "$CACHE_DIR/context.XXXXXX" 2>/dev/null) || {
+        # Read-only checkout: serve uncached
+        assemble_context
+        exit 0
+    }
+    assemble_context > "$TMP_BLOB"
+    BYTES=$(wc -c < "$TMP_BLOB" | tr -d ' ')
+    # ~4 bytes per token is close enough for budgeting
+    echo "bytes=$BYTES tokens=$(( (BYTES + 3) / 4 ))" > "$CACHE_STATS"
+    mv "$TMP_BLOB" "$CACHE_BLOB"
+    printf '%s\n' "$KEY" > "$CACHE_KEY"
 fi
 
-# Then append the appropriate CLAUDEPM file from core
-# Map role to core file name
-case "$ROLE" in
-    "manager")
-        CORE_NAME="MANAGER"
-        ;;
-    "project")
-        CORE_NAME="PROJECT"
-        ;;
-    "task-agent")
-        CORE_NAME="TASK"
-        ;;
-    *)
-        CORE_NAME="PROJECT"  # Default fallback
-        ;;
-esac
-
-CORE_FILE="$HOME/.claude/core/CLAUDEPM-${CORE_NAME}.md"
-if [ -f "$CORE_FILE" ]; then
-    # Add a separator for clarity
-    echo ""
-    echo "<!-- ===== CLAUDEPM CORE INSTRUCTIONS BELOW ===== -->"
-    echo ""
-    cat "$CORE_FILE"
+if [ "${1:-}" = "--stats" ]; then
+    cat "$CACHE_STATS"
 else
-    # Fallback for installations that haven't migrated yet
-    # Just return what we have
-    exit 0
-fi
\ No newline at end of file
+    cat "$CACHE_BLOB"
+fi